@@ -0,0 +1,323 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# src.database builds its engine at import time; give it something to point at
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/bank_bench_default.db")
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from src.migrations import upgrade
+from src.models import BankAccount, DebitCard, Transaction, User
+from src.models.account import AccountStatus, AccountType
+from src.models.card import CardStatus
+from src.models.transaction import TransactionType
+from src.models.user import UserRole
+from src.services.auth_services import get_password_hash
+from src.services.iban_allocator import generate_iban
+
+PASSWORD = "bench-password"
+REGRESSION_METRICS = [("p50_ms", "higher"), ("p99_ms", "higher"), ("requests_per_s", "lower")]
+
+
+def seed(database_url: str, accounts: int, transactions: int) -> dict:
+    connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    engine = create_engine(database_url, connect_args=connect_args)
+    upgrade(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    db = Session()
+    run_id = time.time_ns()
+    hashed = get_password_hash(PASSWORD)
+    client = User(username=f"bench_client_{run_id}", email=f"client_{run_id}@bench.local", hashed_password=hashed, role=UserRole.CLIENT)
+    banker = User(username=f"bench_banker_{run_id}", email=f"banker_{run_id}@bench.local", hashed_password=hashed, role=UserRole.BANKER)
+    db.add_all([client, banker])
+    db.flush()
+
+    rows = []
+    for i in range(accounts):
+        account = BankAccount(
+            iban=generate_iban(),
+            balance=Decimal("1000000.00"),
+            status=AccountStatus.ACTIVE,
+            type=AccountType.CURRENT,
+            owner_id=client.id,
+        )
+        db.add(account)
+        db.flush()
+        db.add(DebitCard(monthly_salary=Decimal("1000.00"), account_id=account.id, status=CardStatus.APPROVED))
+        rows.append((account.id, account.iban))
+
+    # history for the listing and statement endpoints, spread over the last 90 days
+    now = datetime.now(timezone.utc)
+    db.add_all(
+        Transaction(
+            account_id=rows[i % accounts][0],
+            amount=Decimal("1.00"),
+            currency="EUR",
+            type=TransactionType.CREDIT if i % 2 else TransactionType.DEBIT,
+            created_at=now - timedelta(minutes=i * 90 * 24 * 60 // max(transactions, 1)),
+        )
+        for i in range(transactions)
+    )
+    ctx = {"client": client.username, "banker": banker.username, "accounts": rows}
+    db.commit()
+    db.close()
+    engine.dispose()
+    return ctx
+
+
+def login_form(username: str) -> dict:
+    return {"data": {"username": username, "password": PASSWORD}}
+
+
+def auth(token: str) -> dict:
+    return {"headers": {"Authorization": f"Bearer {token}"}}
+
+
+# name -> request builder(ctx, i) returning (method, path, httpx kwargs)
+WORKLOADS = {
+    "login": lambda ctx, i: ("POST", "/login/", login_form(ctx["client"])),
+    "get_account": lambda ctx, i: ("GET", f"/account/{ctx['accounts'][i % len(ctx['accounts'])][0]}", auth(ctx["client_token"])),
+    "list_accounts": lambda ctx, i: ("GET", "/account/", auth(ctx["banker_token"])),
+    "list_transactions": lambda ctx, i: ("GET", "/transaction/?limit=50", auth(ctx["client_token"])),
+    "statement": lambda ctx, i: (
+        "GET",
+        f"/account/{ctx['accounts'][i % len(ctx['accounts'])][0]}/statement?from={ctx['period'][0]}&to={ctx['period'][1]}",
+        auth(ctx["client_token"]),
+    ),
+    "transfer": lambda ctx, i: (
+        "POST",
+        f"/transaction/{ctx['accounts'][i % len(ctx['accounts'])][0]}",
+        {**auth(ctx["client_token"]), "json": {"recipient_iban": ctx["accounts"][(i + 1) % len(ctx["accounts"])][1], "amount": "1.00"}},
+    ),
+}
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: list, statuses: Counter, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+    return {
+        "requests": len(latencies),
+        "ok": ok,
+        "errors": len(latencies) - ok,
+        "statuses": dict(sorted(statuses.items())),
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+async def drive(base_url: str, build, ctx: dict, concurrency: int, requests: int, warmup: int) -> dict:
+    latencies = []
+    statuses = Counter()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as http:
+        async def worker(counter, total, record):
+            while (i := next(counter)) < total:
+                method, path, kwargs = build(ctx, i)
+                start = time.perf_counter()
+                try:
+                    status = str((await http.request(method, path, **kwargs)).status_code)
+                except httpx.HTTPError as exc:
+                    status = type(exc).__name__
+                if record:
+                    latencies.append(time.perf_counter() - start)
+                    statuses[status] += 1
+
+        # warmup fills connection pools and caches without counting towards the results
+        warm = itertools.count()
+        await asyncio.gather(*(worker(warm, warmup, False) for _ in range(concurrency)))
+        counter = itertools.count()
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(counter, requests, True) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return summarize(latencies, statuses, elapsed)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_url: str, port: int, workers: int, db_mode: str) -> subprocess.Popen:
+    # the load comes from a handful of principals, which the rate limiter would throttle
+    env = {"RATE_LIMITING": "false", **os.environ, "DATABASE_URL": database_url, "DB_MODE": db_mode}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not become ready within 30s")
+
+
+def fetch_token(base_url: str, username: str) -> str:
+    response = httpx.post(f"{base_url}/login/", timeout=30, **login_form(username))
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def reachable(database_url: str) -> bool:
+    try:
+        engine = create_engine(database_url)
+        with engine.connect():
+            pass
+        engine.dispose()
+        return True
+    except (OperationalError, ImportError) as exc:
+        print(f"skipping {database_url}: {exc}", file=sys.stderr)
+        return False
+
+
+def database_label(database_url: str) -> str:
+    return database_url.split(":", 1)[0].split("+", 1)[0]
+
+
+def run_database(database_url: str, args) -> dict:
+    if database_url.startswith("sqlite:///"):
+        # a fresh file per run so numbers don't depend on what earlier runs left behind
+        path = database_url[len("sqlite:///"):]
+        if os.path.exists(path):
+            os.remove(path)
+    ctx = seed(database_url, args.accounts, args.seed_transactions)
+    today = datetime.now(timezone.utc).date()
+    ctx["period"] = (today - timedelta(days=60), today - timedelta(days=31))
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_server(database_url, port, args.server_workers, args.db_mode)
+    try:
+        ctx["client_token"] = fetch_token(base_url, ctx["client"])
+        ctx["banker_token"] = fetch_token(base_url, ctx["banker"])
+        results = {}
+        for name in args.workloads:
+            results[name] = asyncio.run(drive(base_url, WORKLOADS[name], ctx, args.concurrency, args.requests, args.warmup))
+            print(f"{database_label(database_url):>10} {name:<18} {results[name]['requests_per_s']:>8} req/s  "
+                  f"p50 {results[name]['p50_ms']:>8} ms  p99 {results[name]['p99_ms']:>8} ms  errors {results[name]['errors']}",
+                  file=sys.stderr)
+        return results
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    regressions = []
+    for database, workloads in current["results"].items():
+        for name, stats in workloads.items():
+            before = baseline.get("results", {}).get(database, {}).get(name)
+            if not before:
+                continue
+            for metric, worse in REGRESSION_METRICS:
+                old, new = before[metric], stats[metric]
+                if not old:
+                    continue
+                change = (new - old) / old
+                if (worse == "higher" and change > threshold) or (worse == "lower" and -change > threshold):
+                    regressions.append(f"{database}/{name} {metric}: {old} -> {new} ({change:+.0%})")
+            if stats["errors"] > before["errors"]:
+                regressions.append(f"{database}/{name} errors: {before['errors']} -> {stats['errors']}")
+    return regressions
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and throughput of the API under concurrent load.")
+    parser.add_argument("--database-url", action="append", dest="database_urls",
+                        help="repeatable; defaults to a temporary SQLite file plus BENCH_POSTGRES_URL when it is reachable")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help=f"comma separated subset of {', '.join(WORKLOADS)}")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per workload")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--seed-transactions", type=int, default=5000)
+    parser.add_argument("--server-workers", type=int, default=1)
+    parser.add_argument("--db-mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--output", help="write the JSON results here")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown before a metric counts as a regression")
+    args = parser.parse_args()
+
+    args.workloads = [name.strip() for name in args.workloads.split(",") if name.strip()]
+    unknown = set(args.workloads) - WORKLOADS.keys()
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+
+    database_urls = args.database_urls or [f"sqlite:///{tempfile.gettempdir()}/bank_bench_api.db"]
+    if not args.database_urls and os.getenv("BENCH_POSTGRES_URL"):
+        database_urls.append(os.environ["BENCH_POSTGRES_URL"])
+
+    report = {
+        "meta": {
+            "git_revision": git_revision(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("database_urls", "output", "baseline")},
+        },
+        "results": {},
+    }
+    for database_url in database_urls:
+        if reachable(database_url):
+            report["results"][database_label(database_url)] = run_database(database_url, args)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.baseline} (threshold {args.threshold:.0%})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
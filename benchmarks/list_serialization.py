@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from decimal import Decimal
+
+# src.database builds its engine at import time; give it something to point at
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/bank_bench_default.db")
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.orm import sessionmaker
+from src.fast_json import FastJSONResponse, orjson
+from src.migrations import upgrade
+from src.models import BankAccount, DebitCard, User
+from src.models.account import AccountStatus, AccountType
+from src.models.card import CardStatus
+from src.models.user import UserRole
+from src.schemas.account import AccountOut
+from src.schemas.card import CardOut
+from src.schemas.user import UserOut
+from src.services.iban_allocator import generate_iban
+from src.services.projections import ACCOUNT_LIST_COLUMNS, CARD_LIST_COLUMNS, USER_LIST_COLUMNS, as_dicts
+
+# (model, response model, projected columns) per list endpoint
+WORKLOADS = {
+    "accounts": (BankAccount, AccountOut, ACCOUNT_LIST_COLUMNS),
+    "cards": (DebitCard, CardOut, CARD_LIST_COLUMNS),
+    "users": (User, UserOut, USER_LIST_COLUMNS),
+}
+
+
+def seed(Session, rows: int):
+    db = Session()
+    for model in (DebitCard, BankAccount, User):
+        db.execute(delete(model))
+    users = [
+        {"username": f"bench_{i}", "email": f"bench_{i}@example.com", "hashed_password": "x", "role": UserRole.CLIENT}
+        for i in range(rows)
+    ]
+    user_ids = db.execute(insert(User).returning(User.id), users).scalars().all()
+    accounts = [
+        {"iban": generate_iban(), "balance": Decimal("1234.50"), "currency": "EUR", "status": AccountStatus.ACTIVE,
+         "type": AccountType.CURRENT, "owner_id": user_id}
+        for user_id in user_ids
+    ]
+    account_ids = db.execute(insert(BankAccount).returning(BankAccount.id), accounts).scalars().all()
+    db.execute(insert(DebitCard), [
+        {"monthly_salary": Decimal("2500.00"), "account_id": account_id, "status": CardStatus.APPROVED}
+        for account_id in account_ids
+    ])
+    db.commit()
+    db.close()
+
+
+def orm_path(db, model, schema, columns) -> bytes:
+    # what the list endpoints did: ORM instances, from_attributes validation, then the JSON encoder
+    adapter = TypeAdapter(list[schema])
+    items = db.execute(select(model)).scalars().all()
+    content = adapter.dump_python(adapter.validate_python(items, from_attributes=True), mode="json")
+    return JSONResponse(content).body
+
+
+def projected_path(db, model, schema, columns) -> bytes:
+    return FastJSONResponse(as_dicts(db.execute(select(*columns)))).body
+
+
+def measure(Session, path, workload, repeat: int, rows: int) -> dict:
+    cpu = []
+    for _ in range(repeat):
+        db = Session()
+        start = time.process_time()
+        body = path(db, *workload)
+        cpu.append(time.process_time() - start)
+        db.close()
+
+    db = Session()
+    tracemalloc.start()
+    path(db, *workload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.close()
+
+    best = min(cpu)
+    return {
+        "cpu_ms": round(best * 1000, 2),
+        "cpu_us_per_row": round(best / rows * 1e6, 2),
+        "peak_kib": round(peak / 1024, 1),
+        "peak_bytes_per_row": round(peak / rows),
+        "body_bytes": len(body),
+    }
+
+
+def run(database_url: str, rows: int, repeat: int, workloads: list) -> dict:
+    engine = create_engine(database_url)
+    upgrade(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    seed(Session, rows)
+
+    results = {}
+    for name in workloads:
+        workload = WORKLOADS[name]
+        before = measure(Session, orm_path, workload, repeat, rows)
+        after = measure(Session, projected_path, workload, repeat, rows)
+        # byte for byte the same response either way
+        with Session() as db:
+            assert orm_path(db, *workload) == projected_path(db, *workload)
+        results[name] = {
+            "orm": before,
+            "projected": after,
+            "cpu_speedup": round(before["cpu_ms"] / after["cpu_ms"], 2) if after["cpu_ms"] else None,
+            "memory_ratio": round(before["peak_kib"] / after["peak_kib"], 2) if after["peak_kib"] else None,
+        }
+    engine.dispose()
+    return {"rows": rows, "repeat": repeat, "encoder": "orjson" if orjson is not None else "json", "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CPU and memory per row of the list endpoints: ORM and validation vs projected rows.")
+    parser.add_argument("--database-url", default=f"sqlite:///{tempfile.gettempdir()}/bank_bench_lists.db")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per path; the fastest counts")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help=f"comma separated subset of {', '.join(WORKLOADS)}")
+    args = parser.parse_args()
+    print(json.dumps(run(args.database_url, args.rows, args.repeat, args.workloads.split(",")), indent=2))
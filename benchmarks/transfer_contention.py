@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+# src.database builds its engine at import time; give it something to point at
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/bank_bench_default.db")
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from src.database import Base
+from src.models import BankAccount, DebitCard, Transaction, User
+from src.models.account import AccountStatus, AccountType
+from src.models.user import UserRole
+from src.schemas.transaction import TransactionCreate
+from src.services.auth_services import AuthenticatedUser
+from src.services.iban_allocator import generate_iban
+from src.services.transaction_services import TransactionService
+
+
+def seed(Session, accounts: int, opening_balance: Decimal):
+    db = Session()
+    owner = User(username=f"bench_{time.time_ns()}", email=f"bench_{time.time_ns()}@example.com", hashed_password="x", role=UserRole.BANKER)
+    db.add(owner)
+    db.flush()
+    rows = []
+    for i in range(accounts):
+        account = BankAccount(
+            iban=generate_iban(),
+            balance=opening_balance,
+            status=AccountStatus.ACTIVE,
+            type=AccountType.CURRENT,
+            owner_id=owner.id,
+        )
+        db.add(account)
+        db.flush()
+        db.add(DebitCard(monthly_salary=1000, account_id=account.id, status="APPROVED"))
+        rows.append((account.id, account.iban))
+    db.commit()
+    banker = AuthenticatedUser(id=owner.id, username=owner.username, role=UserRole.BANKER)
+    db.close()
+    return banker, rows
+
+
+def run(database_url: str, accounts: int, workers: int, transfers: int, opening_balance: Decimal, amount: Decimal):
+    connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    engine = create_engine(database_url, connect_args=connect_args, pool_size=workers, max_overflow=0)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    banker, hot_accounts = seed(Session, accounts, opening_balance)
+    service = TransactionService()
+    counters = {"ok": 0, "rejected": 0, "failed": 0}
+    lock = threading.Lock()
+    latencies = []
+
+    def one_transfer(_):
+        sender, recipient = random.sample(hot_accounts, 2)
+        db = Session()
+        start = time.perf_counter()
+        try:
+            service.perform_transaction(db, sender[0], TransactionCreate(recipient_iban=recipient[1], amount=amount), banker)
+            outcome = "ok"
+        except HTTPException:
+            outcome = "rejected"
+        except Exception:
+            outcome = "failed"
+        finally:
+            db.close()
+        with lock:
+            counters[outcome] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(one_transfer, range(transfers)))
+    elapsed = time.perf_counter() - start
+
+    db = Session()
+    ids = [account_id for account_id, _ in hot_accounts]
+    balances = [balance for (balance,) in db.query(BankAccount.balance).filter(BankAccount.id.in_(ids))]
+    debits = db.query(func.count(Transaction.id)).filter(Transaction.account_id.in_(ids), Transaction.type == "DEBIT").scalar()
+    db.close()
+    engine.dispose()
+
+    latencies.sort()
+    return {
+        "database": engine.dialect.name,
+        "accounts": accounts,
+        "workers": workers,
+        "transfers": transfers,
+        **counters,
+        "elapsed_s": round(elapsed, 3),
+        "transfers_per_s": round(transfers / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+        # money is only moved between the hot accounts, so these must hold after any interleaving
+        "balance_conserved": sum(balances) == accounts * opening_balance,
+        "no_overdraft": min(balances) >= 0,
+        "ledger_matches": debits == counters["ok"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent transfers between a small set of hot accounts.")
+    parser.add_argument("--database-url", default=f"sqlite:///{tempfile.gettempdir()}/bank_bench_contention.db")
+    parser.add_argument("--accounts", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--transfers", type=int, default=2000)
+    parser.add_argument("--opening-balance", type=Decimal, default=Decimal("500.00"))
+    parser.add_argument("--amount", type=Decimal, default=Decimal("10.00"))
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.database_url, args.accounts, args.workers, args.transfers, args.opening_balance, args.amount), indent=2))
@@ -0,0 +1,66 @@
+from fastapi import Depends, Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import os
+from src.database import DATABASE_URL
+from src.db_pool import InstrumentedAsyncQueuePool, pool_options
+from src.rate_limit import principal
+from src.replicas import replica_set
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgresql+psycopg": "postgresql+psycopg_async",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncQueuePool, **pool_options())
+# expire_on_commit=False so committed objects can still be serialized without an implicit (sync) reload
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# health is tracked on the sync engines in src/replicas.py; these only serve the async reads
+async_replica_sessions = {
+    replica.url: async_sessionmaker(
+        bind=create_async_engine(to_async_url(replica.url), poolclass=InstrumentedAsyncQueuePool, **pool_options()),
+        autoflush=False, expire_on_commit=False,
+    )
+    for replica in replica_set.replicas
+}
+
+
+async def get_async_read_db(request: Request, db: AsyncSession = Depends(get_async_db)):
+    replica = replica_set.pick(principal(request.scope)[1]) if replica_set else None
+    read_db = None
+    if replica is not None:
+        read_db = async_replica_sessions[replica.url]()
+        try:
+            await read_db.connection()
+        except DBAPIError as exc:
+            await read_db.close()
+            replica.mark_down(exc)
+            read_db = None
+
+    if read_db is None:
+        yield db
+        return
+    try:
+        yield read_db
+    finally:
+        await read_db.close()
@@ -0,0 +1,36 @@
+import argparse
+import time
+from passlib.hash import bcrypt
+
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+
+def measure(rounds: int, samples: int) -> float:
+    hasher = bcrypt.using(rounds=rounds)
+    hasher.hash("calibration-password")
+    start = time.perf_counter()
+    for _ in range(samples):
+        hasher.hash("calibration-password")
+    return (time.perf_counter() - start) / samples * 1000
+
+
+def calibrate(target_ms: float, samples: int) -> int:
+    chosen = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = measure(rounds, samples)
+        print(f"rounds={rounds:2d}  {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        chosen = rounds
+    return chosen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pick the highest bcrypt cost that hashes within a target latency on this host.")
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+
+    rounds = calibrate(args.target_ms, args.samples)
+    print(f"Recommended setting: BCRYPT_ROUNDS={rounds}")
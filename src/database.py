@@ -2,12 +2,25 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 import os
+from src.db_pool import InstrumentedQueuePool, pool_options
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+# "sync" serves requests from the threadpool, "async" from the event loop (see src/async_database.py)
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+USE_ASYNC_DB = DB_MODE == "async"
+
+# Async mode still needs this engine, and so a sync driver: the outbox dispatcher, IBAN refills,
+# replica health checks and a few ops endpoints use it. Requests don't, so it gets a small pool there.
+sync_pool_options = pool_options()
+if USE_ASYNC_DB:
+    sync_pool_options.update(
+        pool_size=int(os.getenv("DB_SYNC_POOL_SIZE", "2")),
+        max_overflow=int(os.getenv("DB_SYNC_MAX_OVERFLOW", "2")),
+    )
+engine = create_engine(DATABASE_URL, poolclass=InstrumentedQueuePool, **sync_pool_options)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -18,5 +31,3 @@ def get_db():
         yield db
     finally:
         db.close()
-
-
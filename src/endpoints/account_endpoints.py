@@ -1,29 +1,59 @@
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from src.database import get_db
+from src.replicas import get_read_db
 from src.services.auth_services import get_current_user
 from src.models.user import User
 from src.models.account import AccountStatus
-from src.schemas.account import AccountCreate, AccountUpdate, AccountOut
+from src.schemas.account import AccountBulkCreate, AccountBulkStatus, AccountBulkStatusOut, AccountCreate, AccountUpdate, AccountOut, StatementOut
 from src.services.account_services import AccountServices
+from src.services.idempotency_services import IdempotencyServices, IdempotentRequest, idempotency_request
 from uuid import UUID
+from typing import Optional
+from datetime import date
+from src.fast_json import FastJSONResponse
 
 router = APIRouter()
 account_services = AccountServices()
+idempotency_services = IdempotencyServices()
 
 @router.post("/admin-create", response_model=AccountOut)
 def create_account(
     owner_id: UUID, 
     account: AccountCreate = Body(...), 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency: Optional[IdempotentRequest] = Depends(idempotency_request),
+):
+    if current_user.role != "ADMIN":
+        raise HTTPException(
+            status_code=403,
+            detail="Only admins can create accounts"
+        )
+    return idempotency_services.run(
+        db, current_user, idempotency,
+        lambda: account_services.create_account(db, owner_id, account),
+        response_model=AccountOut,
+    )
+
+
+@router.post("/admin-create/bulk", response_model=list[AccountOut])
+def create_accounts(
+    payload: AccountBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    idempotency: Optional[IdempotentRequest] = Depends(idempotency_request),
 ):
     if current_user.role != "ADMIN":
         raise HTTPException(
             status_code=403,
             detail="Only admins can create accounts"
         )
-    return account_services.create_account(db, owner_id, account)
+    return idempotency_services.run(
+        db, current_user, idempotency,
+        lambda: account_services.create_accounts(db, payload.accounts),
+        response_model=list[AccountOut],
+    )
 
 
 @router.post("/")
@@ -31,25 +61,50 @@ def request_new_account(
     owner_id: UUID, 
     account: AccountCreate = Body(...), 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)):
-    return account_services.request_new_account(db, owner_id, account, current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency: Optional[IdempotentRequest] = Depends(idempotency_request),
+):
+    return idempotency_services.run(
+        db, current_user, idempotency,
+        lambda: account_services.request_new_account(db, owner_id, account, current_user),
+    )
 
 
 @router.get("/{account_id}", response_model=AccountOut)
 def get_account(
     account_id: UUID, 
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     return account_services.get_account(db, account_id, current_user)
 
 
+@router.get("/{account_id}/statement", response_model=StatementOut)
+def get_statement(
+    account_id: UUID,
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    return account_services.get_statement(db, account_id, date_from, date_to, current_user)
+
+
 @router.get("/", response_model=list[AccountOut])
 def get_all_accounts(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    return FastJSONResponse(account_services.get_all_accounts(db, current_user))
+
+
+@router.patch("/bulk-status", response_model=AccountBulkStatusOut)
+def bulk_update_status(
+    selection: AccountBulkStatus,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return account_services.get_all_accounts(db, current_user)
+    return account_services.bulk_update_status(db, selection, current_user)
 
 
 @router.patch("/{account_id}", response_model=AccountOut)
@@ -0,0 +1,144 @@
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.async_database import get_async_db, get_async_read_db
+from src.services.async_auth_services import get_current_user_async
+from src.models.user import User
+from src.models.account import AccountStatus
+from src.schemas.account import AccountBulkCreate, AccountBulkStatus, AccountBulkStatusOut, AccountCreate, AccountUpdate, AccountOut, StatementOut
+from src.services.async_account_services import AsyncAccountServices
+from src.services.async_idempotency_services import AsyncIdempotencyServices
+from src.services.idempotency_services import IdempotentRequest, idempotency_request
+from uuid import UUID
+from typing import Optional
+from datetime import date
+from src.fast_json import FastJSONResponse
+
+router = APIRouter()
+account_services = AsyncAccountServices()
+idempotency_services = AsyncIdempotencyServices()
+
+@router.post("/admin-create", response_model=AccountOut)
+async def create_account(
+    owner_id: UUID,
+    account: AccountCreate = Body(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    idempotency: Optional[IdempotentRequest] = Depends(idempotency_request),
+):
+    if current_user.role != "ADMIN":
+        raise HTTPException(
+            status_code=403,
+            detail="Only admins can create accounts"
+        )
+    return await idempotency_services.run(
+        db, current_user, idempotency,
+        lambda: account_services.create_account(db, owner_id, account),
+        response_model=AccountOut,
+    )
+
+
+@router.post("/admin-create/bulk", response_model=list[AccountOut])
+async def create_accounts(
+    payload: AccountBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    idempotency: Optional[IdempotentRequest] = Depends(idempotency_request),
+):
+    if current_user.role != "ADMIN":
+        raise HTTPException(
+            status_code=403,
+            detail="Only admins can create accounts"
+        )
+    return await idempotency_services.run(
+        db, current_user, idempotency,
+        lambda: account_services.create_accounts(db, payload.accounts),
+        response_model=list[AccountOut],
+    )
+
+
+@router.post("/")
+async def request_new_account(
+    owner_id: UUID,
+    account: AccountCreate = Body(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    idempotency: Optional[IdempotentRequest] = Depends(idempotency_request),
+):
+    return await idempotency_services.run(
+        db, current_user, idempotency,
+        lambda: account_services.request_new_account(db, owner_id, account, current_user),
+    )
+
+
+@router.get("/{account_id}", response_model=AccountOut)
+async def get_account(
+    account_id: UUID,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await account_services.get_account(db, account_id, current_user)
+
+
+@router.get("/{account_id}/statement", response_model=StatementOut)
+async def get_statement(
+    account_id: UUID,
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await account_services.get_statement(db, account_id, date_from, date_to, current_user)
+
+
+@router.get("/", response_model=list[AccountOut])
+async def get_all_accounts(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return FastJSONResponse(await account_services.get_all_accounts(db, current_user))
+
+
+@router.patch("/bulk-status", response_model=AccountBulkStatusOut)
+async def bulk_update_status(
+    selection: AccountBulkStatus,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await account_services.bulk_update_status(db, selection, current_user)
+
+
+@router.patch("/{account_id}", response_model=AccountOut)
+async def update_account(
+    account_id: UUID,
+    account_update: AccountUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await account_services.update_account(db, account_id, account_update, current_user)
+
+
+@router.patch("/{account_id}/activate", response_model=AccountOut)
+async def activate_account(
+    account_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await account_services.update_status(db, account_id, current_user, status=AccountStatus.ACTIVE)
+
+
+@router.patch("/{account_id}/decline", response_model=AccountOut)
+async def decline_account(
+    account_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await account_services.update_status(db, account_id, current_user, status=AccountStatus.DECLINED)
+
+
+@router.delete("/{account_id}")
+async def delete_account(
+    account_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await account_services.delete_account(db, account_id, current_user)
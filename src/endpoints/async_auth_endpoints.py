@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import timedelta
+from src.async_database import get_async_db
+from src.models import User
+from src.services.auth_services import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from src.services.password_services import password_hasher
+
+router = APIRouter()
+
+@router.post("/")
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(select(User).where(User.username == form_data.username))).scalars().first()
+    if not user:
+        raise HTTPException(status_code=401, detail="Incorrect username or password")
+
+    valid, new_hash = await password_hasher.verify_and_update_async(form_data.password, user.hashed_password)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Incorrect username or password")
+
+    # the stored hash was made with a different bcrypt cost than BCRYPT_ROUNDS
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": user.username, "role": user.role},
+        expires_delta=access_token_expires
+    )
+    return {"access_token": access_token, "token_type": "bearer"}
@@ -0,0 +1,93 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.async_database import get_async_db, get_async_read_db
+from src.services.async_auth_services import get_current_user_async
+from src.models.user import User
+from src.models.card import CardStatus
+from src.schemas.card import CardBatchReview, CardBatchReviewOut, CardClaimOut, CardCreate, CardOut
+from src.services.async_card_services import AsyncCardServices
+from src.services.card_services import MAX_CARD_CLAIMS
+from uuid import UUID
+from src.services.async_idempotency_services import AsyncIdempotencyServices
+from src.services.idempotency_services import IdempotentRequest, idempotency_request
+from src.fast_json import FastJSONResponse
+
+router = APIRouter()
+card_services = AsyncCardServices()
+idempotency_services = AsyncIdempotencyServices()
+
+@router.post("/", response_model=CardOut, status_code=status.HTTP_201_CREATED)
+async def request_new_card(
+    card: CardCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    idempotency: Optional[IdempotentRequest] = Depends(idempotency_request),
+):
+    return await idempotency_services.run(
+        db, current_user, idempotency,
+        lambda: card_services.create_card_request(db, card, current_user),
+        response_model=CardOut, status_code=status.HTTP_201_CREATED,
+    )
+
+
+@router.post("/claim", response_model=list[CardClaimOut])
+async def claim_cards(
+    limit: int = Query(10, ge=1, le=MAX_CARD_CLAIMS),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await card_services.claim_cards(db, current_user, limit)
+
+
+@router.post("/review", response_model=CardBatchReviewOut)
+async def review_cards(
+    batch: CardBatchReview,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await card_services.review_cards(db, batch.reviews, current_user)
+
+
+@router.patch("/{card_id}/approve", response_model=CardOut)
+async def approve_card(
+    card_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await card_services.update_status(db, card_id, CardStatus.APPROVED , current_user)
+
+
+@router.patch("/{card_id}/decline", response_model=CardOut)
+async def decline_card(
+    card_id: UUID,
+    reason: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await card_services.update_status(db, card_id, CardStatus.DECLINED , current_user, reason)
+
+
+@router.get("/", response_model=list[CardOut])
+async def get_all_cards(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return FastJSONResponse(await card_services.get_cards(db, current_user))
+
+
+@router.get("/{card_id}", response_model=CardOut)
+async def get_card_by_id(
+    card_id: UUID,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await card_services.get_card_by_id(db, card_id, current_user)
+
+@router.delete("/{card_id}")
+async def delete_card(
+    card_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await card_services.delete_card(db, card_id, current_user)
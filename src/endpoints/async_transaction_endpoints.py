@@ -0,0 +1,95 @@
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from uuid import UUID
+from src.services.async_auth_services import get_current_user_async
+from src.async_database import get_async_db, get_async_read_db
+from src.models.user import User
+from src.schemas.transaction import BatchTransferCreate, BatchTransferOut, ExportFormat, TransactionCreate, TransactionFilter, TransactionOut
+from src.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.services.async_transaction_services import AsyncTransactionService
+from src.services.async_idempotency_services import AsyncIdempotencyServices
+from src.services.idempotency_services import IdempotentRequest, idempotency_request
+
+router = APIRouter()
+
+transaction_service = AsyncTransactionService()
+idempotency_services = AsyncIdempotencyServices()
+
+
+@router.get("/", response_model=List[TransactionOut])
+async def get_all_transactions(
+    response: Response,
+    filters: TransactionFilter = Depends(),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    transactions, next_cursor = await transaction_service.get_transactions(db, current_user, filters, limit, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return transactions
+
+
+@router.get("/export")
+async def export_transactions(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    filters: TransactionFilter = Depends(),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    media_type = "text/csv" if export_format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        transaction_service.export_transactions(db, current_user, filters, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="transactions.{export_format.value}"'},
+    )
+
+
+@router.get("/{transaction_id}", response_model=TransactionOut)
+async def get_transaction_by_id(
+    transaction_id: UUID,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await transaction_service.get_transaction_by_id(db, transaction_id, current_user)
+
+
+@router.post("/batch", response_model=BatchTransferOut)
+async def create_batch_transactions(
+    batch: BatchTransferCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    idempotency: Optional[IdempotentRequest] = Depends(idempotency_request),
+):
+    return await idempotency_services.run(
+        db, current_user, idempotency,
+        lambda: transaction_service.perform_batch_transactions(db, batch, current_user),
+        response_model=BatchTransferOut,
+    )
+
+
+@router.post("/{account_id}", response_model=TransactionOut)
+async def create_transaction(
+    account_id: UUID,
+    transaction_data: TransactionCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    idempotency: Optional[IdempotentRequest] = Depends(idempotency_request),
+):
+    return await idempotency_services.run(
+        db, current_user, idempotency,
+        lambda: transaction_service.perform_transaction(db, account_id, transaction_data, current_user),
+        response_model=TransactionOut,
+    )
+
+
+@router.delete("/{transaction_id}")
+async def delete_transaction(
+    transaction_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await transaction_service.delete_transaction(db, transaction_id, current_user)
@@ -0,0 +1,83 @@
+from uuid import UUID
+from typing import Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.services.async_auth_services import get_current_user_async
+from src.models.user import User
+from src.schemas.user import UserCreate, UserImportResult, UserOut, UserUpdate
+from src.services.async_user_services import AsyncUserServices
+from src.services.user_import import detect_format, importable_roles, read_records
+from src.services.async_idempotency_services import AsyncIdempotencyServices
+from src.services.idempotency_services import IdempotentRequest, idempotency_request
+from src.async_database import get_async_db, get_async_read_db
+from src.fast_json import FastJSONResponse
+
+router = APIRouter()
+user_services = AsyncUserServices()
+idempotency_services = AsyncIdempotencyServices()
+
+@router.post("/", response_model=UserOut)
+async def create_user(
+    user: UserCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    idempotency: Optional[IdempotentRequest] = Depends(idempotency_request),
+):
+    async def handler():
+        db_user = await user_services.get_user_by_email(db, user.email)
+        if db_user:
+            raise HTTPException(status_code=400, detail="Email already registered")
+        return await user_services.create_user(db, user, current_user)
+
+    return await idempotency_services.run(db, current_user, idempotency, handler, response_model=UserOut)
+
+
+@router.post("/import", response_model=UserImportResult)
+async def import_users(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson; taken from the file name when omitted"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    allowed_roles = importable_roles(current_user)
+    records = read_records(file.file, detect_format(file.filename, format))
+    return await user_services.import_users(db, records, allowed_roles)
+
+
+@router.get("/", response_model=list[UserOut])
+async def get_all_users(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return FastJSONResponse(await user_services.get_all_users(db, current_user))
+
+
+@router.get("/{user_id}", response_model=UserOut)
+async def api_get_user(
+    user_id: UUID,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    db_user = await user_services.get_user(db, user_id, current_user)
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
+
+
+@router.patch("/{user_id}", response_model=UserOut)
+async def update_user(
+    user_id: UUID,
+    user_update: UserUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await user_services.update_user_service(user_id, user_update, db, current_user)
+
+
+@router.delete("/{user_id}")
+async def delete_user(
+    user_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await user_services.delete_user_service(user_id, db, current_user)
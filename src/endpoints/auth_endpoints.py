@@ -1,19 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
 from src.database import get_db
-from src.models import User
-from src.services.auth_services import verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from src.services.auth_services import create_access_token, login_credentials, store_rehashed_password, ACCESS_TOKEN_EXPIRE_MINUTES
+from src.services.password_services import password_hasher
 
 router = APIRouter()
 
 @router.post("/")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    # the queries run in the threadpool, but bcrypt is awaited so a login burst holds no threads
+    user = await run_in_threadpool(login_credentials, db, form_data.username)
+    if not user:
         raise HTTPException(status_code=401, detail="Incorrect username or password")
 
+    valid, new_hash = await password_hasher.verify_and_update_async(form_data.password, user.hashed_password)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Incorrect username or password")
+
+    # the stored hash was made with a different bcrypt cost than BCRYPT_ROUNDS
+    if new_hash:
+        await run_in_threadpool(store_rehashed_password, db, user.id, new_hash)
+
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username, "role": user.role},
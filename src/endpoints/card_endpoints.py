@@ -1,23 +1,51 @@
-from fastapi import APIRouter, Depends, status
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from src.database import get_db
+from src.replicas import get_read_db
 from src.services.auth_services import get_current_user
 from src.models.user import User
 from src.models.card import CardStatus
-from src.schemas.card import CardCreate, CardOut
-from src.services.card_services import CardServices
+from src.schemas.card import CardBatchReview, CardBatchReviewOut, CardClaimOut, CardCreate, CardOut
+from src.services.card_services import MAX_CARD_CLAIMS, CardServices
 from uuid import UUID
+from src.services.idempotency_services import IdempotencyServices, IdempotentRequest, idempotency_request
+from src.fast_json import FastJSONResponse
 
 router = APIRouter()
 card_services = CardServices()
+idempotency_services = IdempotencyServices()
 
 @router.post("/", response_model=CardOut, status_code=status.HTTP_201_CREATED)
 def request_new_card(
     card: CardCreate, 
     db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    idempotency: Optional[IdempotentRequest] = Depends(idempotency_request),
+):
+    return idempotency_services.run(
+        db, current_user, idempotency,
+        lambda: card_services.create_card_request(db, card, current_user),
+        response_model=CardOut, status_code=status.HTTP_201_CREATED,
+    )
+
+
+@router.post("/claim", response_model=list[CardClaimOut])
+def claim_cards(
+    limit: int = Query(10, ge=1, le=MAX_CARD_CLAIMS),
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return card_services.create_card_request(db, card, current_user)
+    return card_services.claim_cards(db, current_user, limit)
+
+
+@router.post("/review", response_model=CardBatchReviewOut)
+def review_cards(
+    batch: CardBatchReview,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    return card_services.review_cards(db, batch.reviews, current_user)
 
 
 @router.patch("/{card_id}/approve", response_model=CardOut)
@@ -41,16 +69,16 @@ def decline_card(
 
 @router.get("/", response_model=list[CardOut])
 def get_all_cards(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    return card_services.get_cards(db, current_user)
+    return FastJSONResponse(card_services.get_cards(db, current_user))
 
 
 @router.get("/{card_id}", response_model=CardOut)
 def get_card_by_id(
     card_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     return card_services.get_card_by_id(db, card_id, current_user)
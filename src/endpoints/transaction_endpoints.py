@@ -1,43 +1,90 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from src.services.auth_services import get_current_user
 from src.database import get_db
+from src.replicas import get_read_db
 from src.models.user import User
-from src.schemas.transaction import TransactionCreate, TransactionOut
+from src.schemas.transaction import BatchTransferCreate, BatchTransferOut, ExportFormat, TransactionCreate, TransactionFilter, TransactionOut
+from src.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from src.services.transaction_services import TransactionService
+from src.services.idempotency_services import IdempotencyServices, IdempotentRequest, idempotency_request
 
 router = APIRouter()
 
 transaction_service = TransactionService()
+idempotency_services = IdempotencyServices()
 
 
 @router.get("/", response_model=List[TransactionOut])
 def get_all_transactions(
-    db: Session = Depends(get_db),
+    response: Response,
+    filters: TransactionFilter = Depends(),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    transactions, next_cursor = transaction_service.get_transactions(db, current_user, filters, limit, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return transactions
+
+
+@router.get("/export")
+def export_transactions(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    filters: TransactionFilter = Depends(),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    return transaction_service.get_transactions(db, current_user)
+    media_type = "text/csv" if export_format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        transaction_service.export_transactions(db, current_user, filters, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="transactions.{export_format.value}"'},
+    )
 
 
 @router.get("/{transaction_id}", response_model=TransactionOut)
 def get_transaction_by_id(
     transaction_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     return transaction_service.get_transaction_by_id(db, transaction_id, current_user)
 
 
+@router.post("/batch", response_model=BatchTransferOut)
+def create_batch_transactions(
+    batch: BatchTransferCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    idempotency: Optional[IdempotentRequest] = Depends(idempotency_request),
+):
+    return idempotency_services.run(
+        db, current_user, idempotency,
+        lambda: transaction_service.perform_batch_transactions(db, batch, current_user),
+        response_model=BatchTransferOut,
+    )
+
+
 @router.post("/{account_id}", response_model=TransactionOut)
 def create_transaction(
     account_id: UUID,
     transaction_data: TransactionCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency: Optional[IdempotentRequest] = Depends(idempotency_request),
 ):
-    return transaction_service.perform_transaction(db, account_id, transaction_data, current_user)
+    # mobile clients retry transfers on timeouts; with a key the retry gets the first outcome back
+    return idempotency_services.run(
+        db, current_user, idempotency,
+        lambda: transaction_service.perform_transaction(db, account_id, transaction_data, current_user),
+        response_model=TransactionOut,
+    )
 
 
 @router.delete("/{transaction_id}")
@@ -1,39 +1,67 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from src.services.auth_services import get_current_user
 from src.models.user import User
-from src.schemas.user import UserCreate, UserOut, UserUpdate
-from src.services.user_services import UserServices
+from src.schemas.user import UserCreate, UserImportResult, UserOut, UserUpdate
+from src.services.password_services import password_hasher
+from src.services.user_services import UserServices, require_create_permission
+from src.services.user_import import detect_format, importable_roles, read_records
+from src.services.idempotency_services import IdempotencyServices, IdempotentRequest, idempotency_request
 from src.database import get_db
+from src.replicas import get_read_db
+from src.fast_json import FastJSONResponse
 
 router = APIRouter()
 user_services = UserServices()
+idempotency_services = IdempotencyServices()
 
 @router.post("/", response_model=UserOut)
-def create_user(
+async def create_user(
     user: UserCreate, 
     db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    idempotency: Optional[IdempotentRequest] = Depends(idempotency_request),
+):
+    # bcrypt is awaited here rather than waited on from a threadpool thread; only the database work runs there
+    require_create_permission(user, current_user)
+    hashed_password = await password_hasher.hash_async(user.password)
+
+    def handler():
+        db_user = user_services.get_user_by_email(db, user.email)
+        if db_user:
+            raise HTTPException(status_code=400, detail="Email already registered")
+        return user_services.create_user(db, user, current_user, hashed_password)
+
+    return await run_in_threadpool(idempotency_services.run, db, current_user, idempotency, handler, response_model=UserOut)
+
+
+@router.post("/import", response_model=UserImportResult)
+def import_users(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson; taken from the file name when omitted"),
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_user = user_services.get_user_by_email(db, user.email)
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    return user_services.create_user(db, user, current_user)
+    allowed_roles = importable_roles(current_user)
+    records = read_records(file.file, detect_format(file.filename, format))
+    return user_services.import_users(db, records, allowed_roles)
 
 
 @router.get("/", response_model=list[UserOut])
 def get_all_users(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    return user_services.get_all_users(db, current_user)
+    return FastJSONResponse(user_services.get_all_users(db, current_user))
 
 
 @router.get("/{user_id}", response_model=UserOut)
 def api_get_user(
     user_id: UUID, 
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     db_user = user_services.get_user(db, user_id, current_user)
@@ -43,13 +71,15 @@ def api_get_user(
 
 
 @router.patch("/{user_id}", response_model=UserOut)
-def update_user(
+async def update_user(
     user_id: UUID, 
     user_update: UserUpdate, 
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return user_services.update_user_service(user_id, user_update, db, current_user)
+    user = await run_in_threadpool(user_services.get_user_for_update, db, user_id, current_user)
+    hashed_password = await password_hasher.hash_async(user_update.password) if user_update.password else None
+    return await run_in_threadpool(user_services.update_user_service, user, user_update, db, current_user, hashed_password)
 
 
 @router.delete("/{user_id}")
@@ -0,0 +1,37 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library encoder produces the same JSON, only slower
+    orjson = None
+
+
+def _default(value):
+    # the same representations the response models give these types
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """For content that is already plain dicts and lists of the response model's fields: no model validation."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,33 @@
+import argparse
+import json
+import time
+from src.database import SessionLocal
+from src.models.user import UserRole
+from src.services.user_import import USER_IMPORT_CHUNK_SIZE, detect_format, import_hasher, read_records
+from src.services.user_services import UserServices
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-create users and their accounts from a CSV or NDJSON file.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("csv", "ndjson"), help="taken from the file extension when omitted")
+    parser.add_argument("--chunk-size", type=int, default=USER_IMPORT_CHUNK_SIZE)
+    parser.add_argument(
+        "--roles", default="CLIENT",
+        help="comma-separated roles the file may create (runs with database credentials, not as an API user)",
+    )
+    args = parser.parse_args()
+
+    allowed_roles = {UserRole(role.strip().upper()) for role in args.roles.split(",") if role.strip()}
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as stream:
+            records = read_records(stream, detect_format(args.path, args.format))
+            report = UserServices().import_users(db, records, allowed_roles, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+        import_hasher.shutdown()
+
+    report["elapsed_s"] = round(time.perf_counter() - start, 1)
+    print(json.dumps(report, indent=2))
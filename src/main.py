@@ -1,22 +1,52 @@
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
+from fastapi.responses import PlainTextResponse
 import os
 from src import router
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from src.database import get_db  
+from src.database import get_db, engine, USE_ASYNC_DB
+from src.db_pool import pool_stats
+from src.sql_profiler import SQL_PROFILING, SQLProfilerMiddleware
+from src.metrics import METRICS_ENABLED, PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, metrics, track_in_flight
+from src.rate_limit import RATE_LIMITING, RateLimitMiddleware, admission
+from src.replicas import ReadYourWritesMiddleware, replica_set
+from src.services.auth_services import require_ops_access, user_cache
+from src.services.statements import statement_cache
+from src.services.recipient_cache import recipient_cache
+from src.services.outbox import OUTBOX_DISPATCH, backlog_query, outbox_dispatcher
 
 load_dotenv()
 LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
 logging.basicConfig(level=LOG_LEVEL.upper())
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if OUTBOX_DISPATCH:
+        outbox_dispatcher.start()
+    replica_set.start()
+    yield
+    replica_set.stop()
+    outbox_dispatcher.stop()
+
+
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(track_in_flight)] if METRICS_ENABLED else [])
 
 # Include routers
 app.include_router(router.api_router)
 
+# only requests that got past admission can have written anything
+if replica_set:
+    app.add_middleware(ReadYourWritesMiddleware, replicas=replica_set)
+
+# innermost, so rejections still carry CORS headers and show up in metrics
+if RATE_LIMITING:
+    app.add_middleware(RateLimitMiddleware, control=admission)
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -26,6 +56,13 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+if SQL_PROFILING:
+    app.add_middleware(SQLProfilerMiddleware, registry=metrics if METRICS_ENABLED else None)
+
+# added last so it is outermost and also times CORS handling and streamed bodies
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+
 @app.get("/")
 def get_homepage():
     return {"Response": "This is the home page"}
@@ -38,3 +75,35 @@ def test_db_connection(db: Session = Depends(get_db)):
         return {"success": True, "result": result}
     except Exception as e:
         return {"success": False, "error": str(e)}
+
+
+@app.get("/pool-stats", dependencies=[Depends(require_ops_access)])
+def get_pool_stats():
+    stats = {"primary": pool_stats(engine)}
+    if USE_ASYNC_DB:
+        from src.async_database import async_engine
+        stats["async"] = pool_stats(async_engine.sync_engine)
+    if replica_set:
+        stats["replicas"] = replica_set.stats()
+    return stats
+
+
+@app.get("/cache-stats", dependencies=[Depends(require_ops_access)])
+def get_cache_stats():
+    return {"users": user_cache.stats(), "statements": statement_cache.stats(), "recipients": recipient_cache.stats()}
+
+
+@app.get("/admission-stats", dependencies=[Depends(require_ops_access)])
+def get_admission_stats():
+    return admission.stats()
+
+
+@app.get("/outbox-stats", dependencies=[Depends(require_ops_access)])
+def get_outbox_stats(db: Session = Depends(get_db)):
+    backlog = db.execute(backlog_query()).one()
+    return {"pending": backlog.pending, "dead": backlog.dead, **outbox_dispatcher.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False, dependencies=[Depends(require_ops_access)])
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
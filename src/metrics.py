@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from fastapi import Request
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "<unmatched>"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def latency_buckets() -> tuple:
+    configured = os.getenv("METRICS_LATENCY_BUCKETS")
+    if not configured:
+        return DEFAULT_LATENCY_BUCKETS
+    return tuple(sorted(float(bound) for bound in configured.split(",") if bound.strip()))
+
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+class MetricsRegistry:
+    """Per-process request metrics keyed by (method, route template)."""
+
+    def __init__(self, buckets: tuple = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._requests = defaultdict(int)
+        self._bucket_counts = defaultdict(lambda: [0] * (len(self.buckets) + 1))
+        self._latency_sum = defaultdict(float)
+        self._in_flight = defaultdict(int)
+        self._db_statements = defaultdict(int)
+        self._db_seconds = defaultdict(float)
+
+    def enter(self, method: str, route: str):
+        with self._lock:
+            self._in_flight[(method, route)] += 1
+
+    def leave(self, method: str, route: str):
+        with self._lock:
+            self._in_flight[(method, route)] -= 1
+
+    def observe(self, method: str, route: str, status: int, seconds: float):
+        key = (method, route)
+        # bucket i counts observations <= buckets[i]; the extra last slot is +Inf
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._requests[(method, route, status)] += 1
+            self._bucket_counts[key][index] += 1
+            self._latency_sum[key] += seconds
+
+    def observe_db(self, method: str, route: str, statements: int, seconds: float):
+        with self._lock:
+            self._db_statements[(method, route)] += statements
+            self._db_seconds[(method, route)] += seconds
+
+    def reset(self):
+        with self._lock:
+            self._db_statements.clear()
+            self._db_seconds.clear()
+            self._requests.clear()
+            self._bucket_counts.clear()
+            self._latency_sum.clear()
+            self._in_flight.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            requests = sorted(self._requests.items())
+            histograms = sorted((key, list(counts), self._latency_sum[key]) for key, counts in self._bucket_counts.items())
+            in_flight = sorted(self._in_flight.items())
+            db_statements = sorted(self._db_statements.items())
+            db_seconds = sorted(self._db_seconds.items())
+
+        lines = [
+            "# HELP http_requests_total Completed HTTP requests by route template and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in requests:
+            lines.append(f'http_requests_total{{method="{method}",route="{_label(route)}",status="{status}"}} {count}')
+
+        lines += [
+            "# HELP http_request_duration_seconds Time from receiving a request until its response body is sent.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), counts, total in histograms:
+            labels = f'method="{method}",route="{_label(route)}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{_format_bound(bound)}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {total}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {cumulative}")
+
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being handled.",
+            "# TYPE http_requests_in_flight gauge",
+        ]
+        for (method, route), count in in_flight:
+            lines.append(f'http_requests_in_flight{{method="{method}",route="{_label(route)}"}} {count}')
+
+        lines += [
+            "# HELP http_request_db_statements_total SQL statements issued while handling requests.",
+            "# TYPE http_request_db_statements_total counter",
+        ]
+        for (method, route), count in db_statements:
+            lines.append(f'http_request_db_statements_total{{method="{method}",route="{_label(route)}"}} {count}')
+        lines += [
+            "# HELP http_request_db_seconds_total Time spent executing SQL while handling requests.",
+            "# TYPE http_request_db_seconds_total counter",
+        ]
+        for (method, route), total in db_seconds:
+            lines.append(f'http_request_db_seconds_total{{method="{method}",route="{_label(route)}"}} {total}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry(latency_buckets())
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def route_template(scope) -> str:
+    # Rebuilt from the matched path parameters rather than read off the route object, whose path
+    # lacks the include_router prefix. Unknown paths share one label to keep the series bounded.
+    if "route" not in scope or "endpoint" not in scope:
+        return UNMATCHED_ROUTE
+    names = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    return "/".join(f"{{{names[segment]}}}" if segment in names else segment for segment in scope["path"].split("/"))
+
+
+async def track_in_flight(request: Request):
+    # a dependency rather than part of the middleware: the route is only known once routing ran
+    method, route = request.method, route_template(request.scope)
+    metrics.enter(method, route)
+    try:
+        yield
+    finally:
+        metrics.leave(method, route)
+
+
+class MetricsMiddleware:
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.registry.observe(scope["method"], route_template(scope), status, time.perf_counter() - start)
@@ -0,0 +1,50 @@
+import importlib
+import pkgutil
+from datetime import datetime, timezone
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime, select, insert
+from src.migrations import versions
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def load_migrations():
+    modules = [
+        importlib.import_module(f"{versions.__name__}.{name}")
+        for _, name, _ in pkgutil.iter_modules(versions.__path__)
+    ]
+    return sorted(modules, key=lambda module: module.VERSION)
+
+
+def applied_versions(engine) -> set:
+    with engine.begin() as conn:
+        schema_migrations.create(conn, checkfirst=True)
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def upgrade(engine, target: int = None) -> list:
+    done = applied_versions(engine)
+    applied = []
+    for migration in load_migrations():
+        if migration.VERSION in done or (target is not None and migration.VERSION > target):
+            continue
+        # one transaction per version: on PostgreSQL a failing step leaves no half-applied DDL
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(insert(schema_migrations).values(
+                version=migration.VERSION,
+                description=migration.DESCRIPTION,
+                applied_at=datetime.now(timezone.utc),
+            ))
+        applied.append(migration)
+    return applied
+
+
+def status(engine) -> list:
+    done = applied_versions(engine)
+    return [(migration.VERSION, migration.DESCRIPTION, migration.VERSION in done) for migration in load_migrations()]
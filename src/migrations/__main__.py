@@ -0,0 +1,17 @@
+import argparse
+from src.database import engine
+from src.migrations import status, upgrade
+
+parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+parser.add_argument("--status", action="store_true", help="list migrations without applying them")
+parser.add_argument("--target", type=int, default=None, help="stop after this version")
+args = parser.parse_args()
+
+if args.status:
+    for version, description, applied in status(engine):
+        print(f"{version:04d}  {'applied' if applied else 'pending'}  {description}")
+else:
+    applied = upgrade(engine, args.target)
+    for migration in applied:
+        print(f"Applied {migration.VERSION:04d} {migration.DESCRIPTION}")
+    print("Database is up to date." if not applied else f"{len(applied)} migration(s) applied.")
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Index, MetaData, Table, inspect, text
+
+
+def has_table(conn, table: str) -> bool:
+    return inspect(conn).has_table(table)
+
+
+def has_column(conn, table: str, column: str) -> bool:
+    return any(col["name"] == column for col in inspect(conn).get_columns(table))
+
+
+def has_index(conn, table: str, index: str) -> bool:
+    return any(ix["name"] == index for ix in inspect(conn).get_indexes(table))
+
+
+def add_created_at(conn, table: str):
+    if has_column(conn, table, "created_at"):
+        return
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN created_at TIMESTAMPTZ NOT NULL DEFAULT now()"))
+    else:
+        # SQLite cannot add a column with a non-constant default, so backfill it instead
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN created_at DATETIME"))
+        conn.execute(text(f"UPDATE {table} SET created_at = CURRENT_TIMESTAMP"))
+
+
+def add_column(conn, table: str, column: Column):
+    if has_column(conn, table, column.name):
+        return
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {column.type.compile(dialect=conn.dialect)}"))
+
+
+def create_index(conn, table: str, name: str, *columns: str):
+    if has_index(conn, table, name):
+        return
+    reflected = Table(table, MetaData(), autoload_with=conn)
+    Index(name, *(reflected.c[column] for column in columns)).create(conn)
@@ -0,0 +1,54 @@
+import uuid
+from sqlalchemy import MetaData, Table, Column, String, Float, Enum, ForeignKey, UUID
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+VERSION = 1
+DESCRIPTION = "initial schema (users, accounts, debit_cards, transactions)"
+
+# Frozen copy of the schema that src/init_db.py used to create. Later versions only ever
+# alter it, so this must not follow changes to src/models.
+metadata = MetaData()
+
+Table(
+    "users", metadata,
+    Column("id", PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+    Column("username", String, unique=True, index=True, nullable=False),
+    Column("email", String, unique=True, nullable=False),
+    Column("hashed_password", String, nullable=False),
+    Column("role", Enum("ADMIN", "BANKER", "CLIENT", name="userrole"), nullable=False),
+)
+
+Table(
+    "accounts", metadata,
+    Column("id", PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+    Column("iban", String, unique=True, nullable=False),
+    Column("balance", Float),
+    Column("currency", String),
+    Column("status", Enum("ACTIVE", "PENDING", "DECLINED", name="accountstatus")),
+    Column("type", Enum("CURRENT", "SAVINGS", name="accounttype"), nullable=False),
+    Column("owner_id", PG_UUID(as_uuid=True), ForeignKey("users.id"), nullable=False),
+)
+
+Table(
+    "debit_cards", metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+    Column("monthly_salary", Float, nullable=False),
+    Column("status", Enum("PENDING", "APPROVED", "DECLINED", name="cardstatus")),
+    Column("decline_reason", String, nullable=True),
+    Column("account_id", UUID(as_uuid=True), ForeignKey("accounts.id"), unique=True),
+)
+
+Table(
+    "transactions", metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+    Column("account_id", UUID(as_uuid=True), ForeignKey("accounts.id")),
+    Column("amount", Float, nullable=False),
+    Column("currency", String),
+    Column("type", Enum("DEBIT", "CREDIT", name="transactiontype"), nullable=False),
+    Column("description", String, nullable=True),
+)
+
+
+def upgrade(conn):
+    # databases created by init_db before migrations existed already have these tables
+    metadata.create_all(conn, checkfirst=True)
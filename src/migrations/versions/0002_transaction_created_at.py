@@ -0,0 +1,8 @@
+from src.migrations.operations import add_created_at
+
+VERSION = 2
+DESCRIPTION = "transactions.created_at for keyset pagination"
+
+
+def upgrade(conn):
+    add_created_at(conn, "transactions")
@@ -0,0 +1,21 @@
+from sqlalchemy import text
+
+VERSION = 3
+DESCRIPTION = "money columns as NUMERIC(18, 2)"
+
+MONEY_COLUMNS = [
+    ("accounts", "balance"),
+    ("transactions", "amount"),
+    ("debit_cards", "monthly_salary"),
+]
+
+
+def upgrade(conn):
+    # SQLite has no column types to change: NUMERIC and FLOAT share the same storage there
+    if conn.dialect.name != "postgresql":
+        return
+    for table, column in MONEY_COLUMNS:
+        conn.execute(text(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE NUMERIC(18, 2) "
+            f"USING ROUND({column}::numeric, 2)"
+        ))
@@ -0,0 +1,19 @@
+from src.migrations.operations import add_created_at, create_index
+
+VERSION = 4
+DESCRIPTION = "created_at on accounts and cards, indexes for the service access paths"
+
+
+def upgrade(conn):
+    add_created_at(conn, "accounts")
+    add_created_at(conn, "debit_cards")
+
+    # account history in time order: GET /transaction/?account_id=..., exports, statements
+    create_index(conn, "transactions", "ix_transactions_account_id_created_at", "account_id", "created_at")
+    # banker listing of all transactions, newest first
+    create_index(conn, "transactions", "ix_transactions_created_at_id", "created_at", "id")
+    # "my accounts" and the client visibility subqueries
+    create_index(conn, "accounts", "ix_accounts_owner_id", "owner_id")
+    # pending account and card review queues
+    create_index(conn, "accounts", "ix_accounts_status", "status")
+    create_index(conn, "debit_cards", "ix_debit_cards_status", "status")
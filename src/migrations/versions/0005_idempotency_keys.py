@@ -0,0 +1,25 @@
+from sqlalchemy import MetaData, Table, Column, DateTime, ForeignKey, Index, Integer, String, Text, UUID
+
+VERSION = 5
+DESCRIPTION = "idempotency_keys: stored responses for retried POST requests"
+
+metadata = MetaData()
+# users is only declared so the foreign key resolves; it already exists
+Table("users", metadata, Column("id", UUID(as_uuid=True), primary_key=True))
+
+idempotency_keys = Table(
+    "idempotency_keys", metadata,
+    Column("owner_id", UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("key", String(255), primary_key=True),
+    Column("request_hash", String(64), nullable=False),
+    Column("status_code", Integer, nullable=True),
+    Column("response_body", Text, nullable=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("expires_at", DateTime(timezone=True), nullable=False),
+    # the periodic purge of expired keys
+    Index("ix_idempotency_keys_expires_at", "expires_at"),
+)
+
+
+def upgrade(conn):
+    idempotency_keys.create(conn, checkfirst=True)
@@ -0,0 +1,24 @@
+from sqlalchemy import MetaData, Table, Column, BigInteger, DateTime, Index, Integer, String, Text
+
+VERSION = 6
+DESCRIPTION = "outbox_events: domain events committed with the change that caused them"
+
+metadata = MetaData()
+
+outbox_events = Table(
+    "outbox_events", metadata,
+    Column("id", BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True),
+    Column("event_type", String, nullable=False),
+    Column("aggregate_id", String, nullable=False),
+    Column("payload", Text, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("attempts", Integer, nullable=False, server_default="0"),
+    Column("next_attempt_at", DateTime(timezone=True), nullable=False),
+    Column("dispatched_at", DateTime(timezone=True), nullable=True),
+    Column("last_error", String, nullable=True),
+    Index("ix_outbox_events_pending", "dispatched_at", "next_attempt_at"),
+)
+
+
+def upgrade(conn):
+    outbox_events.create(conn, checkfirst=True)
@@ -0,0 +1,10 @@
+from sqlalchemy import UUID, Column, DateTime
+from src.migrations.operations import add_column
+
+VERSION = 7
+DESCRIPTION = "claimed_by and claim_expires_at on debit_cards for the banker review queue"
+
+
+def upgrade(conn):
+    add_column(conn, "debit_cards", Column("claimed_by", UUID(as_uuid=True), nullable=True))
+    add_column(conn, "debit_cards", Column("claim_expires_at", DateTime(timezone=True), nullable=True))
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Text
+from src.migrations.operations import add_column
+
+VERSION = 8
+DESCRIPTION = "response_headers on idempotency_keys, so replayed errors keep headers such as Retry-After"
+
+
+def upgrade(conn):
+    add_column(conn, "idempotency_keys", Column("response_headers", Text, nullable=True))
@@ -2,11 +2,15 @@ from .user import User, UserRole
 from .account import BankAccount
 from .card import DebitCard
 from .transaction import Transaction
+from .idempotency import IdempotencyKey
+from .outbox import OutboxEvent
 
 __all__ = [
     "User",
     "UserRole",
     "BankAccount",
     "DebitCard",
-    "Transaction"
+    "Transaction",
+    "IdempotencyKey",
+    "OutboxEvent",
 ]
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, String, Float, Enum, ForeignKey
+from sqlalchemy import Column, String, Numeric, Enum, ForeignKey, DateTime, Index
+from datetime import datetime, timezone
+from decimal import Decimal
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import enum
 import uuid
 from src.database import Base
+from src.schemas.money import MONEY_PRECISION, MONEY_SCALE
 
 class AccountStatus(str, enum.Enum):
     ACTIVE = "ACTIVE"
@@ -16,13 +19,18 @@ class AccountType(str, enum.Enum):
 
 class BankAccount(Base):
     __tablename__ = "accounts"
+    __table_args__ = (
+        Index("ix_accounts_owner_id", "owner_id"),
+        Index("ix_accounts_status", "status"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     iban = Column(String, unique=True, nullable=False)
-    balance = Column(Float, default=0.0)
+    balance = Column(Numeric(MONEY_PRECISION, MONEY_SCALE), default=Decimal("0.00"))
     currency = Column(String, default="EUR")
     status = Column(Enum(AccountStatus), default=AccountStatus.PENDING.value)
     type = Column(Enum(AccountType), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
 
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     owner = relationship("User", back_populates="accounts")
@@ -1,7 +1,9 @@
 import uuid
-from sqlalchemy import UUID, Column, Float, String, ForeignKey, Enum
+from datetime import datetime, timezone
+from sqlalchemy import UUID, Column, Numeric, String, ForeignKey, Enum, DateTime, Index
 from sqlalchemy.orm import relationship
 from src.database import Base
+from src.schemas.money import MONEY_PRECISION, MONEY_SCALE
 import enum
 
 class CardStatus(str, enum.Enum):
@@ -11,11 +13,18 @@ class CardStatus(str, enum.Enum):
 
 class DebitCard(Base):
     __tablename__ = "debit_cards"
+    __table_args__ = (
+        Index("ix_debit_cards_status", "status"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    monthly_salary = Column(Float, nullable=False)
+    monthly_salary = Column(Numeric(MONEY_PRECISION, MONEY_SCALE), nullable=False)
     status = Column(Enum(CardStatus), default=CardStatus.PENDING)
     decline_reason = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    # review queue lease; no foreign key, so a stale claim never blocks deleting the banker
+    claimed_by = Column(UUID(as_uuid=True), nullable=True)
+    claim_expires_at = Column(DateTime(timezone=True), nullable=True)
 
     account_id = Column(UUID(as_uuid=True), ForeignKey("accounts.id"), unique=True)
     linked_account = relationship("BankAccount", back_populates="card")
\ No newline at end of file
@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+from sqlalchemy import UUID, Column, DateTime, ForeignKey, Index, Integer, String, Text
+from src.database import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    # NULL while the first request with this key is still running
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    # JSON object of the headers an error response carried, replayed with it
+    response_headers = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    expires_at = Column(DateTime(timezone=True), nullable=False)
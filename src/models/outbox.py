@@ -0,0 +1,21 @@
+from datetime import datetime, timezone
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, Text
+from src.database import Base
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # the dispatcher's scan for undelivered events that are due
+        Index("ix_outbox_events_pending", "dispatched_at", "next_attempt_at"),
+    )
+
+    # SQLite only autoincrements INTEGER primary keys
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    event_type = Column(String, nullable=False)
+    aggregate_id = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    dispatched_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(String, nullable=True)
@@ -1,7 +1,9 @@
 import uuid
-from sqlalchemy import UUID, Column, Float, String, ForeignKey, Enum
+from datetime import datetime, timezone
+from sqlalchemy import UUID, Column, Numeric, String, ForeignKey, Enum, DateTime, Index
 from sqlalchemy.orm import relationship
 from src.database import Base
+from src.schemas.money import MONEY_PRECISION, MONEY_SCALE
 import enum
 
 class TransactionType(str, enum.Enum):
@@ -15,12 +17,17 @@ class Currency(str, enum.Enum):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index("ix_transactions_account_id_created_at", "account_id", "created_at"),
+        Index("ix_transactions_created_at_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     account_id = Column(UUID(as_uuid=True), ForeignKey("accounts.id"))
-    amount = Column(Float, nullable=False)
+    amount = Column(Numeric(MONEY_PRECISION, MONEY_SCALE), nullable=False)
     currency = Column(String, default=Currency.EURO)
     type = Column(Enum(TransactionType), nullable=False)
     description = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
 
-    account = relationship("BankAccount", back_populates="transactions")
\ No newline at end of file
+    account = relationship("BankAccount", back_populates="transactions")
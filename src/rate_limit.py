@@ -0,0 +1,207 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from fastapi import HTTPException
+from src.models.user import UserRole
+from src.services.auth_services import decode_token_subject, user_cache
+
+RATE_LIMITING = os.getenv("RATE_LIMITING", "true").lower() in ("1", "true", "yes")
+# requests handled at once by this worker before new ones are shed with 503; 0 disables the cap
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "200"))
+RATE_LIMIT_MAX_PRINCIPALS = int(os.getenv("RATE_LIMIT_MAX_PRINCIPALS", "100000"))
+# only behind a proxy that sets it; otherwise clients could pick their own bucket
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() in ("1", "true", "yes")
+# observability keeps working when the service is saturated
+EXEMPT_PATHS = {"/metrics", "/pool-stats", "/cache-stats", "/admission-stats", "/outbox-stats"}
+
+# "<principal kind>=<requests>/<seconds>" per route class; a kind left out is not limited
+DEFAULT_RATE_LIMITS = {
+    "login": "anonymous=10/60,client=10/60,staff=10/60",
+    "transfer": "anonymous=30/60,client=30/60,staff=300/60",
+    "write": "anonymous=30/60,client=60/60,staff=600/60",
+    "read": "anonymous=120/60,client=300/60,staff=3000/60",
+}
+
+
+def parse_limits(spec: str) -> dict:
+    limits = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        kind, rate = item.split("=")
+        requests, seconds = rate.split("/")
+        limits[kind.strip()] = (int(requests), float(seconds))
+    return limits
+
+
+def rate_limits() -> dict:
+    return {
+        route_class: parse_limits(os.getenv(f"RATE_LIMIT_{route_class.upper()}", default))
+        for route_class, default in DEFAULT_RATE_LIMITS.items()
+    }
+
+
+def route_class(method: str, path: str) -> str:
+    if path.startswith("/login"):
+        return "login"
+    if method in ("GET", "HEAD"):
+        return "read"
+    if method == "POST" and path.startswith("/transaction"):
+        return "transfer"
+    return "write"
+
+
+def _header(scope, name: bytes):
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def principal(scope) -> tuple[str, str]:
+    """(kind, key) the request is limited as: a verified token subject, else the client address."""
+    authorization = _header(scope, b"authorization")
+    if authorization and authorization[:7].lower() == "bearer ":
+        try:
+            username, role = decode_token_subject(authorization[7:])
+        except HTTPException:
+            username = None
+        if username is not None:
+            # the signed role claim works on a cold worker; a cached user is fresher when this worker has one
+            cached = user_cache.peek(username)
+            if cached is not None:
+                role = cached.role
+            kind = "staff" if role is not None and role != UserRole.CLIENT else "client"
+            return kind, f"user:{username}"
+
+    address = None
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = _header(scope, b"x-forwarded-for")
+        address = forwarded.split(",")[0].strip() if forwarded else None
+    if address is None:
+        address = scope["client"][0] if scope.get("client") else "unknown"
+    return "anonymous", f"ip:{address}"
+
+
+class RateLimiter:
+    """Token buckets per (route class, principal): `requests` burst, refilled over `seconds`."""
+
+    def __init__(self, limits: dict, max_principals: int = RATE_LIMIT_MAX_PRINCIPALS):
+        self.limits = limits
+        self.max_principals = max_principals
+        # (route class, key) -> [tokens, last refill]; least recently used buckets are dropped first
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.limited = Counter()
+
+    def acquire(self, route_class: str, kind: str, key: str, now: float = None) -> float:
+        """Take a token and return 0, or return the seconds until one is available."""
+        limit = self.limits.get(route_class, {}).get(kind)
+        if limit is None:
+            return 0.0
+        requests, seconds = limit
+        if requests <= 0:
+            self.limited[(route_class, kind)] += 1
+            return seconds
+        rate = requests / seconds
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            bucket = self._buckets.get((route_class, key))
+            if bucket is None:
+                bucket = self._buckets[(route_class, key)] = [float(requests), now]
+                while len(self._buckets) > self.max_principals:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end((route_class, key))
+                bucket[0] = min(float(requests), bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            self.limited[(route_class, kind)] += 1
+            return (1 - bucket[0]) / rate
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+            self.limited.clear()
+
+
+class AdmissionControl:
+    def __init__(self, limiter: RateLimiter, max_concurrent: int = MAX_CONCURRENT_REQUESTS):
+        self.limiter = limiter
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self.shed = 0
+        self._lock = threading.Lock()
+
+    def enter(self) -> bool:
+        with self._lock:
+            if self.max_concurrent > 0 and self.in_flight >= self.max_concurrent:
+                self.shed += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "max_concurrent": self.max_concurrent,
+                "shed": self.shed,
+                "rate_limited": {
+                    f"{route_class}:{kind}": count for (route_class, kind), count in sorted(self.limiter.limited.items())
+                },
+            }
+
+
+admission = AdmissionControl(RateLimiter(rate_limits()))
+
+
+async def _reject(send, status: int, detail: str, retry_after: float):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, control: AdmissionControl):
+        self.app = app
+        self.control = control
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        # cheap rejections first: a limited client must not take a concurrency slot
+        kind, key = principal(scope)
+        retry_after = self.control.limiter.acquire(route_class(scope["method"], scope["path"]), kind, key)
+        if retry_after:
+            await _reject(send, 429, "Too many requests", retry_after)
+            return
+
+        if not self.control.enter():
+            await _reject(send, 503, "Server is busy, retry shortly", 1)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.control.leave()
@@ -0,0 +1,192 @@
+import itertools
+import logging
+import os
+import threading
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker
+from src.cache import TTLCache
+from src.database import get_db
+from src.db_pool import InstrumentedQueuePool, pool_options, pool_stats
+from src.rate_limit import principal
+
+logger = logging.getLogger(__name__)
+
+# comma-separated; empty sends every read to the primary
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL", "5"))
+REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", "10"))
+# after a write, the same principal reads from the primary for this long so it sees its own change
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+REPLICA_STICKY_MAX_PRINCIPALS = int(os.getenv("REPLICA_STICKY_MAX_PRINCIPALS", "100000"))
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# zero while the replica has replayed everything it received, otherwise the age of the last replayed commit
+POSTGRES_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def replication_lag(conn) -> float:
+    if conn.dialect.name == "postgresql":
+        return float(conn.execute(POSTGRES_LAG_QUERY).scalar())
+    conn.execute(text("SELECT 1"))
+    return 0.0
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = create_engine(url, poolclass=InstrumentedQueuePool, **pool_options())
+        self.sessions = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        # assumed up until a check or a failed checkout says otherwise
+        self.healthy = True
+        self.lag = None
+        self.last_error = None
+
+    def check(self, max_lag: float):
+        try:
+            with self.engine.connect() as conn:
+                self.lag = replication_lag(conn)
+        except DBAPIError as exc:
+            self.mark_down(exc)
+            return
+        self.healthy = self.lag <= max_lag
+        self.last_error = None if self.healthy else f"lag {self.lag:.1f}s over {max_lag:g}s"
+
+    def mark_down(self, exc: Exception):
+        if self.healthy:
+            logger.warning("Replica %s is unavailable: %s", self.display_url, exc)
+        self.healthy = False
+        self.last_error = str(exc).splitlines()[0][:200]
+
+    @property
+    def display_url(self) -> str:
+        return make_url(self.url).render_as_string(hide_password=True)
+
+    def stats(self) -> dict:
+        return {"url": self.display_url, "healthy": self.healthy, "lag_s": self.lag, "last_error": self.last_error,
+                **pool_stats(self.engine)}
+
+
+class ReplicaSet:
+    """Round-robin over healthy replicas, checked from a background thread, with read-your-writes stickiness."""
+
+    def __init__(self, replicas: list, health_interval: float = REPLICA_HEALTH_INTERVAL, max_lag: float = REPLICA_MAX_LAG,
+                 sticky_seconds: float = REPLICA_STICKY_SECONDS):
+        self.replicas = replicas
+        self.health_interval = health_interval
+        self.max_lag = max_lag
+        self.recent_writers = TTLCache(maxsize=REPLICA_STICKY_MAX_PRINCIPALS, ttl=sticky_seconds)
+        self._next = itertools.count()
+        self._stopping = threading.Event()
+        self._thread = None
+        # pick() runs on threadpool threads; the counters need it to stay exact
+        self._lock = threading.Lock()
+        self.replica_reads = 0
+        self.primary_reads = 0
+
+    def __bool__(self):
+        return bool(self.replicas)
+
+    def wrote(self, key: str):
+        self.recent_writers.set(key, True)
+
+    def pick(self, key: str):
+        """The replica to read from, or None to read from the primary."""
+        if self.recent_writers.peek(key) is None:
+            healthy = [replica for replica in self.replicas if replica.healthy]
+            if healthy:
+                with self._lock:
+                    self.replica_reads += 1
+                return healthy[next(self._next) % len(healthy)]
+        with self._lock:
+            self.primary_reads += 1
+        return None
+
+    def check(self):
+        for replica in self.replicas:
+            replica.check(self.max_lag)
+
+    def start(self):
+        if self._thread is not None or not self.replicas:
+            return
+        self.check()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-health", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while not self._stopping.wait(self.health_interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Replica health check failed")
+
+    def stats(self) -> dict:
+        with self._lock:
+            replica_reads, primary_reads = self.replica_reads, self.primary_reads
+        return {
+            "replica_reads": replica_reads,
+            "primary_reads": primary_reads,
+            "sticky_principals": len(self.recent_writers),
+            "replicas": [replica.stats() for replica in self.replicas],
+        }
+
+
+replica_set = ReplicaSet([Replica(url) for url in DATABASE_REPLICA_URLS])
+
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """A session for endpoints that only read: a replica when one is usable, otherwise the request's primary session."""
+    replica = replica_set.pick(principal(request.scope)[1]) if replica_set else None
+    read_db = None
+    if replica is not None:
+        read_db = replica.sessions()
+        try:
+            # connect now, so a replica that went away falls back to the primary instead of failing the request
+            read_db.connection()
+        except DBAPIError as exc:
+            read_db.close()
+            replica.mark_down(exc)
+            read_db = None
+
+    if read_db is None:
+        yield db
+        return
+    try:
+        yield read_db
+    finally:
+        read_db.close()
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app, replicas: ReplicaSet):
+        self.app = app
+        self.replicas = replicas
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        key = principal(scope)[1]
+
+        async def send_wrapper(message):
+            # before the response leaves, so the client's next read cannot overtake it
+            if message["type"] == "http.response.start":
+                self.replicas.wrote(key)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
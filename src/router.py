@@ -1,10 +1,25 @@
 from fastapi import APIRouter
-from src.endpoints import user_endpoints, account_endpoints, card_endpoints, transaction_endpoints, auth_endpoints
+from src.database import USE_ASYNC_DB
 
-api_router = APIRouter()
 
-api_router.include_router(user_endpoints.router, prefix="/users", tags=["USERS"])
-api_router.include_router(account_endpoints.router, prefix="/account", tags=["ACCOUNT"])
-api_router.include_router(card_endpoints.router, prefix="/card", tags=["CARD"])
-api_router.include_router(transaction_endpoints.router, prefix="/transaction", tags=["TRANSACTION"])
-api_router.include_router(auth_endpoints.router, prefix="/login", tags=["LOGIN"])
+def build_api_router(use_async: bool = USE_ASYNC_DB) -> APIRouter:
+    if use_async:
+        # imported lazily so sync deployments don't need an async driver installed
+        from src.endpoints import async_user_endpoints as user_endpoints
+        from src.endpoints import async_account_endpoints as account_endpoints
+        from src.endpoints import async_card_endpoints as card_endpoints
+        from src.endpoints import async_transaction_endpoints as transaction_endpoints
+        from src.endpoints import async_auth_endpoints as auth_endpoints
+    else:
+        from src.endpoints import user_endpoints, account_endpoints, card_endpoints, transaction_endpoints, auth_endpoints
+
+    router = APIRouter()
+    router.include_router(user_endpoints.router, prefix="/users", tags=["USERS"])
+    router.include_router(account_endpoints.router, prefix="/account", tags=["ACCOUNT"])
+    router.include_router(card_endpoints.router, prefix="/card", tags=["CARD"])
+    router.include_router(transaction_endpoints.router, prefix="/transaction", tags=["TRANSACTION"])
+    router.include_router(auth_endpoints.router, prefix="/login", tags=["LOGIN"])
+    return router
+
+
+api_router = build_api_router()
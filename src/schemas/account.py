@@ -1,25 +1,87 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import List, Optional
+from datetime import date, datetime
 from uuid import UUID
 from src.models.account import AccountStatus, AccountType
+from src.models.transaction import TransactionType
+from src.schemas.money import Money
 
 
 class AccountCreate(BaseModel):
     currency: Optional[str] = "EUR"
     type: AccountType
 
+MAX_BULK_ACCOUNTS = 1000
+
+class AccountBulkItem(AccountCreate):
+    owner_id: UUID
+
+class AccountBulkCreate(BaseModel):
+    accounts: List[AccountBulkItem] = Field(..., min_length=1, max_length=MAX_BULK_ACCOUNTS)
+
 class AccountUpdate(BaseModel):
-    balance: Optional[float] = None
+    balance: Optional[Money] = None
     status: Optional[AccountStatus] = None
     type: Optional[AccountType] = None
 
+MAX_BULK_STATUS_UPDATES = 5000
+
+class PendingAccountFilter(BaseModel):
+    owner_id: Optional[UUID] = None
+    type: Optional[AccountType] = None
+    currency: Optional[str] = None
+    created_before: Optional[datetime] = None
+
+class AccountBulkStatus(BaseModel):
+    status: AccountStatus
+    account_ids: Optional[List[UUID]] = Field(None, min_length=1, max_length=MAX_BULK_STATUS_UPDATES)
+    filter: Optional[PendingAccountFilter] = None
+
+    @model_validator(mode="after")
+    def one_selection(self):
+        if (self.account_ids is None) == (self.filter is None):
+            raise ValueError("Provide either account_ids or filter")
+        return self
+
+class AccountStatusResult(BaseModel):
+    account_id: UUID
+    success: bool
+    status_code: int
+    detail: Optional[str] = None
+
+class AccountBulkStatusOut(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[AccountStatusResult]
+
 class AccountOut(BaseModel):
     id: UUID
     iban: str
-    balance: float
+    balance: Money
     currency: str
     status: AccountStatus
     type: AccountType
     owner_id: UUID
 
     model_config = ConfigDict(from_attributes=True)
+
+class StatementLine(BaseModel):
+    id: UUID
+    type: TransactionType
+    amount: Money
+    description: Optional[str] = None
+    created_at: datetime
+    running_balance: Money
+
+class StatementOut(BaseModel):
+    account_id: UUID
+    iban: str
+    currency: str
+    period_from: date
+    period_to: date
+    opening_balance: Money
+    total_credits: Money
+    total_debits: Money
+    closing_balance: Money
+    transaction_count: int
+    lines: List[StatementLine]
@@ -1,11 +1,15 @@
-from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
 from src.models.card import CardStatus
-from typing import Optional
+from src.schemas.money import Money
+from typing import List, Optional
 from uuid import UUID
 
+MAX_BATCH_REVIEWS = 500
+
 
 class CardBase(BaseModel):
-    monthly_salary: float
+    monthly_salary: Money
     account_id: UUID
 
 class CardCreate(CardBase):
@@ -21,3 +25,28 @@ class CardOut(CardBase):
 class CardReview(BaseModel):
     status: CardStatus
     decline_reason: Optional[str] = None
+
+class CardReviewItem(CardReview):
+    card_id: UUID
+
+class CardBatchReview(BaseModel):
+    reviews: List[CardReviewItem] = Field(..., min_length=1, max_length=MAX_BATCH_REVIEWS)
+
+class CardReviewResult(BaseModel):
+    index: int
+    card_id: UUID
+    success: bool
+    status_code: int
+    detail: Optional[str] = None
+
+class CardBatchReviewOut(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[CardReviewResult]
+
+class CardClaimOut(CardBase):
+    id: UUID
+    created_at: Optional[datetime] = None
+    claim_expires_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
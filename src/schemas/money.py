@@ -0,0 +1,15 @@
+from decimal import Decimal
+from typing import Annotated
+from pydantic import Field, PlainSerializer
+
+MONEY_PRECISION = 18
+MONEY_SCALE = 2
+
+# Amounts are exact Decimals in Python and NUMERIC(18, 2) in the database. JSON keeps emitting
+# plain numbers so existing clients don't break; two-decimal values print back exactly.
+Money = Annotated[
+    Decimal,
+    Field(max_digits=MONEY_PRECISION, decimal_places=MONEY_SCALE),
+    PlainSerializer(float, return_type=float, when_used="json"),
+]
+PositiveMoney = Annotated[Money, Field(gt=0)]
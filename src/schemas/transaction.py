@@ -1,14 +1,60 @@
-from pydantic import BaseModel, UUID4, ConfigDict
+import enum
+from datetime import datetime
+from pydantic import BaseModel, UUID4, ConfigDict, Field, field_validator
+from typing import List, Optional
+from src.models.transaction import TransactionType
+from src.schemas.money import Money, PositiveMoney
 
 class TransactionCreate(BaseModel):
     recipient_iban: str
-    amount: float
+    amount: PositiveMoney
+
+    @field_validator("recipient_iban")
+    @classmethod
+    def normalize_iban(cls, value: str) -> str:
+        # IBANs are often written in groups of four; they are stored without spaces, upper case
+        return value.replace(" ", "").upper()
+
+MAX_BATCH_TRANSFERS = 5000
+
+class BatchTransferItem(TransactionCreate):
+    sender_account_id: Optional[UUID4] = None
+
+class BatchTransferCreate(BaseModel):
+    sender_account_id: Optional[UUID4] = None
+    transfers: List[BatchTransferItem] = Field(..., min_length=1, max_length=MAX_BATCH_TRANSFERS)
+
+class BatchTransferResult(BaseModel):
+    index: int
+    success: bool
+    transaction_id: Optional[UUID4] = None
+    status_code: int
+    detail: Optional[str] = None
+
+class BatchTransferOut(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BatchTransferResult]
 
 class TransactionOut(BaseModel):
     id: UUID4
     account_id: UUID4
-    amount: float
+    amount: Money
     currency: str
     type: str
+    created_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+class TransactionFilter(BaseModel):
+    account_id: Optional[UUID4] = None
+    type: Optional[TransactionType] = None
+    currency: Optional[str] = None
+    min_amount: Optional[Money] = None
+    max_amount: Optional[Money] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+class ExportFormat(str, enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
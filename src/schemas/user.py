@@ -1,7 +1,8 @@
-from pydantic import BaseModel, ConfigDict, EmailStr
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_validator
+from typing import List, Optional
 from uuid import UUID
 from src.models.user import UserRole
+from src.schemas.account import AccountCreate
 
 class UserCreate(BaseModel):
     username: str
@@ -21,4 +22,29 @@ class UserUpdate(BaseModel):
     username: Optional[str] = None
     email: Optional[EmailStr] = None
     password: Optional[str] = None
-    role: Optional[UserRole] = None
\ No newline at end of file
+    role: Optional[UserRole] = None
+
+class UserImportRow(BaseModel):
+    username: str = Field(..., min_length=1)
+    email: EmailStr
+    # exactly one of the two; a bcrypt hash carried over from another system is stored as is
+    password: Optional[str] = Field(None, min_length=1)
+    hashed_password: Optional[str] = None
+    role: UserRole = UserRole.CLIENT
+    accounts: List[AccountCreate] = []
+
+    @model_validator(mode="after")
+    def check_password(self):
+        if (self.password is None) == (self.hashed_password is None):
+            raise ValueError("Provide either password or hashed_password")
+        return self
+
+class UserImportError(BaseModel):
+    line: int
+    error: str
+
+class UserImportResult(BaseModel):
+    imported: int
+    accounts: int
+    failed: int
+    errors: List[UserImportError]
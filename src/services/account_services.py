@@ -1,11 +1,108 @@
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from src.models import BankAccount
-from src.schemas.account import AccountCreate, AccountUpdate
+from src.schemas.account import (
+    MAX_BULK_STATUS_UPDATES, AccountBulkItem, AccountBulkStatus, AccountBulkStatusOut, AccountCreate, AccountStatusResult,
+    AccountUpdate,
+)
 from uuid import UUID
-import random, string
+from decimal import Decimal
+from datetime import date
+from datetime import datetime, timezone
+from uuid import uuid4
 from src.models.user import User, UserRole
 from src.models.account import AccountStatus
+from src.services.scoped_queries import account_lookup, scope_accounts
+from src.services.projections import ACCOUNT_LIST_COLUMNS, as_dicts
+from src.services.recipient_cache import invalidate_recipients
+from src.models.outbox import OutboxEvent
+from src.services.outbox import outbox_dispatcher, status_event
+from src.services.statements import (
+    build_statement, invalidate_statements, is_closed_period, statement_bounds, statement_cache,
+    statement_query,
+)
+from src.services.iban_allocator import iban_allocator
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+# a fresh, table-checked IBAN per attempt; only another worker inserting the same one in between can collide
+IBAN_INSERT_ATTEMPTS = 3
+
+
+def is_iban_conflict(exc: IntegrityError) -> bool:
+    return "iban" in str(exc.orig).lower()
+
+
+def new_account_rows(items: list[AccountBulkItem], ibans: list[str], status) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": uuid4(),
+            "iban": iban,
+            "balance": Decimal("0.00"),
+            "currency": item.currency,
+            "status": status,
+            "type": item.type,
+            "owner_id": item.owner_id,
+            "created_at": now,
+        }
+        for item, iban in zip(items, ibans)
+    ]
+
+def require_account_banker(authenticated_user: User):
+    if authenticated_user.role != UserRole.BANKER:
+        raise HTTPException(status_code=403, detail="Only bankers can update account")
+
+
+def require_review_status(status: AccountStatus):
+    if status not in (AccountStatus.ACTIVE, AccountStatus.DECLINED):
+        raise HTTPException(status_code=400, detail="Pending accounts can only be activated or declined")
+
+
+def pending_selection(selection: AccountBulkStatus):
+    if selection.account_ids is not None:
+        return BankAccount.id.in_(selection.account_ids)
+
+    conditions = [BankAccount.status == AccountStatus.PENDING]
+    pending = selection.filter
+    if pending.owner_id is not None:
+        conditions.append(BankAccount.owner_id == pending.owner_id)
+    if pending.type is not None:
+        conditions.append(BankAccount.type == pending.type)
+    if pending.currency is not None:
+        conditions.append(BankAccount.currency == pending.currency)
+    if pending.created_before is not None:
+        conditions.append(BankAccount.created_at < pending.created_before)
+    # oldest first and bounded; the caller repeats the request until nothing is left
+    return BankAccount.id.in_(
+        select(BankAccount.id).where(*conditions).order_by(BankAccount.created_at, BankAccount.id).limit(MAX_BULK_STATUS_UPDATES)
+    )
+
+
+def bulk_status_statement(selection: AccountBulkStatus):
+    # the status guard is re-checked per row under its lock, so a concurrent review cannot be overwritten
+    return (
+        update(BankAccount)
+        .where(BankAccount.status == AccountStatus.PENDING, pending_selection(selection))
+        .values(status=selection.status)
+        .returning(BankAccount.id, BankAccount.iban)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def bulk_status_results(requested_ids: list, updated_ids: set, current_statuses: dict) -> AccountBulkStatusOut:
+    results = []
+    for account_id in requested_ids:
+        if account_id in updated_ids:
+            results.append(AccountStatusResult(account_id=account_id, success=True, status_code=200))
+        elif account_id not in current_statuses:
+            results.append(AccountStatusResult(account_id=account_id, success=False, status_code=404, detail="Account not found"))
+        else:
+            status = getattr(current_statuses[account_id], "value", current_statuses[account_id])
+            results.append(AccountStatusResult(account_id=account_id, success=False, status_code=400, detail=f"Account is {status}, not PENDING"))
+    succeeded = len(updated_ids)
+    return AccountBulkStatusOut(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
 
 class AccountServices:
     def __init__(self):
@@ -13,20 +110,40 @@ class AccountServices:
 
 
     def create_account(self, db: Session, owner_id: UUID, account: AccountCreate, status = AccountStatus.ACTIVE.value) -> BankAccount:
-        db_account = BankAccount(
-            iban=self.generate_random_iban(),
-            currency=account.currency,
-            type=account.type,
-            owner_id=owner_id,
-            balance=0.0,
-            status=status
-        )
-        db.add(db_account)
-        db.commit()
+        for attempt in range(IBAN_INSERT_ATTEMPTS):
+            db_account = BankAccount(
+                iban=iban_allocator.allocate_one(db),
+                currency=account.currency,
+                type=account.type,
+                owner_id=owner_id,
+                balance=Decimal("0.00"),
+                status=status
+            )
+            db.add(db_account)
+            try:
+                db.commit()
+                break
+            except IntegrityError as exc:
+                db.rollback()
+                if not is_iban_conflict(exc) or attempt == IBAN_INSERT_ATTEMPTS - 1:
+                    raise
         db.refresh(db_account)
         return db_account
 
 
+    def create_accounts(self, db: Session, items: list[AccountBulkItem], status = AccountStatus.ACTIVE.value) -> list[dict]:
+        for attempt in range(IBAN_INSERT_ATTEMPTS):
+            rows = new_account_rows(items, iban_allocator.allocate(db, len(items)), status)
+            try:
+                db.execute(insert(BankAccount), rows)
+                db.commit()
+                return rows
+            except IntegrityError as exc:
+                db.rollback()
+                if not is_iban_conflict(exc) or attempt == IBAN_INSERT_ATTEMPTS - 1:
+                    raise
+
+
     def request_new_account(self, db: Session, owner_id: UUID, account: AccountCreate, authenticated_user: User) -> BankAccount:
         if authenticated_user.role != UserRole.CLIENT:
             raise HTTPException(status_code=403, detail="Only clients can request new accounts")
@@ -37,11 +154,12 @@ class AccountServices:
 
 
     def get_account(self, db: Session, account_id: UUID, authenticated_user: User) -> BankAccount:
-        acc = db.query(BankAccount).filter(BankAccount.id == account_id).first()
-        if not acc:
+        row = db.execute(account_lookup(account_id, authenticated_user)).first()
+        if not row:
             raise HTTPException(status_code=404, detail="Account not found")
 
-        if authenticated_user.role == UserRole.CLIENT and acc.owner_id != authenticated_user.id:
+        acc, visible = row
+        if not visible:
             raise HTTPException(status_code=403, detail="Access denied")
 
         return acc
@@ -50,7 +168,23 @@ class AccountServices:
     def get_all_accounts(self, db: Session, authenticated_user: User):
         if authenticated_user.role == UserRole.CLIENT:
             raise HTTPException(status_code=403, detail="Access denied")
-        return db.query(BankAccount).all()
+        return as_dicts(db.execute(scope_accounts(select(*ACCOUNT_LIST_COLUMNS), authenticated_user)))
+
+
+    def get_statement(self, db: Session, account_id: UUID, date_from: date, date_to: date, authenticated_user: User) -> dict:
+        start, end = statement_bounds(date_from, date_to)
+        self.get_account(db, account_id, authenticated_user)
+
+        key = (account_id, date_from, date_to)
+        cached = statement_cache.get(key)
+        if cached is not None:
+            return cached
+
+        rows = db.execute(statement_query(account_id, start, end)).all()
+        statement = build_statement(account_id, date_from, date_to, rows)
+        if is_closed_period(end):
+            statement_cache.set(key, statement)
+        return statement
     
 
     def update_account(self, db: Session, account_id: UUID, account_update: AccountUpdate, authenticated_user: User) -> BankAccount:
@@ -64,9 +198,14 @@ class AccountServices:
         for var, value in vars(account_update).items():
             if value is not None:
                 setattr(account, var, value)
+        if account_update.status is not None:
+            db.execute(insert(OutboxEvent), [status_event("account", account_id, account_update.status)])
 
         db.commit()
         db.refresh(account)
+        if account_update.status is not None:
+            invalidate_recipients(account.iban)
+            outbox_dispatcher.notify()
         return account
 
 
@@ -79,12 +218,36 @@ class AccountServices:
             raise HTTPException(status_code=403, detail="Only bankers can update account")
 
         account.status = status
+        db.execute(insert(OutboxEvent), [status_event("account", account_id, status)])
 
         db.commit()
+        outbox_dispatcher.notify()
         db.refresh(account)
+        invalidate_recipients(account.iban)
         return account
     
 
+    def bulk_update_status(self, db: Session, selection: AccountBulkStatus, authenticated_user: User) -> AccountBulkStatusOut:
+        require_account_banker(authenticated_user)
+        require_review_status(selection.status)
+
+        updated = db.execute(bulk_status_statement(selection)).all()
+        if updated:
+            db.execute(insert(OutboxEvent), [status_event("account", row.id, selection.status) for row in updated])
+        updated_ids = {row.id for row in updated}
+        requested_ids = list(dict.fromkeys(selection.account_ids)) if selection.account_ids is not None else [row.id for row in updated]
+        missed = [account_id for account_id in requested_ids if account_id not in updated_ids]
+        current_statuses = {}
+        if missed:
+            current_statuses = dict(db.execute(select(BankAccount.id, BankAccount.status).where(BankAccount.id.in_(missed))).all())
+        db.commit()
+
+        if updated:
+            outbox_dispatcher.notify()
+            invalidate_recipients(*(row.iban for row in updated))
+        return bulk_status_results(requested_ids, updated_ids, current_statuses)
+    
+
     def delete_account(self, db: Session, account_id: UUID, authenticated_user: User):
         account = db.query(BankAccount).filter(BankAccount.id == account_id).first()
         if not account:
@@ -93,33 +256,9 @@ class AccountServices:
         if authenticated_user.role == UserRole.CLIENT:
             raise HTTPException(status_code=403, detail="Only bankers or admins can delete accounts")
 
+        iban = account.iban
         db.delete(account)
         db.commit()
+        invalidate_statements(account_id)
+        invalidate_recipients(iban)
         return {"detail": f"Account {account_id} deleted"}
-
-
-    def generate_random_iban(self):
-        EURO_IBAN_FORMATS = {
-                "DE": 22,  
-                "FR": 27,  
-                "ES": 24,  
-                "IT": 27,  
-                "NL": 18,  
-        }
-        country = random.choice(list(EURO_IBAN_FORMATS.keys()))
-        iban_length = EURO_IBAN_FORMATS[country]
-
-        bban_length = iban_length - 4
-        bban = ''.join(random.choices(string.ascii_uppercase + string.digits, k=bban_length))
-        temp_iban = country + '00' + bban
-
-        def calculate_check_digits(iban_str):
-            rearranged = iban_str[4:] + iban_str[:4]
-
-            numeric_iban = ''.join(str(int(ch, 36)) if ch.isalpha() else ch for ch in rearranged)
-            remainder = int(numeric_iban) % 97
-            check_digits = 98 - remainder
-            return f"{check_digits:02d}"
-
-        check_digits = calculate_check_digits(temp_iban)
-        return country + check_digits + bban
\ No newline at end of file
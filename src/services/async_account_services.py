@@ -0,0 +1,185 @@
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.models import BankAccount
+from src.schemas.account import AccountBulkItem, AccountBulkStatus, AccountBulkStatusOut, AccountCreate, AccountUpdate
+from uuid import UUID
+from decimal import Decimal
+from datetime import date
+from src.models.user import User, UserRole
+from src.models.account import AccountStatus
+from src.services.account_services import (
+    IBAN_INSERT_ATTEMPTS, bulk_status_results, bulk_status_statement, is_iban_conflict, new_account_rows,
+    require_account_banker, require_review_status,
+)
+from src.services.iban_allocator import iban_allocator
+from src.services.scoped_queries import account_lookup, scope_accounts
+from src.services.projections import ACCOUNT_LIST_COLUMNS, as_dicts
+from src.services.recipient_cache import invalidate_recipients
+from src.models.outbox import OutboxEvent
+from src.services.outbox import outbox_dispatcher, status_event
+from src.services.statements import (
+    build_statement, invalidate_statements, is_closed_period, statement_bounds, statement_cache,
+    statement_query,
+)
+
+class AsyncAccountServices:
+    def __init__(self):
+        pass
+
+
+    async def create_account(self, db: AsyncSession, owner_id: UUID, account: AccountCreate, status = AccountStatus.ACTIVE.value) -> BankAccount:
+        for attempt in range(IBAN_INSERT_ATTEMPTS):
+            db_account = BankAccount(
+                iban=await db.run_sync(iban_allocator.allocate_one),
+                currency=account.currency,
+                type=account.type,
+                owner_id=owner_id,
+                balance=Decimal("0.00"),
+                status=status
+            )
+            db.add(db_account)
+            try:
+                await db.commit()
+                break
+            except IntegrityError as exc:
+                await db.rollback()
+                if not is_iban_conflict(exc) or attempt == IBAN_INSERT_ATTEMPTS - 1:
+                    raise
+        await db.refresh(db_account)
+        return db_account
+
+
+    async def create_accounts(self, db: AsyncSession, items: list[AccountBulkItem], status = AccountStatus.ACTIVE.value) -> list[dict]:
+        for attempt in range(IBAN_INSERT_ATTEMPTS):
+            ibans = await db.run_sync(iban_allocator.allocate, len(items))
+            rows = new_account_rows(items, ibans, status)
+            try:
+                await db.execute(insert(BankAccount), rows)
+                await db.commit()
+                return rows
+            except IntegrityError as exc:
+                await db.rollback()
+                if not is_iban_conflict(exc) or attempt == IBAN_INSERT_ATTEMPTS - 1:
+                    raise
+
+
+    async def request_new_account(self, db: AsyncSession, owner_id: UUID, account: AccountCreate, authenticated_user: User) -> BankAccount:
+        if authenticated_user.role != UserRole.CLIENT:
+            raise HTTPException(status_code=403, detail="Only clients can request new accounts")
+
+        if authenticated_user.id != owner_id:
+            raise HTTPException(status_code=403, detail="Clients can only create accounts for themselves")
+        return await self.create_account(db, owner_id, account, status = AccountStatus.PENDING)
+
+
+    async def get_account(self, db: AsyncSession, account_id: UUID, authenticated_user: User) -> BankAccount:
+        row = (await db.execute(account_lookup(account_id, authenticated_user))).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Account not found")
+
+        acc, visible = row
+        if not visible:
+            raise HTTPException(status_code=403, detail="Access denied")
+
+        return acc
+
+
+    async def get_all_accounts(self, db: AsyncSession, authenticated_user: User):
+        if authenticated_user.role == UserRole.CLIENT:
+            raise HTTPException(status_code=403, detail="Access denied")
+        return as_dicts(await db.execute(scope_accounts(select(*ACCOUNT_LIST_COLUMNS), authenticated_user)))
+
+
+    async def get_statement(self, db: AsyncSession, account_id: UUID, date_from: date, date_to: date, authenticated_user: User) -> dict:
+        start, end = statement_bounds(date_from, date_to)
+        await self.get_account(db, account_id, authenticated_user)
+
+        key = (account_id, date_from, date_to)
+        cached = statement_cache.get(key)
+        if cached is not None:
+            return cached
+
+        rows = (await db.execute(statement_query(account_id, start, end))).all()
+        statement = build_statement(account_id, date_from, date_to, rows)
+        if is_closed_period(end):
+            statement_cache.set(key, statement)
+        return statement
+
+
+    async def update_account(self, db: AsyncSession, account_id: UUID, account_update: AccountUpdate, authenticated_user: User) -> BankAccount:
+        account = await db.get(BankAccount, account_id)
+        if not account:
+            raise HTTPException(status_code=404, detail="Account not found")
+
+        if authenticated_user.role != UserRole.BANKER:
+            raise HTTPException(status_code=403, detail="Only bankers can update account")
+
+        for var, value in vars(account_update).items():
+            if value is not None:
+                setattr(account, var, value)
+        if account_update.status is not None:
+            await db.execute(insert(OutboxEvent), [status_event("account", account_id, account_update.status)])
+
+        await db.commit()
+        await db.refresh(account)
+        if account_update.status is not None:
+            invalidate_recipients(account.iban)
+            outbox_dispatcher.notify()
+        return account
+
+
+    async def update_status(self, db: AsyncSession, account_id: UUID, authenticated_user: User, status: AccountStatus) -> BankAccount:
+        account = await db.get(BankAccount, account_id)
+        if not account:
+            raise HTTPException(status_code=404, detail="Account not found")
+
+        if authenticated_user.role != UserRole.BANKER:
+            raise HTTPException(status_code=403, detail="Only bankers can update account")
+
+        account.status = status
+        await db.execute(insert(OutboxEvent), [status_event("account", account_id, status)])
+
+        await db.commit()
+        outbox_dispatcher.notify()
+        await db.refresh(account)
+        invalidate_recipients(account.iban)
+        return account
+
+
+    async def bulk_update_status(self, db: AsyncSession, selection: AccountBulkStatus, authenticated_user: User) -> AccountBulkStatusOut:
+        require_account_banker(authenticated_user)
+        require_review_status(selection.status)
+
+        updated = (await db.execute(bulk_status_statement(selection))).all()
+        if updated:
+            await db.execute(insert(OutboxEvent), [status_event("account", row.id, selection.status) for row in updated])
+        updated_ids = {row.id for row in updated}
+        requested_ids = list(dict.fromkeys(selection.account_ids)) if selection.account_ids is not None else [row.id for row in updated]
+        missed = [account_id for account_id in requested_ids if account_id not in updated_ids]
+        current_statuses = {}
+        if missed:
+            current_statuses = dict((await db.execute(select(BankAccount.id, BankAccount.status).where(BankAccount.id.in_(missed)))).all())
+        await db.commit()
+
+        if updated:
+            outbox_dispatcher.notify()
+            invalidate_recipients(*(row.iban for row in updated))
+        return bulk_status_results(requested_ids, updated_ids, current_statuses)
+
+
+    async def delete_account(self, db: AsyncSession, account_id: UUID, authenticated_user: User):
+        account = await db.get(BankAccount, account_id)
+        if not account:
+            raise HTTPException(status_code=404, detail="Account not found")
+
+        if authenticated_user.role == UserRole.CLIENT:
+            raise HTTPException(status_code=403, detail="Only bankers or admins can delete accounts")
+
+        iban = account.iban
+        await db.delete(account)
+        await db.commit()
+        invalidate_statements(account_id)
+        invalidate_recipients(iban)
+        return {"detail": f"Account {account_id} deleted"}
@@ -0,0 +1,24 @@
+from fastapi import HTTPException, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.async_database import get_async_db
+from src.models.user import User
+from src.services.auth_services import AuthenticatedUser, decode_token_subject, oauth2_scheme, user_cache
+
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> AuthenticatedUser:
+    user_name, _ = decode_token_subject(token)
+
+    cached = user_cache.get(user_name)
+    if cached is not None:
+        return cached
+
+    user = (await db.execute(
+        select(User.id, User.username, User.role).where(User.username == user_name)
+    )).first()
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    authenticated_user = AuthenticatedUser.from_user(user)
+    user_cache.set(user_name, authenticated_user)
+    return authenticated_user
@@ -0,0 +1,143 @@
+from datetime import datetime, timezone
+from uuid import UUID
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.models.card import DebitCard, CardStatus
+from src.models.account import AccountStatus, AccountType
+from src.schemas.card import CardCreate, CardReviewItem
+from fastapi import HTTPException
+from src.models.user import User, UserRole
+from src.services.scoped_queries import account_with_card_lookup, card_lookup, scope_cards
+from src.services.projections import CARD_LIST_COLUMNS, as_dicts
+from src.models.outbox import OutboxEvent
+from src.services.outbox import outbox_dispatcher, status_event
+from src.services.card_services import (
+    APPLY_REVIEW, apply_reviews_statements, claim_cards_statement, plan_reviews, queue_order, require_banker, review_card_query, review_events,
+    review_params, review_state_query, settle_reviews, summarize_reviews,
+)
+
+class AsyncCardServices():
+    def __init__(self):
+        pass
+
+
+    async def create_card_request(self, db: AsyncSession, card_data: CardCreate, authenticated_user: User):
+        if card_data.monthly_salary < 500:
+            raise HTTPException(
+                status_code=400,
+                detail="Cannot apply for debit card: monthly salary must be at least 500€."
+            )
+
+        row = (await db.execute(account_with_card_lookup(card_data.account_id, authenticated_user))).first()
+
+        if not row:
+            raise HTTPException(status_code=404, detail="Account not found")
+
+        account, existing_card_id, visible = row
+        if account.status != AccountStatus.ACTIVE or account.type != AccountType.CURRENT:
+            raise HTTPException(status_code=400, detail="Account must be an active current account")
+
+        if authenticated_user.role != UserRole.CLIENT:
+            raise HTTPException(status_code=403, detail="Only client can request a new card")
+
+        if not visible:
+            raise HTTPException(status_code=403, detail="Not authorized to request a card for this account")
+
+        if existing_card_id:
+            raise HTTPException(status_code=400, detail="A debit card has already been issued for this account")
+
+        new_card = DebitCard(
+            monthly_salary=card_data.monthly_salary,
+            account_id=card_data.account_id,
+            status=CardStatus.PENDING
+        )
+
+        db.add(new_card)
+        await db.commit()
+        await db.refresh(new_card)
+        return new_card
+
+
+    async def update_status(self, db: AsyncSession, card_id: UUID, status: CardStatus, authenticated_user: User, decline_reason: str = None):
+        require_banker(authenticated_user)
+
+        row = (await db.execute(review_card_query(card_id, authenticated_user.id, datetime.now(timezone.utc)))).first()
+
+        if not row:
+            raise HTTPException(status_code=404, detail="Card not found")
+
+        card, is_claimed_elsewhere = row
+        if card.status != CardStatus.PENDING:
+            raise HTTPException(status_code=400, detail="Card has already been reviewed")
+
+        if is_claimed_elsewhere:
+            raise HTTPException(status_code=409, detail="Card is claimed by another banker")
+
+        if status == CardStatus.DECLINED and not decline_reason:
+            raise HTTPException(status_code=400, detail="Decline reason must be provided")
+
+        if (await db.execute(APPLY_REVIEW, review_params(card.id, status, decline_reason))).rowcount == 0:
+            await db.rollback()
+            raise HTTPException(status_code=409, detail="Card has already been reviewed")
+        await db.execute(insert(OutboxEvent), [status_event("card", card.id, status)])
+
+        await db.commit()
+        outbox_dispatcher.notify()
+        await db.refresh(card)
+        return card
+
+
+    async def claim_cards(self, db: AsyncSession, authenticated_user: User, limit: int):
+        require_banker(authenticated_user)
+        rows = (await db.execute(claim_cards_statement(authenticated_user.id, limit, datetime.now(timezone.utc)))).all()
+        await db.commit()
+        return queue_order(rows)
+
+
+    async def review_cards(self, db: AsyncSession, reviews: list[CardReviewItem], authenticated_user: User):
+        require_banker(authenticated_user)
+        card_ids = list({review.card_id for review in reviews})
+        now = datetime.now(timezone.utc)
+        state = {row.id: row for row in await db.execute(review_state_query(card_ids, authenticated_user.id, now))}
+        results, updates = plan_reviews(reviews, state)
+        applied_ids = set()
+        for statement in apply_reviews_statements(updates):
+            applied_ids.update((await db.execute(statement)).scalars())
+        updates = settle_reviews(results, updates, applied_ids)
+        if updates:
+            await db.execute(insert(OutboxEvent), review_events(updates))
+        await db.commit()
+        if updates:
+            outbox_dispatcher.notify()
+        return summarize_reviews(results)
+
+
+    async def delete_card(self, db: AsyncSession, card_id: UUID, authenticated_user: User):
+        if authenticated_user.role == UserRole.CLIENT:
+            raise HTTPException(status_code=403, detail="Only admin or banker can delete card applications")
+
+        card = await db.get(DebitCard, card_id)
+        if not card:
+            raise HTTPException(status_code=404, detail="Card not found")
+
+        await db.delete(card)
+        await db.commit()
+        return {"message": "Card deleted successfully"}
+
+
+    async def get_cards(self, db: AsyncSession, authenticated_user: User):
+        if authenticated_user.role != UserRole.CLIENT:
+            return as_dicts(await db.execute(scope_cards(select(*CARD_LIST_COLUMNS), authenticated_user)))
+        raise HTTPException(status_code=403, detail="Not authorized to view all cards")
+
+
+    async def get_card_by_id(self, db: AsyncSession, card_id: UUID, authenticated_user: User) -> DebitCard:
+        row = (await db.execute(card_lookup(card_id, authenticated_user))).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Card not found")
+
+        card, visible = row
+        if not visible:
+            raise HTTPException(status_code=403, detail="Not authorized to view this card")
+
+        return card
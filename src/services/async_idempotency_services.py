@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.models import IdempotencyKey
+from src.services.idempotency_services import (
+    IdempotentRequest, claim_statement, encode_response, is_replayable, key_filter, live_key_query, purge_due,
+    purge_expired_statement, replay, stored_outcome,
+)
+
+class AsyncIdempotencyServices:
+    def __init__(self):
+        pass
+
+
+    async def run(self, db: AsyncSession, authenticated_user, request: Optional[IdempotentRequest], handler, response_model=None, status_code: int = 200):
+        if request is None:
+            return await handler()
+
+        stored = await self.claim(db, authenticated_user.id, request)
+        if stored is not None:
+            return replay(stored, request)
+
+        try:
+            result = await handler()
+        except HTTPException as exc:
+            await db.rollback()
+            if is_replayable(exc.status_code):
+                await self.finish(db, authenticated_user.id, request, exc.status_code, {"detail": exc.detail}, exc.headers)
+            else:
+                await self.release(db, authenticated_user.id, request)
+            raise
+        except Exception:
+            await db.rollback()
+            await self.release(db, authenticated_user.id, request)
+            raise
+
+        body = encode_response(result, response_model)
+        await self.finish(db, authenticated_user.id, request, status_code, body)
+        return JSONResponse(body, status_code=status_code)
+
+
+    async def claim(self, db: AsyncSession, owner_id, request: IdempotentRequest):
+        now = datetime.now(timezone.utc)
+        if purge_due():
+            await db.execute(purge_expired_statement(now))
+            await db.commit()
+        for _ in range(2):
+            try:
+                await db.execute(claim_statement(owner_id, request, now))
+                await db.commit()
+                return None
+            except IntegrityError:
+                await db.rollback()
+
+            stored = (await db.execute(live_key_query(owner_id, request, now))).first()
+            if stored is not None:
+                return stored
+            await db.execute(delete(IdempotencyKey).where(*key_filter(owner_id, request), IdempotencyKey.expires_at <= now))
+            await db.commit()
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress", headers={"Retry-After": "1"})
+
+
+    async def finish(self, db: AsyncSession, owner_id, request: IdempotentRequest, status_code: int, body, headers: Optional[dict] = None):
+        await db.execute(
+            update(IdempotencyKey)
+            .where(*key_filter(owner_id, request))
+            .values(**stored_outcome(status_code, body, headers))
+        )
+        await db.commit()
+
+
+    async def release(self, db: AsyncSession, owner_id, request: IdempotentRequest):
+        await db.execute(delete(IdempotencyKey).where(*key_filter(owner_id, request)))
+        await db.commit()
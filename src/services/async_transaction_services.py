@@ -0,0 +1,180 @@
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID, uuid4
+from src.models.transaction import Transaction, TransactionType
+from typing import Optional
+from src.schemas.transaction import BatchTransferCreate, BatchTransferOut, ExportFormat, TransactionCreate, TransactionFilter
+from src.models.user import User, UserRole
+from src.models.outbox import OutboxEvent
+from src.services.outbox import outbox_dispatcher, transfer_event
+from src.services.db_retry import run_with_retries_async
+from src.services.statements import invalidate_statements
+from src.services.iban_allocator import is_valid_iban
+from src.services.recipient_cache import cached_recipients, invalidate_recipients, remember_recipients
+from src.services.pagination import DEFAULT_PAGE_SIZE
+from src.services.scoped_queries import account_with_card_lookup, accounts_with_card_lookup, transaction_lookup
+from src.services.transaction_services import (
+    CSV_HEADER, BalanceConflict, StaleRecipient, balance_steps, batch_transfer_events, build_export_query, build_transactions_query,
+    check_balance_result, format_export_chunk, paginate, plan_batch_transfers, recipients_query, resolve_batch_senders,
+    summarize_batch, transfer_balance_updates,
+)
+
+
+async def apply_balance_updates_async(db: AsyncSession, balance_updates: list):
+    for statement, params in balance_steps(balance_updates):
+        check_balance_result(statement, params, await db.execute(statement, params))
+
+
+async def resolve_recipients_async(db: AsyncSession, ibans) -> dict:
+    found, missing = cached_recipients(ibans)
+    if missing:
+        rows = (await db.execute(recipients_query(missing))).all()
+        remember_recipients(rows)
+        found.update((row.iban, row) for row in rows)
+    return found
+
+
+class AsyncTransactionService:
+    def __init__(self):
+        pass
+
+
+    async def get_transactions(self, db: AsyncSession, authenticated_user: User, filters: TransactionFilter = TransactionFilter(), limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None):
+        query = build_transactions_query(authenticated_user, filters, limit, cursor)
+        return paginate((await db.execute(query)).scalars().all(), limit)
+
+
+    async def export_transactions(self, db: AsyncSession, authenticated_user: User, filters: TransactionFilter, export_format: ExportFormat):
+        result = await db.stream(build_export_query(authenticated_user, filters))
+        if export_format == ExportFormat.CSV:
+            yield CSV_HEADER
+        async for rows in result.partitions():
+            yield format_export_chunk(rows, export_format)
+
+
+    async def get_transaction_by_id(self, db: AsyncSession, tx_id: UUID, authenticated_user: User):
+        row = (await db.execute(transaction_lookup(tx_id, authenticated_user))).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Transaction not found")
+
+        tx, visible = row
+        if not visible:
+            raise HTTPException(status_code=403, detail="Access denied to this transaction")
+
+        return tx
+
+
+    async def perform_transaction(self, db: AsyncSession, sender_account_id: UUID, data: TransactionCreate, authenticated_user: User):
+        if not is_valid_iban(data.recipient_iban):
+            raise HTTPException(status_code=400, detail="Invalid recipient IBAN")
+
+        row = (await db.execute(account_with_card_lookup(sender_account_id, authenticated_user))).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Sender account not found")
+
+
+        sender_account, card_id, visible = row
+        if not visible:
+            raise HTTPException(status_code=403, detail="You don't have permission to perform this transaction")
+
+
+        if not card_id:
+            raise HTTPException(status_code=400, detail="No linked debit card on sender account")
+
+
+        if sender_account.balance < data.amount:
+            raise HTTPException(status_code=400, detail="Insufficient funds")
+
+
+        recipient_account = (await resolve_recipients_async(db, [data.recipient_iban])).get(data.recipient_iban)
+        if not recipient_account:
+            raise HTTPException(status_code=404, detail="Recipient account not found")
+
+
+        # plain values: the rollback before a retry expires the entities, and reloading them lazily fails under asyncio
+        sender_id, sender_currency = sender_account.id, sender_account.currency
+        recipient_id, recipient_currency = recipient_account.id, recipient_account.currency
+
+        async def transfer():
+            try:
+                await apply_balance_updates_async(db, transfer_balance_updates(sender_id, recipient_id, data.amount))
+            except BalanceConflict:
+                await db.rollback()
+                raise HTTPException(status_code=400, detail="Insufficient funds")
+            except StaleRecipient:
+                await db.rollback()
+                invalidate_recipients(data.recipient_iban)
+                raise HTTPException(status_code=404, detail="Recipient account not found")
+
+            debit_tx = Transaction(
+                id=uuid4(),
+                account_id=sender_id,
+                amount=data.amount,
+                currency=sender_currency,
+                type=TransactionType.DEBIT
+            )
+            credit_tx = Transaction(
+                account_id=recipient_id,
+                amount=data.amount,
+                currency=recipient_currency,
+                type=TransactionType.CREDIT
+            )
+            db.add(debit_tx)
+            db.add(credit_tx)
+            await db.execute(insert(OutboxEvent), [
+                transfer_event(debit_tx.id, sender_id, recipient_id, data.amount, sender_currency)
+            ])
+            await db.commit()
+            outbox_dispatcher.notify()
+            return debit_tx
+
+        # expire_on_commit=False keeps the flushed values, so there is nothing to refresh
+        return await run_with_retries_async(db, transfer)
+
+
+    async def perform_batch_transactions(self, db: AsyncSession, data: BatchTransferCreate, authenticated_user: User) -> BatchTransferOut:
+        sender_ids = resolve_batch_senders(data, authenticated_user)
+        known_senders = {sender_id for sender_id in sender_ids if sender_id}
+        ibans = {item.recipient_iban for item in data.transfers if is_valid_iban(item.recipient_iban)}
+
+        async def batch():
+            senders = {row.id: row for row in await db.execute(accounts_with_card_lookup(known_senders, authenticated_user))}
+            recipients = await resolve_recipients_async(db, ibans)
+
+            results, tx_rows, balance_updates = plan_batch_transfers(data, sender_ids, senders, recipients)
+            if tx_rows:
+                await apply_balance_updates_async(db, balance_updates)
+                await db.execute(insert(Transaction), tx_rows)
+                await db.execute(insert(OutboxEvent), batch_transfer_events(tx_rows))
+                await db.commit()
+                outbox_dispatcher.notify()
+            return summarize_batch(results)
+
+        async def replan_on_stale_recipient():
+            try:
+                return await batch()
+            except StaleRecipient:
+                invalidate_recipients(*ibans)
+                raise BalanceConflict(None)
+
+        try:
+            return await run_with_retries_async(db, replan_on_stale_recipient, retry_on=(BalanceConflict,))
+        except BalanceConflict:
+            raise HTTPException(status_code=409, detail="Balances changed while the batch was running, please retry")
+
+
+    async def delete_transaction(self, db: AsyncSession, tx_id: UUID, authenticated_user: User):
+        tx = await db.get(Transaction, tx_id)
+        if not tx:
+            raise HTTPException(status_code=404, detail="Transaction not found")
+
+        if authenticated_user.role == UserRole.CLIENT:
+            raise HTTPException(status_code=403, detail="Clients cannot delete transactions")
+
+
+        account_id = tx.account_id
+        await db.delete(tx)
+        await db.commit()
+        invalidate_statements(account_id)
+        return {"detail": "Transaction deleted successfully"}
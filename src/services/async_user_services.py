@@ -0,0 +1,153 @@
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.models import BankAccount
+from src.models.account import AccountStatus
+from src.models.user import User
+from src.schemas.user import UserCreate, UserUpdate
+from uuid import UUID
+from src.models.user import UserRole
+from src.services.auth_services import invalidate_cached_user
+from src.services.scoped_queries import scope_users, user_lookup
+from src.services.projections import USER_LIST_COLUMNS, as_dicts
+from src.services.password_services import password_hasher
+from src.services.account_services import IBAN_INSERT_ATTEMPTS, new_account_rows
+from src.services.iban_allocator import iban_allocator
+from src.services.user_import import (
+    USER_IMPORT_CHUNK_SIZE, ImportReport, chunked, drop_existing, existing_users_query, import_hasher,
+    new_user_rows, passwords_to_hash, validated_rows, with_hashes,
+)
+
+class AsyncUserServices:
+    def __init__(self):
+        pass
+
+
+    async def get_all_users(self, db: AsyncSession, authenticated_user: User):
+        if authenticated_user.role == UserRole.CLIENT:
+            raise HTTPException(status_code=403, detail="Access denied")
+
+        return as_dicts(await db.execute(scope_users(select(*USER_LIST_COLUMNS), authenticated_user)))
+
+
+    async def get_user(self, db: AsyncSession, user_id: UUID, authenticated_user: User):
+        row = (await db.execute(user_lookup(user_id, authenticated_user))).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        user, visible = row
+        if not visible:
+            raise HTTPException(status_code=403, detail="Access denied")
+
+        return user
+
+
+    async def get_user_by_email(self, db: AsyncSession, email: str):
+        return (await db.execute(select(User).where(User.email == email))).scalars().first()
+
+
+    async def create_user(self, db: AsyncSession, user: UserCreate, authenticated_user: User):
+        if authenticated_user.role == UserRole.ADMIN and user.role == UserRole.CLIENT:
+            raise HTTPException(status_code=403, detail="Admin can only create BANKER users")
+        elif authenticated_user.role == UserRole.BANKER and user.role != UserRole.CLIENT:
+            raise HTTPException(status_code=403, detail="Banker can only create CLIENT users")
+        elif authenticated_user.role == UserRole.CLIENT:
+            raise HTTPException(status_code=403, detail="Access denied")
+
+        hashed_password = await password_hasher.hash_async(user.password)
+        db_user = User(
+            username=user.username,
+            email=user.email,
+            hashed_password=hashed_password,
+            role=user.role,
+        )
+        db.add(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+        return db_user
+
+
+    async def update_user_service(self, user_id: UUID, user_update: UserUpdate, db: AsyncSession, authenticated_user: User):
+        user = await db.get(User, user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        if authenticated_user.role == UserRole.CLIENT and authenticated_user.id != user_id:
+            raise HTTPException(status_code=403, detail="Clients can only update themselves")
+
+        if authenticated_user.role == UserRole.ADMIN and user == UserRole.CLIENT:
+            raise HTTPException(status_code=403, detail="Admin can only update BANKER users")
+
+        if authenticated_user.role == UserRole.BANKER and user.role != UserRole.CLIENT:
+            raise HTTPException(status_code=403, detail="Banker can only update CLIENT users")
+
+        previous_username = user.username
+        if user_update.username:
+            user.username = user_update.username
+        if user_update.email:
+            user.email = user_update.email
+        if user_update.password:
+            user.hashed_password = await password_hasher.hash_async(user_update.password)
+        if user_update.role and authenticated_user.role == UserRole.ADMIN:
+            user.role = user_update.role
+
+        await db.commit()
+        await db.refresh(user)
+        invalidate_cached_user(previous_username, user.username)
+        return user
+
+    async def delete_user_service(self, user_id: UUID, db: AsyncSession, authenticated_user: User):
+        user = await db.get(User, user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        if authenticated_user.role == UserRole.ADMIN and user.role == UserRole.CLIENT:
+            raise HTTPException(status_code=403, detail="Admin can only delete BANKER users")
+        if authenticated_user.role == UserRole.BANKER and user.role != UserRole.CLIENT:
+            raise HTTPException(status_code=403, detail="Banker can only delete CLIENT users")
+        if authenticated_user.role == UserRole.CLIENT:
+            raise HTTPException(status_code=403, detail="Clients cannot delete users")
+
+        username = user.username
+        await db.delete(user)
+        await db.commit()
+        invalidate_cached_user(username)
+        return {"detail": f"User {user_id} deleted"}
+
+
+    async def import_users(self, db: AsyncSession, records, allowed_roles: set, chunk_size: int = USER_IMPORT_CHUNK_SIZE) -> dict:
+        report = ImportReport()
+        chunks = chunked(validated_rows(records, allowed_roles, report), chunk_size)
+        # reading and validating the upload is blocking work, so each chunk is pulled in the threadpool
+        while (chunk := await run_in_threadpool(next, chunks, None)) is not None:
+            chunk = drop_existing(chunk, (await db.execute(existing_users_query(chunk))).all(), report)
+            if not chunk:
+                continue
+            hashes = with_hashes(chunk, await import_hasher.hash_many_async(passwords_to_hash(chunk)))
+            users, accounts = await self._insert_import_chunk(db, chunk, hashes, report)
+            report.imported += users
+            report.accounts += accounts
+        return report.as_dict()
+
+
+    async def _insert_import_chunk(self, db: AsyncSession, chunk: list, hashes: dict, report: ImportReport) -> tuple[int, int]:
+        for _ in range(IBAN_INSERT_ATTEMPTS):
+            users, account_items = new_user_rows(chunk, hashes)
+            try:
+                await db.execute(insert(User), users)
+                if account_items:
+                    ibans = await db.run_sync(iban_allocator.allocate, len(account_items))
+                    await db.execute(insert(BankAccount), new_account_rows(account_items, ibans, AccountStatus.ACTIVE.value))
+                await db.commit()
+                return len(users), len(account_items)
+            except IntegrityError:
+                await db.rollback()
+            chunk = drop_existing(chunk, (await db.execute(existing_users_query(chunk))).all(), report)
+            if not chunk:
+                return 0, 0
+
+        for line, _ in chunk:
+            report.fail(line, "Conflicted with concurrent inserts, import the row again")
+        return 0, 0
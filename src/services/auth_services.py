@@ -1,26 +1,70 @@
+import hmac
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from fastapi import HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from src.database import get_db
-from src.models.user import User
+from src.models.user import User, UserRole
+from src.cache import TTLCache
+from src.services.password_services import password_hasher
 import os
 
 SECRET_KEY = os.getenv("SECRET_KEY", "very_secret")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login", auto_error=False)
+
+# /metrics and the *-stats endpoints: "admin" needs an admin token or OPS_TOKEN, "public" leaves them open
+OPS_ACCESS = os.getenv("OPS_ACCESS", "admin").lower()
+# a static bearer token for scrapers, which cannot log in; empty accepts admin tokens only
+OPS_TOKEN = os.getenv("OPS_TOKEN", "")
+
+# Resolved users keyed by token subject. Entries are dropped by UserServices on update/delete;
+# other workers only see those changes once the TTL runs out.
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "60")),
+)
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    id: UUID
+    username: str
+    role: UserRole
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthenticatedUser":
+        return cls(id=user.id, username=user.username, role=UserRole(user.role))
+
+
+def invalidate_cached_user(*usernames: str):
+    for username in usernames:
+        if username:
+            user_cache.pop(username)
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    valid, _ = password_hasher.verify_and_update(plain_password, hashed_password)
+    return valid
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
+
+def login_credentials(db: Session, username: str):
+    user = db.query(User.id, User.username, User.role, User.hashed_password).filter(User.username == username).first()
+    # hand the connection back before the password is checked, which takes far longer than the query
+    db.rollback()
+    return user
+
+def store_rehashed_password(db: Session, user_id: UUID, hashed_password: str):
+    db.query(User).filter(User.id == user_id).update({User.hashed_password: hashed_password})
+    db.commit()
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -28,7 +72,8 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def decode_token_subject(token: str) -> tuple[str, str]:
+    """The verified (username, role claim) of a token; the role is None for tokens issued without one."""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_name: str = payload.get("sub")
@@ -36,8 +81,30 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             raise HTTPException(status_code=401, detail="Invalid token")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
-    
-    user = db.query(User).filter(User.username == user_name).first()
+    return user_name, payload.get("role")
+
+def require_ops_access(token: Optional[str] = Depends(optional_oauth2_scheme)):
+    if OPS_ACCESS == "public":
+        return
+    if token is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    if OPS_TOKEN and hmac.compare_digest(token, OPS_TOKEN):
+        return
+    _, role = decode_token_subject(token)
+    if role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> AuthenticatedUser:
+    user_name, _ = decode_token_subject(token)
+
+    cached = user_cache.get(user_name)
+    if cached is not None:
+        return cached
+
+    user = db.query(User.id, User.username, User.role).filter(User.username == user_name).first()
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
-    return user
+
+    authenticated_user = AuthenticatedUser.from_user(user)
+    user_cache.set(user_name, authenticated_user)
+    return authenticated_user
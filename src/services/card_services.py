@@ -1,10 +1,160 @@
+import os
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 from sqlalchemy.orm import Session
 from src.models.card import DebitCard, CardStatus
-from src.models.account import BankAccount, AccountStatus, AccountType
-from src.schemas.card import CardCreate
+from src.models.account import AccountStatus, AccountType
+from src.schemas.card import CardBatchReviewOut, CardCreate, CardReviewItem, CardReviewResult
 from fastapi import HTTPException
 from src.models.user import User, UserRole
+from src.services.scoped_queries import account_with_card_lookup, card_lookup, scope_cards
+from src.services.projections import CARD_LIST_COLUMNS, as_dicts
+from sqlalchemy import and_, bindparam, case, insert, or_, select, update
+from src.models.outbox import OutboxEvent
+from src.services.outbox import outbox_dispatcher, status_event
+
+# how long claimed cards stay reserved for one banker; unreviewed ones go back to the queue after
+CARD_CLAIM_TTL = int(os.getenv("CARD_CLAIM_TTL", "300"))
+MAX_CARD_CLAIMS = int(os.getenv("MAX_CARD_CLAIMS", "50"))
+
+cards_table = DebitCard.__table__
+APPLY_REVIEW = (
+    update(cards_table)
+    .where(cards_table.c.id == bindparam("b_id"), cards_table.c.status == CardStatus.PENDING)
+    .values(status=bindparam("b_status"), decline_reason=bindparam("b_reason"), claimed_by=None, claim_expires_at=None)
+)
+
+
+def require_banker(authenticated_user: User):
+    if authenticated_user.role != UserRole.BANKER:
+        raise HTTPException(status_code=403, detail="Only banker can review card")
+
+
+def claimed_elsewhere(banker_id, now: datetime):
+    return and_(DebitCard.claimed_by.is_not(None), DebitCard.claimed_by != banker_id, DebitCard.claim_expires_at > now)
+
+
+def claim_cards_statement(banker_id, limit: int, now: datetime):
+    # the caller's own claims first, so a re-claim renews them instead of letting them lapse, then
+    # the oldest pending; rows another banker is claiming right now are skipped, not waited on
+    claimable = (
+        select(DebitCard.id)
+        .where(
+            DebitCard.status == CardStatus.PENDING,
+            or_(DebitCard.claimed_by.is_(None), DebitCard.claimed_by == banker_id, DebitCard.claim_expires_at <= now),
+        )
+        .order_by(case((DebitCard.claimed_by == banker_id, 0), else_=1), DebitCard.created_at, DebitCard.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(DebitCard)
+        .where(DebitCard.id.in_(claimable))
+        .values(claimed_by=banker_id, claim_expires_at=now + timedelta(seconds=CARD_CLAIM_TTL))
+        .returning(DebitCard.id, DebitCard.monthly_salary, DebitCard.account_id, DebitCard.created_at, DebitCard.claim_expires_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def queue_order(rows) -> list:
+    # RETURNING comes back in no particular order
+    return sorted(rows, key=lambda row: (row.created_at, str(row.id)))
+
+
+def review_state_query(card_ids: list, banker_id, now: datetime):
+    return (
+        select(DebitCard.id, DebitCard.status, claimed_elsewhere(banker_id, now).label("claimed_elsewhere"))
+        .where(DebitCard.id.in_(card_ids))
+        .with_for_update()
+    )
+
+
+def review_params(card_id, status: CardStatus, decline_reason: str = None) -> dict:
+    return {"b_id": card_id, "b_status": status, "b_reason": decline_reason if status == CardStatus.DECLINED else None}
+
+
+def review_card_query(card_id, banker_id, now: datetime):
+    # locked like the batch path, so a single review and a batch cannot both decide the same card
+    return (
+        select(DebitCard, claimed_elsewhere(banker_id, now).label("claimed_elsewhere"))
+        .where(DebitCard.id == card_id)
+        .with_for_update()
+    )
+
+
+def review_error(review: CardReviewItem, seen: set):
+    if review.status == CardStatus.PENDING:
+        return 400, "Review status must be APPROVED or DECLINED"
+    if review.status == CardStatus.DECLINED and not review.decline_reason:
+        return 400, "Decline reason must be provided"
+    if review.card_id in seen:
+        return 400, "Card appears more than once in the batch"
+    return None
+
+
+def plan_reviews(reviews: list[CardReviewItem], state: dict) -> tuple[list, list[dict]]:
+    """Per-review results in request order, plus the update parameters for the ones that apply."""
+    results, updates, seen = [], [], set()
+    for index, review in enumerate(reviews):
+        error = review_error(review, seen)
+        seen.add(review.card_id)
+        if error is None:
+            row = state.get(review.card_id)
+            if row is None:
+                error = 404, "Card not found"
+            elif row.status != CardStatus.PENDING:
+                error = 400, "Card has already been reviewed"
+            elif row.claimed_elsewhere:
+                error = 409, "Card is claimed by another banker"
+
+        if error is not None:
+            status_code, detail = error
+            results.append(CardReviewResult(index=index, card_id=review.card_id, success=False, status_code=status_code, detail=detail))
+            continue
+        results.append(CardReviewResult(index=index, card_id=review.card_id, success=True, status_code=200))
+        updates.append(review_params(review.card_id, review.status, review.decline_reason))
+    return results, updates
+
+
+def apply_reviews_statements(updates: list[dict]):
+    # one UPDATE per decision rather than an executemany, so RETURNING names the cards the
+    # PENDING guard let through
+    for status in sorted({item["b_status"] for item in updates}):
+        group = [item for item in updates if item["b_status"] == status]
+        reasons = {item["b_id"]: item["b_reason"] for item in group if item["b_reason"]}
+        yield (
+            update(DebitCard)
+            .where(DebitCard.id.in_([item["b_id"] for item in group]), DebitCard.status == CardStatus.PENDING)
+            .values(
+                status=status,
+                decline_reason=case(reasons, value=DebitCard.id) if reasons else None,
+                claimed_by=None,
+                claim_expires_at=None,
+            )
+            .returning(DebitCard.id)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def settle_reviews(results: list, updates: list[dict], applied_ids: set) -> list[dict]:
+    """Turn planned reviews that did not apply into conflicts; return the updates that did."""
+    for position, result in enumerate(results):
+        if result.success and result.card_id not in applied_ids:
+            results[position] = CardReviewResult(
+                index=result.index, card_id=result.card_id, success=False, status_code=409,
+                detail="Card has already been reviewed",
+            )
+    return [item for item in updates if item["b_id"] in applied_ids]
+
+
+def review_events(updates: list[dict]) -> list[dict]:
+    return [status_event("card", update["b_id"], update["b_status"]) for update in updates]
+
+
+def summarize_reviews(results: list) -> CardBatchReviewOut:
+    succeeded = sum(1 for result in results if result.success)
+    return CardBatchReviewOut(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
 
 class CardServices():
     def __init__(self):
@@ -18,20 +168,22 @@ class CardServices():
                 detail="Cannot apply for debit card: monthly salary must be at least 500€."
             )
         
-        account = db.query(BankAccount).filter(BankAccount.id == card_data.account_id).first()
+        row = db.execute(account_with_card_lookup(card_data.account_id, authenticated_user)).first()
 
-        if not account:
+        if not row:
             raise HTTPException(status_code=404, detail="Account not found")
 
+        account, existing_card_id, visible = row
         if account.status != AccountStatus.ACTIVE or account.type != AccountType.CURRENT:
             raise HTTPException(status_code=400, detail="Account must be an active current account")
         
         if authenticated_user.role != UserRole.CLIENT:
             raise HTTPException(status_code=403, detail="Only client can request a new card")
         
-        existing_card = db.query(DebitCard).filter(DebitCard.account_id == card_data.account_id).first()
+        if not visible:
+            raise HTTPException(status_code=403, detail="Not authorized to request a card for this account")
 
-        if existing_card:
+        if existing_card_id:
             raise HTTPException(status_code=400, detail=f"A debit card has already been issued for this account")
 
         new_card = DebitCard(
@@ -47,29 +199,60 @@ class CardServices():
 
     
     def update_status(self, db: Session, card_id: UUID, status: CardStatus, authenticated_user: User, decline_reason: str = None):
-        if authenticated_user.role != UserRole.BANKER:
-            raise HTTPException(status_code=403, detail="Only banker can review card")
+        require_banker(authenticated_user)
         
-        card = db.query(DebitCard).filter(DebitCard.id == card_id).first()
+        row = db.execute(review_card_query(card_id, authenticated_user.id, datetime.now(timezone.utc))).first()
 
-        if not card:
+        if not row:
             raise HTTPException(status_code=404, detail="Card not found")
         
+        card, is_claimed_elsewhere = row
         if card.status != CardStatus.PENDING:
             raise HTTPException(status_code=400, detail="Card has already been reviewed")
 
+        if is_claimed_elsewhere:
+            raise HTTPException(status_code=409, detail="Card is claimed by another banker")
+
         if status == CardStatus.DECLINED and not decline_reason:
             raise HTTPException(status_code=400, detail="Decline reason must be provided")
 
-        card.status = status
-        card.decline_reason = decline_reason if status == CardStatus.DECLINED else None
+        if db.execute(APPLY_REVIEW, review_params(card.id, status, decline_reason)).rowcount == 0:
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Card has already been reviewed")
+        db.execute(insert(OutboxEvent), [status_event("card", card.id, status)])
 
         db.commit()
+        outbox_dispatcher.notify()
         db.refresh(card)
         return card
     
 
 
+    def claim_cards(self, db: Session, authenticated_user: User, limit: int):
+        require_banker(authenticated_user)
+        rows = db.execute(claim_cards_statement(authenticated_user.id, limit, datetime.now(timezone.utc))).all()
+        db.commit()
+        return queue_order(rows)
+
+
+    def review_cards(self, db: Session, reviews: list[CardReviewItem], authenticated_user: User):
+        require_banker(authenticated_user)
+        card_ids = list({review.card_id for review in reviews})
+        # the row locks, and the PENDING guard in APPLY_REVIEW, keep a concurrent single review out
+        state = {row.id: row for row in db.execute(review_state_query(card_ids, authenticated_user.id, datetime.now(timezone.utc)))}
+        results, updates = plan_reviews(reviews, state)
+        applied_ids = set()
+        for statement in apply_reviews_statements(updates):
+            applied_ids.update(db.execute(statement).scalars())
+        updates = settle_reviews(results, updates, applied_ids)
+        if updates:
+            db.execute(insert(OutboxEvent), review_events(updates))
+        db.commit()
+        if updates:
+            outbox_dispatcher.notify()
+        return summarize_reviews(results)
+
+
     def delete_card(self, db: Session, card_id: UUID, authenticated_user: User):
         if authenticated_user.role == UserRole.CLIENT:
             raise HTTPException(status_code=403, detail="Only admin or banker can delete card applications")
@@ -85,17 +268,17 @@ class CardServices():
 
     def get_cards(self, db: Session, authenticated_user: User):
         if authenticated_user.role != UserRole.CLIENT:
-            return db.query(DebitCard).all()
+            return as_dicts(db.execute(scope_cards(select(*CARD_LIST_COLUMNS), authenticated_user)))
         raise HTTPException(status_code=403, detail="Not authorized to view all cards")
 
 
     def get_card_by_id(self, db: Session, card_id: UUID, authenticated_user: User) -> DebitCard:
-        card = db.query(DebitCard).filter(DebitCard.id == card_id).first()
-        if not card:
+        row = db.execute(card_lookup(card_id, authenticated_user)).first()
+        if not row:
             raise HTTPException(status_code=404, detail="Card not found")
 
-        account = db.query(BankAccount).filter(BankAccount.id == card.account_id).first()
-        if authenticated_user.role == UserRole.CLIENT and account.owner_id != authenticated_user.id:
+        card, visible = row
+        if not visible:
             raise HTTPException(status_code=403, detail="Not authorized to view this card")
 
         return card
\ No newline at end of file
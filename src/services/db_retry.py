@@ -0,0 +1,47 @@
+import asyncio
+import os
+import random
+import time
+from sqlalchemy.exc import DBAPIError
+
+MAX_TRANSFER_RETRIES = int(os.getenv("TRANSFER_MAX_RETRIES", "3"))
+
+# serialization_failure, deadlock_detected
+RETRYABLE_SQLSTATES = {"40001", "40P01"}
+
+
+def is_retryable_db_error(exc: DBAPIError) -> bool:
+    orig = exc.orig
+    sqlstate = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    if sqlstate in RETRYABLE_SQLSTATES:
+        return True
+    # SQLite reports writer contention this way once its busy timeout runs out
+    return "database is locked" in str(orig)
+
+
+def _backoff(attempt: int) -> float:
+    return min(0.2, 0.01 * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+def run_with_retries(db, operation, retry_on: tuple = (), max_retries: int = MAX_TRANSFER_RETRIES):
+    for attempt in range(max_retries + 1):
+        try:
+            return operation()
+        except (DBAPIError, *retry_on) as exc:
+            db.rollback()
+            retryable = not isinstance(exc, DBAPIError) or is_retryable_db_error(exc)
+            if attempt == max_retries or not retryable:
+                raise
+            time.sleep(_backoff(attempt))
+
+
+async def run_with_retries_async(db, operation, retry_on: tuple = (), max_retries: int = MAX_TRANSFER_RETRIES):
+    for attempt in range(max_retries + 1):
+        try:
+            return await operation()
+        except (DBAPIError, *retry_on) as exc:
+            await db.rollback()
+            retryable = not isinstance(exc, DBAPIError) or is_retryable_db_error(exc)
+            if attempt == max_retries or not retryable:
+                raise
+            await asyncio.sleep(_backoff(attempt))
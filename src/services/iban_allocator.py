@@ -0,0 +1,127 @@
+import logging
+import os
+import random
+import string
+import threading
+from collections import deque
+from sqlalchemy import select
+from src.database import engine
+from src.models import BankAccount
+
+logger = logging.getLogger(__name__)
+
+IBAN_POOL_SIZE = int(os.getenv("IBAN_POOL_SIZE", "500"))
+IBAN_POOL_LOW_WATERMARK = int(os.getenv("IBAN_POOL_LOW_WATERMARK", "100"))
+# how many candidates go into one uniqueness check against accounts.iban
+IBAN_CHECK_CHUNK = 500
+
+IBAN_LENGTHS = {
+    "DE": 22,
+    "FR": 27,
+    "ES": 24,
+    "IT": 27,
+    "NL": 18,
+}
+_COUNTRIES = tuple(IBAN_LENGTHS)
+_BBAN_ALPHABET = string.ascii_uppercase + string.digits
+# A=10 ... Z=35, as in the ISO 13616 check digit calculation
+_TO_DIGITS = str.maketrans({letter: str(ord(letter) - 55) for letter in string.ascii_uppercase})
+
+
+def check_digits(country: str, bban: str) -> str:
+    return f"{98 - int((bban + country + '00').translate(_TO_DIGITS)) % 97:02d}"
+
+
+def generate_iban() -> str:
+    country = random.choice(_COUNTRIES)
+    bban = "".join(random.choices(_BBAN_ALPHABET, k=IBAN_LENGTHS[country] - 4))
+    return country + check_digits(country, bban) + bban
+
+
+def normalize_iban(iban: str) -> str:
+    return iban.replace(" ", "").upper()
+
+
+def is_valid_iban(iban: str) -> bool:
+    if len(iban) < 15 or len(iban) > 34 or not (iban.isascii() and iban.isalnum()) or not iban[:2].isalpha() or not iban[2:4].isdigit():
+        return False
+    expected = IBAN_LENGTHS.get(iban[:2])
+    if expected is not None and len(iban) != expected:
+        return False
+    return int((iban[4:] + iban[:4]).translate(_TO_DIGITS)) % 97 == 1
+
+
+class IbanAllocator:
+    """Hands out IBANs that are not in accounts.iban yet, from a pool refilled in the background."""
+
+    def __init__(self, engine, pool_size: int = IBAN_POOL_SIZE, low_watermark: int = IBAN_POOL_LOW_WATERMARK):
+        self.engine = engine
+        self.pool_size = pool_size
+        self.low_watermark = low_watermark
+        self._pool = deque()
+        self._lock = threading.Lock()
+        self._refilling = False
+        self.issued = 0
+        self.generated = 0
+        self.collisions = 0
+
+    def allocate(self, db, count: int = 1) -> list:
+        with self._lock:
+            ibans = [self._pool.popleft() for _ in range(min(count, len(self._pool)))]
+        if len(ibans) < count:
+            # pool drained (cold start or a bulk request): generate the rest on the caller's session
+            ibans += self.generate_unique(db, count - len(ibans))
+        with self._lock:
+            self.issued += len(ibans)
+        self._schedule_refill()
+        return ibans
+
+    def allocate_one(self, db) -> str:
+        return self.allocate(db, 1)[0]
+
+    def generate_unique(self, db, count: int) -> list:
+        # `db` is a Session or Connection; anything already in the table is dropped and replaced
+        ibans = set()
+        while len(ibans) < count:
+            candidates = {generate_iban() for _ in range(count - len(ibans))} - ibans
+            taken = set()
+            chunks = [list(candidates)[i:i + IBAN_CHECK_CHUNK] for i in range(0, len(candidates), IBAN_CHECK_CHUNK)]
+            for chunk in chunks:
+                taken.update(db.execute(select(BankAccount.iban).where(BankAccount.iban.in_(chunk))).scalars())
+            ibans |= candidates - taken
+            with self._lock:
+                self.generated += len(candidates)
+                self.collisions += len(taken)
+        return list(ibans)
+
+    def _schedule_refill(self):
+        with self._lock:
+            if self._refilling or self.pool_size <= 0 or len(self._pool) >= self.low_watermark:
+                return
+            self._refilling = True
+        threading.Thread(target=self._refill, name="iban-refill", daemon=True).start()
+
+    def _refill(self):
+        try:
+            with self.engine.connect() as conn:
+                fresh = self.generate_unique(conn, self.pool_size - len(self._pool))
+            with self._lock:
+                self._pool.extend(fresh)
+        except Exception:
+            logger.exception("Refilling the IBAN pool failed; accounts fall back to inline generation")
+        finally:
+            with self._lock:
+                self._refilling = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pooled": len(self._pool),
+                "pool_size": self.pool_size,
+                "issued": self.issued,
+                "generated": self.generated,
+                "collisions": self.collisions,
+            }
+
+
+iban_allocator = IbanAllocator(engine)
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+from fastapi import Header, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from src.models import IdempotencyKey
+
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_PURGE_INTERVAL = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", "3600"))
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+# outcomes that ask the client to try again: the key is released instead of storing them
+RETRYABLE_STATUSES = {409, 423, 429}
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+_last_purge = 0.0
+
+
+class IdempotentRequest:
+    def __init__(self, key: str, fingerprint: str):
+        self.key = key
+        self.fingerprint = fingerprint
+
+
+async def idempotency_request(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None),
+) -> Optional[IdempotentRequest]:
+    if idempotency_key is None:
+        return None
+    if not idempotency_key or len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1 to {MAX_IDEMPOTENCY_KEY_LENGTH} characters")
+
+    # reusing a key for a different request is a client bug, so the whole request is fingerprinted
+    digest = hashlib.sha256()
+    for part in (request.method, request.url.path, request.url.query):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    digest.update(await request.body())
+    return IdempotentRequest(idempotency_key, digest.hexdigest())
+
+
+def is_replayable(status_code: int) -> bool:
+    return status_code < 500 and status_code not in RETRYABLE_STATUSES
+
+
+def purge_due() -> bool:
+    global _last_purge
+    now = time.monotonic()
+    if now - _last_purge < IDEMPOTENCY_PURGE_INTERVAL:
+        return False
+    _last_purge = now
+    return True
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_model) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+def encode_response(result, response_model=None):
+    if response_model is None:
+        return jsonable_encoder(result)
+    adapter = _adapter(response_model)
+    return adapter.dump_python(adapter.validate_python(result, from_attributes=True), mode="json")
+
+
+def key_filter(owner_id, request: IdempotentRequest) -> tuple:
+    return IdempotencyKey.owner_id == owner_id, IdempotencyKey.key == request.key
+
+
+def claim_statement(owner_id, request: IdempotentRequest, now: datetime):
+    return insert(IdempotencyKey).values(
+        owner_id=owner_id,
+        key=request.key,
+        request_hash=request.fingerprint,
+        created_at=now,
+        expires_at=now + timedelta(seconds=IDEMPOTENCY_TTL),
+    )
+
+
+def live_key_query(owner_id, request: IdempotentRequest, now: datetime):
+    return select(
+        IdempotencyKey.request_hash, IdempotencyKey.status_code, IdempotencyKey.response_body, IdempotencyKey.response_headers,
+    ).where(
+        *key_filter(owner_id, request), IdempotencyKey.expires_at > now,
+    )
+
+
+def replay(stored, request: IdempotentRequest) -> JSONResponse:
+    request_hash, status_code, response_body, response_headers = stored
+    if request_hash != request.fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    if status_code is None:
+        raise HTTPException(
+            status_code=409,
+            detail="A request with this Idempotency-Key is still in progress",
+            headers={"Retry-After": "1"},
+        )
+    headers = json.loads(response_headers) if response_headers else {}
+    return JSONResponse(json.loads(response_body), status_code=status_code, headers={**headers, REPLAYED_HEADER: "true"})
+
+
+def purge_expired_statement(now: datetime):
+    return delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now)
+
+
+def stored_outcome(status_code: int, body, headers: Optional[dict] = None) -> dict:
+    return {"status_code": status_code, "response_body": json.dumps(body), "response_headers": json.dumps(headers) if headers else None}
+
+
+class IdempotencyServices:
+    """Runs a POST handler at most once per (user, Idempotency-Key) and replays its stored response."""
+
+    def __init__(self):
+        pass
+
+
+    def run(self, db: Session, authenticated_user, request: Optional[IdempotentRequest], handler, response_model=None, status_code: int = 200):
+        if request is None:
+            return handler()
+
+        stored = self.claim(db, authenticated_user.id, request)
+        if stored is not None:
+            return replay(stored, request)
+
+        try:
+            result = handler()
+        except HTTPException as exc:
+            db.rollback()
+            if is_replayable(exc.status_code):
+                self.finish(db, authenticated_user.id, request, exc.status_code, {"detail": exc.detail}, exc.headers)
+            else:
+                self.release(db, authenticated_user.id, request)
+            raise
+        except Exception:
+            db.rollback()
+            self.release(db, authenticated_user.id, request)
+            raise
+
+        body = encode_response(result, response_model)
+        self.finish(db, authenticated_user.id, request, status_code, body)
+        return JSONResponse(body, status_code=status_code)
+
+
+    def claim(self, db: Session, owner_id, request: IdempotentRequest):
+        """Take the key, or return the (hash, status, body) already stored under it."""
+        now = datetime.now(timezone.utc)
+        if purge_due():
+            # committed on its own, so a claim that loses the race and rolls back doesn't undo it
+            db.execute(purge_expired_statement(now))
+            db.commit()
+        for _ in range(2):
+            try:
+                db.execute(claim_statement(owner_id, request, now))
+                db.commit()
+                return None
+            except IntegrityError:
+                db.rollback()
+
+            stored = db.execute(live_key_query(owner_id, request, now)).first()
+            if stored is not None:
+                return stored
+            # the earlier use has expired: forget its outcome and take the key afresh
+            db.execute(delete(IdempotencyKey).where(*key_filter(owner_id, request), IdempotencyKey.expires_at <= now))
+            db.commit()
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress", headers={"Retry-After": "1"})
+
+
+    def finish(self, db: Session, owner_id, request: IdempotentRequest, status_code: int, body, headers: Optional[dict] = None):
+        db.execute(
+            update(IdempotencyKey)
+            .where(*key_filter(owner_id, request))
+            .values(**stored_outcome(status_code, body, headers))
+        )
+        db.commit()
+
+
+    def release(self, db: Session, owner_id, request: IdempotentRequest):
+        db.execute(delete(IdempotencyKey).where(*key_filter(owner_id, request)))
+        db.commit()
@@ -0,0 +1,269 @@
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import bindparam, delete, func, select, update
+from src.database import engine
+from src.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DISPATCH = os.getenv("OUTBOX_DISPATCH", "true").lower() in ("1", "true", "yes")
+# comma-separated: file:<path> appends NDJSON, http(s)://... receives each batch as a JSON array
+OUTBOX_SINKS = os.getenv("OUTBOX_SINKS", "")
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "1.0"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+OUTBOX_RETRY_BASE = float(os.getenv("OUTBOX_RETRY_BASE", "1.0"))
+OUTBOX_RETRY_MAX = float(os.getenv("OUTBOX_RETRY_MAX", "300"))
+OUTBOX_HTTP_TIMEOUT = float(os.getenv("OUTBOX_HTTP_TIMEOUT", "5"))
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
+# how long a claimed batch is hidden from other workers while it is being sent; outlast the slowest sink
+OUTBOX_CLAIM_TTL = float(os.getenv("OUTBOX_CLAIM_TTL", "60"))
+OUTBOX_PURGE_INTERVAL = 3600
+
+outbox_table = OutboxEvent.__table__
+RESCHEDULE = (
+    update(outbox_table)
+    .where(outbox_table.c.id == bindparam("b_id"))
+    .values(attempts=bindparam("b_attempts"), next_attempt_at=bindparam("b_next_attempt_at"), last_error=bindparam("b_error"))
+)
+
+
+def event_row(event_type: str, aggregate_id, payload: dict) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "event_type": event_type,
+        "aggregate_id": str(aggregate_id),
+        "payload": json.dumps(payload, default=str),
+        "created_at": now,
+        "attempts": 0,
+        "next_attempt_at": now,
+    }
+
+
+def transfer_event(transaction_id, sender_account_id, recipient_account_id, amount, currency) -> dict:
+    return event_row("transfer.completed", transaction_id, {
+        "transaction_id": transaction_id,
+        "sender_account_id": sender_account_id,
+        "recipient_account_id": recipient_account_id,
+        # exact, unlike the float the JSON API emits, since ledgers downstream add these up
+        "amount": f"{amount:.2f}",
+        "currency": currency,
+    })
+
+
+def status_event(aggregate: str, aggregate_id, status) -> dict:
+    return event_row(f"{aggregate}.status_changed", aggregate_id, {
+        f"{aggregate}_id": aggregate_id,
+        "status": getattr(status, "value", status),
+    })
+
+
+def retry_delay(attempts: int) -> float:
+    return min(OUTBOX_RETRY_MAX, OUTBOX_RETRY_BASE * 2 ** (attempts - 1))
+
+
+def pending_events_query(now: datetime, limit: int, max_attempts: int):
+    # skip_locked lets several workers drain the table without handing out the same event twice
+    return (
+        select(OutboxEvent.id, OutboxEvent.event_type, OutboxEvent.aggregate_id, OutboxEvent.payload,
+               OutboxEvent.created_at, OutboxEvent.attempts)
+        .where(
+            OutboxEvent.dispatched_at.is_(None),
+            OutboxEvent.next_attempt_at <= now,
+            OutboxEvent.attempts < max_attempts,
+        )
+        .order_by(OutboxEvent.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def backlog_query(max_attempts: int = OUTBOX_MAX_ATTEMPTS):
+    undelivered = OutboxEvent.dispatched_at.is_(None)
+    return select(
+        func.count().filter(undelivered, OutboxEvent.attempts < max_attempts).label("pending"),
+        func.count().filter(undelivered, OutboxEvent.attempts >= max_attempts).label("dead"),
+    )
+
+
+def message(row) -> dict:
+    return {
+        "id": row.id,
+        "type": row.event_type,
+        "aggregate_id": row.aggregate_id,
+        "created_at": row.created_at.isoformat(),
+        "payload": json.loads(row.payload),
+    }
+
+
+class FileSink:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, events: list):
+        with self._lock, open(self.path, "a", encoding="utf-8") as out:
+            out.write("".join(json.dumps(event) + "\n" for event in events))
+
+    def __repr__(self):
+        return f"file:{self.path}"
+
+
+class HttpSink:
+    def __init__(self, url: str, timeout: float = OUTBOX_HTTP_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, events: list):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(events).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        # non-2xx responses raise HTTPError
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+    def __repr__(self):
+        return self.url
+
+
+def parse_sinks(spec: str) -> list:
+    sinks = []
+    for item in (part.strip() for part in spec.split(",")):
+        if not item:
+            continue
+        if item.startswith("file:"):
+            sinks.append(FileSink(item[len("file:"):]))
+        elif item.startswith(("http://", "https://")):
+            sinks.append(HttpSink(item))
+        else:
+            raise ValueError(f"Unknown outbox sink {item!r}, expected file:<path> or an http(s) URL")
+    return sinks
+
+
+class OutboxDispatcher:
+    """Delivers committed outbox events to every sink in id order, at least once, from a background thread."""
+
+    def __init__(self, engine, sinks: list, batch_size: int = OUTBOX_BATCH_SIZE, poll_interval: float = OUTBOX_POLL_INTERVAL,
+                 max_attempts: int = OUTBOX_MAX_ATTEMPTS):
+        self.engine = engine
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._last_purge = 0.0
+        self.dispatched = 0
+        self.failed_batches = 0
+        self.last_error = None
+
+    def notify(self):
+        # called after a commit that wrote events, so delivery doesn't wait for the next poll
+        self._wake.set()
+
+    def start(self):
+        # runs without sinks too: nothing is sent then, but the purge still keeps the table bounded
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                delivered = self.dispatch_once() if self.sinks else 0
+                self._purge_expired()
+            except Exception:
+                logger.exception("Outbox dispatch failed")
+                delivered = 0
+            # a full batch means more are probably waiting
+            if delivered < self.batch_size:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def dispatch_once(self) -> int:
+        now = datetime.now(timezone.utc)
+        # claim the batch in a short transaction, so no connection or row lock is held while the sinks are slow
+        with self.engine.begin() as conn:
+            rows = conn.execute(pending_events_query(now, self.batch_size, self.max_attempts)).all()
+            if not rows:
+                return 0
+            ids = [row.id for row in rows]
+            conn.execute(
+                update(OutboxEvent).where(OutboxEvent.id.in_(ids))
+                .values(next_attempt_at=now + timedelta(seconds=OUTBOX_CLAIM_TTL))
+            )
+
+        events = [message(row) for row in rows]
+        errors = []
+        for sink in self.sinks:
+            try:
+                sink.send(events)
+            except Exception as exc:
+                logger.warning("Outbox sink %r failed for %d events: %s", sink, len(events), exc)
+                errors.append(f"{sink!r}: {exc}")
+
+        # a worker that dies before this point leaves the batch claimed until the claim runs out, then it is sent again
+        done = datetime.now(timezone.utc)
+        with self.engine.begin() as conn:
+            if not errors:
+                conn.execute(update(OutboxEvent).where(OutboxEvent.id.in_(ids)).values(dispatched_at=done))
+                self.dispatched += len(rows)
+                return len(rows)
+
+            # every sink gets the batch again on retry, so sinks must tolerate duplicates (dedupe on id)
+            error = "; ".join(errors)[:1000]
+            conn.execute(RESCHEDULE, [
+                {
+                    "b_id": row.id,
+                    "b_attempts": row.attempts + 1,
+                    "b_next_attempt_at": done + timedelta(seconds=retry_delay(row.attempts + 1)),
+                    "b_error": error,
+                }
+                for row in rows
+            ])
+            self.failed_batches += 1
+            self.last_error = error
+            return 0
+
+    def _purge_expired(self):
+        if time.monotonic() - self._last_purge < OUTBOX_PURGE_INTERVAL:
+            return
+        self._last_purge = time.monotonic()
+        self.purge(datetime.now(timezone.utc) - timedelta(days=OUTBOX_RETENTION_DAYS))
+
+    def purge(self, cutoff: datetime) -> int:
+        # with no sinks nothing is ever delivered, so events go once they are older than the cutoff
+        expired = OutboxEvent.dispatched_at < cutoff if self.sinks else OutboxEvent.created_at < cutoff
+        with self.engine.begin() as conn:
+            return conn.execute(delete(OutboxEvent).where(expired)).rowcount
+
+    def stats(self) -> dict:
+        return {
+            "running": self._thread is not None,
+            "sinks": [repr(sink) for sink in self.sinks],
+            "dispatched": self.dispatched,
+            "failed_batches": self.failed_batches,
+            "last_error": self.last_error,
+        }
+
+
+outbox_dispatcher = OutboxDispatcher(engine, parse_sinks(OUTBOX_SINKS))
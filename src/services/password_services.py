@@ -0,0 +1,101 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# 0 hashes inline in the calling thread (useful for scripts and debugging)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", str(max(1, PASSWORD_HASH_WORKERS) * 8)))
+
+# deprecated="auto" + the configured rounds makes needs_update() true for hashes made with another cost
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str):
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+def is_supported_hash(hashed_password: str) -> bool:
+    return pwd_context.identify(hashed_password) is not None
+
+
+class PasswordHasher:
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._slots = threading.BoundedSemaphore(max_queue)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the API process runs threads that must not be copied mid-lock
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=503,
+                detail="Too many password operations in progress, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def hash(self, password: str) -> str:
+        if self.workers <= 0:
+            return _hash(password)
+        return self._submit(_hash, password).result()
+
+    def verify_and_update(self, password: str, hashed_password: str):
+        if self.workers <= 0:
+            return _verify_and_update(password, hashed_password)
+        return self._submit(_verify_and_update, password, hashed_password).result()
+
+    def hash_many(self, passwords: list) -> list:
+        # for bulk jobs on a pool of their own: no queue slots, and several passwords per task
+        # so the inter-process round trips don't add up
+        if self.workers <= 0:
+            return [_hash(password) for password in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self._get_executor().map(_hash, passwords, chunksize=chunksize))
+
+    async def hash_async(self, password: str) -> str:
+        if self.workers <= 0:
+            return _hash(password)
+        return await asyncio.wrap_future(self._submit(_hash, password))
+
+    async def verify_and_update_async(self, password: str, hashed_password: str):
+        if self.workers <= 0:
+            return _verify_and_update(password, hashed_password)
+        return await asyncio.wrap_future(self._submit(_verify_and_update, password, hashed_password))
+
+    async def hash_many_async(self, passwords: list) -> list:
+        return await asyncio.get_running_loop().run_in_executor(None, self.hash_many, passwords)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,22 @@
+from src.models.account import BankAccount
+from src.models.card import DebitCard
+from src.models.user import User
+from src.schemas.account import AccountOut
+from src.schemas.card import CardOut
+from src.schemas.user import UserOut
+
+# List endpoints select exactly the columns their response model emits, in its field order, and
+# return plain dicts: no ORM instances, identity map entries or from_attributes validation per row.
+
+
+def columns_for(model, schema) -> list:
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+ACCOUNT_LIST_COLUMNS = columns_for(BankAccount, AccountOut)
+CARD_LIST_COLUMNS = columns_for(DebitCard, CardOut)
+USER_LIST_COLUMNS = columns_for(User, UserOut)
+
+
+def as_dicts(result) -> list[dict]:
+    return [row._asdict() for row in result]
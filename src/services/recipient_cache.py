@@ -0,0 +1,33 @@
+import os
+from src.cache import TTLCache
+
+# Transfer recipients keyed by IBAN: (id, iban, currency) rows from recipients_query. The id and
+# currency of an account never change, so entries only go when the account is deleted or its status
+# changes. Other workers see a deletion once the TTL runs out; until then the credit's rowcount
+# catches it where the driver reports one.
+recipient_cache = TTLCache(
+    maxsize=int(os.getenv("RECIPIENT_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("RECIPIENT_CACHE_TTL", "300")),
+)
+
+
+def cached_recipients(ibans) -> tuple[dict, list]:
+    found, missing = {}, []
+    for iban in ibans:
+        row = recipient_cache.get(iban)
+        if row is None:
+            missing.append(iban)
+        else:
+            found[iban] = row
+    return found, missing
+
+
+def remember_recipients(rows):
+    for row in rows:
+        recipient_cache.set(row.iban, row)
+
+
+def invalidate_recipients(*ibans: str):
+    for iban in ibans:
+        if iban:
+            recipient_cache.pop(iban)
@@ -0,0 +1,100 @@
+from sqlalchemy import select, true
+from src.models.account import BankAccount
+from src.models.card import DebitCard
+from src.models.transaction import Transaction
+from src.models.user import User, UserRole
+
+# Visibility rules shared by every read in src/services:
+#   CLIENT  - own user, own accounts and the cards/transactions on them
+#   BANKER  - everything except ADMIN users
+#   ADMIN   - everything
+# scope_* narrow list queries; *_lookup select a single row together with a "visible" flag so the
+# caller can still answer 404 for a missing row and 403 for someone else's, in one round trip.
+
+
+def owned_account_ids(authenticated_user: User):
+    return select(BankAccount.id).where(BankAccount.owner_id == authenticated_user.id)
+
+
+def _owner_visible(owner_column, authenticated_user: User):
+    if authenticated_user.role == UserRole.CLIENT:
+        return (owner_column == authenticated_user.id).label("visible")
+    return true().label("visible")
+
+
+def _user_visible(authenticated_user: User):
+    if authenticated_user.role == UserRole.CLIENT:
+        return (User.id == authenticated_user.id).label("visible")
+    if authenticated_user.role == UserRole.BANKER:
+        return (User.role != UserRole.ADMIN).label("visible")
+    return true().label("visible")
+
+
+def scope_accounts(query, authenticated_user: User):
+    if authenticated_user.role == UserRole.CLIENT:
+        return query.where(BankAccount.owner_id == authenticated_user.id)
+    return query
+
+
+def scope_transactions(query, authenticated_user: User):
+    if authenticated_user.role == UserRole.CLIENT:
+        return query.where(Transaction.account_id.in_(owned_account_ids(authenticated_user)))
+    return query
+
+
+def scope_cards(query, authenticated_user: User):
+    if authenticated_user.role == UserRole.CLIENT:
+        return query.where(DebitCard.account_id.in_(owned_account_ids(authenticated_user)))
+    return query
+
+
+def scope_users(query, authenticated_user: User):
+    if authenticated_user.role == UserRole.CLIENT:
+        return query.where(User.id == authenticated_user.id)
+    if authenticated_user.role == UserRole.BANKER:
+        return query.where(User.role != UserRole.ADMIN)
+    return query
+
+
+def account_lookup(account_id, authenticated_user: User):
+    return select(BankAccount, _owner_visible(BankAccount.owner_id, authenticated_user)).where(BankAccount.id == account_id)
+
+
+def account_with_card_lookup(account_id, authenticated_user: User):
+    return (
+        select(BankAccount, DebitCard.id.label("card_id"), _owner_visible(BankAccount.owner_id, authenticated_user))
+        .outerjoin(DebitCard, DebitCard.account_id == BankAccount.id)
+        .where(BankAccount.id == account_id)
+    )
+
+
+def accounts_with_card_lookup(account_ids, authenticated_user: User):
+    return (
+        select(
+            BankAccount.id,
+            BankAccount.balance,
+            BankAccount.currency,
+            DebitCard.id.label("card_id"),
+            _owner_visible(BankAccount.owner_id, authenticated_user),
+        )
+        .outerjoin(DebitCard, DebitCard.account_id == BankAccount.id)
+        .where(BankAccount.id.in_(account_ids))
+    )
+
+
+def transaction_lookup(tx_id, authenticated_user: User):
+    query = select(Transaction, _owner_visible(BankAccount.owner_id, authenticated_user)).where(Transaction.id == tx_id)
+    if authenticated_user.role == UserRole.CLIENT:
+        query = query.outerjoin(BankAccount, BankAccount.id == Transaction.account_id)
+    return query
+
+
+def card_lookup(card_id, authenticated_user: User):
+    query = select(DebitCard, _owner_visible(BankAccount.owner_id, authenticated_user)).where(DebitCard.id == card_id)
+    if authenticated_user.role == UserRole.CLIENT:
+        query = query.outerjoin(BankAccount, BankAccount.id == DebitCard.account_id)
+    return query
+
+
+def user_lookup(user_id, authenticated_user: User):
+    return select(User, _user_visible(authenticated_user)).where(User.id == user_id)
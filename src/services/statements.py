@@ -0,0 +1,120 @@
+import os
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import UUID
+from fastapi import HTTPException
+from sqlalchemy import Numeric, case, func, select, true, type_coerce
+from src.cache import TTLCache
+from src.models import BankAccount, Transaction
+from src.models.transaction import TransactionType
+from src.schemas.money import MONEY_PRECISION, MONEY_SCALE
+
+MAX_STATEMENT_DAYS = int(os.getenv("MAX_STATEMENT_DAYS", "366"))
+# a period is cached only once it ended this many seconds ago
+STATEMENT_CACHE_SETTLE = float(os.getenv("STATEMENT_CACHE_SETTLE", "300"))
+
+# Statements for periods that have ended, keyed by (account_id, from, to). A closed period only
+# changes when one of its transactions is deleted, which drops the account's entries.
+statement_cache = TTLCache(
+    maxsize=int(os.getenv("STATEMENT_CACHE_SIZE", "5000")),
+    ttl=float(os.getenv("STATEMENT_CACHE_TTL", "3600")),
+)
+
+MONEY = Numeric(MONEY_PRECISION, MONEY_SCALE)
+
+signed_amount = case(
+    (Transaction.type == TransactionType.CREDIT, Transaction.amount),
+    else_=-Transaction.amount,
+)
+credit_amount = case((Transaction.type == TransactionType.CREDIT, Transaction.amount), else_=0)
+debit_amount = case((Transaction.type == TransactionType.DEBIT, Transaction.amount), else_=0)
+
+LINE_COLUMNS = ("id", "type", "amount", "description", "created_at", "running_balance")
+
+
+def statement_bounds(date_from: date, date_to: date) -> tuple[datetime, datetime]:
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (date_to - date_from).days >= MAX_STATEMENT_DAYS:
+        raise HTTPException(status_code=400, detail=f"Statements cover at most {MAX_STATEMENT_DAYS} days")
+    start = datetime.combine(date_from, time.min, tzinfo=timezone.utc)
+    end = datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    return start, end
+
+
+def is_closed_period(end: datetime) -> bool:
+    # the margin outlasts replica lag and transfers still committing with an earlier created_at,
+    # so nothing cached can be missing a transaction
+    return end + timedelta(seconds=STATEMENT_CACHE_SETTLE) <= datetime.now(timezone.utc)
+
+
+def statement_query(account_id: UUID, start: datetime, end: datetime):
+    # One statement, so the opening balance, the lines and the totals come from a single snapshot:
+    # a transfer committed while the statement is read cannot leave the running balances
+    # disagreeing with the closing balance. The opening balance is the ledger up to `start`, not
+    # the current balance walked back, so neither later transfers nor a banker overwriting the
+    # balance move a closed period.
+    opening = (
+        select(func.coalesce(func.sum(signed_amount), 0).label("balance"))
+        .where(Transaction.account_id == account_id, Transaction.created_at < start)
+        .cte("opening")
+    )
+    lines = (
+        select(
+            Transaction.id,
+            Transaction.type,
+            Transaction.amount,
+            Transaction.description,
+            Transaction.created_at,
+            func.sum(signed_amount).over(order_by=(Transaction.created_at, Transaction.id)).label("moved"),
+            func.sum(credit_amount).over().label("credits"),
+            func.sum(debit_amount).over().label("debits"),
+            func.count().over().label("count"),
+        )
+        .where(
+            Transaction.account_id == account_id,
+            Transaction.created_at >= start,
+            Transaction.created_at < end,
+        )
+        .cte("lines")
+    )
+    # an empty period still returns the account's row, with the line columns NULL
+    return (
+        select(
+            BankAccount.iban,
+            BankAccount.currency,
+            type_coerce(opening.c.balance, MONEY).label("opening_balance"),
+            type_coerce(func.coalesce(lines.c.credits, 0), MONEY).label("total_credits"),
+            type_coerce(func.coalesce(lines.c.debits, 0), MONEY).label("total_debits"),
+            func.coalesce(lines.c.count, 0).label("count"),
+            *(lines.c[name] for name in LINE_COLUMNS[:-1]),
+            type_coerce(opening.c.balance + lines.c.moved, MONEY).label("running_balance"),
+        )
+        .select_from(BankAccount)
+        .join(opening, true())
+        .outerjoin(lines, true())
+        .where(BankAccount.id == account_id)
+        .order_by(lines.c.created_at, lines.c.id)
+    )
+
+
+def build_statement(account_id: UUID, date_from: date, date_to: date, rows) -> dict:
+    summary = rows[0]
+    opening = summary.opening_balance
+    return {
+        "account_id": account_id,
+        "iban": summary.iban,
+        "currency": summary.currency,
+        "period_from": date_from,
+        "period_to": date_to,
+        "opening_balance": opening,
+        "total_credits": summary.total_credits,
+        "total_debits": summary.total_debits,
+        "closing_balance": opening + summary.total_credits - summary.total_debits,
+        "transaction_count": summary.count,
+        "lines": [{name: getattr(row, name) for name in LINE_COLUMNS} for row in rows if row.id is not None],
+    }
+
+
+def invalidate_statements(*account_ids: UUID):
+    ids = set(account_ids)
+    statement_cache.pop_where(lambda key: key[0] in ids)
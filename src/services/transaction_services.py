@@ -1,10 +1,251 @@
+from collections import defaultdict
+from decimal import Decimal
 from fastapi import HTTPException
+from sqlalchemy import bindparam, insert, select, update, and_, or_
 from sqlalchemy.orm import Session
-from uuid import UUID
+from typing import Optional
+from uuid import UUID, uuid4
 from src.models.account import BankAccount
 from src.models.transaction import Transaction, TransactionType
-from src.schemas.transaction import TransactionCreate
+from src.schemas.transaction import BatchTransferCreate, BatchTransferOut, BatchTransferResult, ExportFormat, TransactionCreate, TransactionFilter
 from src.models.user import User, UserRole
+from src.models.outbox import OutboxEvent
+from src.services.outbox import outbox_dispatcher, transfer_event
+from src.services.statements import invalidate_statements
+from src.services.iban_allocator import is_valid_iban
+from src.services.recipient_cache import cached_recipients, invalidate_recipients, remember_recipients
+from src.services.pagination import DEFAULT_PAGE_SIZE, encode_cursor, decode_cursor
+from src.services.db_retry import run_with_retries
+from src.services.scoped_queries import account_with_card_lookup, accounts_with_card_lookup, scope_transactions, transaction_lookup
+import csv, io, json
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_COLUMNS = (
+    Transaction.id,
+    Transaction.account_id,
+    Transaction.amount,
+    Transaction.currency,
+    Transaction.type,
+    Transaction.description,
+    Transaction.created_at,
+)
+CSV_HEADER = ",".join(column.key for column in EXPORT_COLUMNS) + "\r\n"
+
+accounts_table = BankAccount.__table__
+# Balances only change through these atomic increments, never read-modify-write in Python.
+# A debit only applies while it keeps the balance non-negative, so concurrent transfers can
+# neither lose updates nor overdraw. Bind names must not clash with column names.
+BALANCE_CREDIT = (
+    update(accounts_table)
+    .where(accounts_table.c.id == bindparam("b_account_id"))
+    .values(balance=accounts_table.c.balance + bindparam("b_delta"))
+)
+BALANCE_DEBIT = (
+    update(accounts_table)
+    .where(accounts_table.c.id == bindparam("b_account_id"), accounts_table.c.balance + bindparam("b_delta") >= 0)
+    .values(balance=accounts_table.c.balance + bindparam("b_delta"))
+)
+
+
+class StaleRecipient(Exception):
+    """A credit matched fewer rows than expected: a cached recipient account no longer exists."""
+
+
+class BalanceConflict(Exception):
+    def __init__(self, account_id):
+        super().__init__(f"Balance of account {account_id} no longer covers the debit")
+        self.account_id = account_id
+
+
+def sorted_balance_updates(deltas: dict):
+    # every writer touches account rows in id order, so two transfers can't deadlock each other
+    return [{"b_account_id": account_id, "b_delta": delta} for account_id, delta in sorted(deltas.items()) if delta]
+
+
+def transfer_balance_updates(sender_id: UUID, recipient_id: UUID, amount: Decimal):
+    deltas = defaultdict(Decimal)
+    deltas[sender_id] -= amount
+    deltas[recipient_id] += amount
+    return sorted_balance_updates(deltas)
+
+
+def balance_steps(balance_updates: list):
+    # consecutive credits go out as one executemany; each debit is its own statement so its
+    # rowcount tells whether the funds were still there
+    credits = []
+    for params in balance_updates:
+        if params["b_delta"] > 0:
+            credits.append(params)
+            continue
+        if credits:
+            yield BALANCE_CREDIT, credits
+            credits = []
+        yield BALANCE_DEBIT, params
+    if credits:
+        yield BALANCE_CREDIT, credits
+
+
+def check_balance_result(statement, params, result):
+    if statement is BALANCE_DEBIT:
+        if result.rowcount == 0:
+            raise BalanceConflict(params["b_account_id"])
+        return
+    # drivers without a reliable executemany rowcount (psycopg2, asyncpg) rely on the foreign key instead
+    sane = result.supports_sane_rowcount() if len(params) == 1 else result.supports_sane_multi_rowcount()
+    if sane and result.rowcount < len(params):
+        raise StaleRecipient()
+
+
+def apply_balance_updates(db: Session, balance_updates: list):
+    for statement, params in balance_steps(balance_updates):
+        check_balance_result(statement, params, db.execute(statement, params))
+
+
+def apply_transaction_filters(query, authenticated_user: User, filters: TransactionFilter):
+    query = scope_transactions(query, authenticated_user)
+
+    if filters.account_id:
+        query = query.where(Transaction.account_id == filters.account_id)
+    if filters.type:
+        query = query.where(Transaction.type == filters.type)
+    if filters.currency:
+        query = query.where(Transaction.currency == filters.currency)
+    if filters.min_amount is not None:
+        query = query.where(Transaction.amount >= filters.min_amount)
+    if filters.max_amount is not None:
+        query = query.where(Transaction.amount <= filters.max_amount)
+    if filters.created_from:
+        query = query.where(Transaction.created_at >= filters.created_from)
+    if filters.created_to:
+        query = query.where(Transaction.created_at < filters.created_to)
+    return query
+
+
+def build_transactions_query(authenticated_user: User, filters: TransactionFilter, limit: int, cursor: Optional[str] = None):
+    # newest first; id breaks ties so the order (and therefore the cursor) is stable
+    query = select(Transaction).order_by(Transaction.created_at.desc(), Transaction.id.desc())
+    query = apply_transaction_filters(query, authenticated_user, filters)
+
+    if cursor:
+        created_at, tx_id = decode_cursor(cursor)
+        query = query.where(or_(
+            Transaction.created_at < created_at,
+            and_(Transaction.created_at == created_at, Transaction.id < tx_id),
+        ))
+
+    # one extra row tells us whether there is a next page
+    return query.limit(limit + 1)
+
+
+def build_export_query(authenticated_user: User, filters: TransactionFilter):
+    query = select(*EXPORT_COLUMNS).order_by(Transaction.created_at, Transaction.id)
+    return apply_transaction_filters(query, authenticated_user, filters).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+
+
+def format_export_chunk(rows, export_format: ExportFormat) -> str:
+    if export_format == ExportFormat.CSV:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(
+            [row.id, row.account_id, row.amount, row.currency, row.type.value, row.description or "", row.created_at.isoformat()]
+            for row in rows
+        )
+        return buffer.getvalue()
+
+    return "".join(
+        json.dumps({
+            "id": str(row.id),
+            "account_id": str(row.account_id),
+            "amount": float(row.amount),
+            "currency": row.currency,
+            "type": row.type.value,
+            "description": row.description,
+            "created_at": row.created_at.isoformat(),
+        }) + "\n"
+        for row in rows
+    )
+
+
+def resolve_batch_senders(data: BatchTransferCreate, authenticated_user: User):
+    sender_ids = [item.sender_account_id or data.sender_account_id for item in data.transfers]
+    if authenticated_user.role == UserRole.CLIENT and len({sender_id for sender_id in sender_ids if sender_id}) > 1:
+        raise HTTPException(status_code=400, detail="Clients can only batch transfers from a single sender account")
+    return sender_ids
+
+
+def recipients_query(ibans):
+    return select(BankAccount.id, BankAccount.iban, BankAccount.currency).where(BankAccount.iban.in_(ibans))
+
+
+def resolve_recipients(db: Session, ibans) -> dict:
+    found, missing = cached_recipients(ibans)
+    if missing:
+        rows = db.execute(recipients_query(missing)).all()
+        remember_recipients(rows)
+        found.update((row.iban, row) for row in rows)
+    return found
+
+
+def plan_batch_transfers(data: BatchTransferCreate, sender_ids: list, senders: dict, recipients: dict):
+    # validates every item against the balances as they would be after the items before it,
+    # producing the rows to insert and the net balance change per account
+    available = {account_id: sender.balance for account_id, sender in senders.items()}
+    results, tx_rows, deltas = [], [], defaultdict(Decimal)
+
+    for index, (item, sender_id) in enumerate(zip(data.transfers, sender_ids)):
+        sender = senders.get(sender_id)
+        recipient = recipients.get(item.recipient_iban)
+        failure = None
+        if sender_id is None:
+            failure = (400, "Sender account is required")
+        elif sender is None:
+            failure = (404, "Sender account not found")
+        elif not sender.visible:
+            failure = (403, "You don't have permission to perform this transaction")
+        elif not sender.card_id:
+            failure = (400, "No linked debit card on sender account")
+        elif available[sender_id] < item.amount:
+            failure = (400, "Insufficient funds")
+        elif not is_valid_iban(item.recipient_iban):
+            failure = (400, "Invalid recipient IBAN")
+        elif recipient is None:
+            failure = (404, "Recipient account not found")
+
+        if failure:
+            results.append(BatchTransferResult(index=index, success=False, status_code=failure[0], detail=failure[1]))
+            continue
+
+        available[sender_id] -= item.amount
+        if recipient.id in available:
+            available[recipient.id] += item.amount
+        deltas[sender_id] -= item.amount
+        deltas[recipient.id] += item.amount
+
+        debit_id = uuid4()
+        tx_rows.append({"id": debit_id, "account_id": sender_id, "amount": item.amount, "currency": sender.currency, "type": TransactionType.DEBIT})
+        tx_rows.append({"id": uuid4(), "account_id": recipient.id, "amount": item.amount, "currency": recipient.currency, "type": TransactionType.CREDIT})
+        results.append(BatchTransferResult(index=index, success=True, transaction_id=debit_id, status_code=200))
+
+    return results, tx_rows, sorted_balance_updates(deltas)
+
+
+def batch_transfer_events(tx_rows: list) -> list:
+    # plan_batch_transfers emits each transfer as a debit row followed by its credit row
+    return [
+        transfer_event(debit["id"], debit["account_id"], credit["account_id"], debit["amount"], debit["currency"])
+        for debit, credit in zip(tx_rows[::2], tx_rows[1::2])
+    ]
+
+
+def summarize_batch(results: list) -> BatchTransferOut:
+    succeeded = sum(1 for result in results if result.success)
+    return BatchTransferOut(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+
+def paginate(rows: list, limit: int):
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(page[-1].created_at, page[-1].id)
 
 
 class TransactionService:
@@ -12,76 +253,133 @@ class TransactionService:
         pass
 
 
-    def get_transactions(self, db: Session, authenticated_user: User):
-        if authenticated_user.role == UserRole.CLIENT:
-            accounts = db.query(BankAccount).filter(BankAccount.owner_id == authenticated_user.id).all()
-            account_ids = [acc.id for acc in accounts]
-            return db.query(Transaction).filter(Transaction.account_id.in_(account_ids)).all()
+    def get_transactions(self, db: Session, authenticated_user: User, filters: TransactionFilter = TransactionFilter(), limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None):
+        query = build_transactions_query(authenticated_user, filters, limit, cursor)
+        return paginate(db.execute(query).scalars().all(), limit)
 
-        return db.query(Transaction).all()
+
+    def export_transactions(self, db: Session, authenticated_user: User, filters: TransactionFilter, export_format: ExportFormat):
+        # columns only, fetched in yield_per batches, so memory stays flat however many rows match
+        result = db.execute(build_export_query(authenticated_user, filters))
+        if export_format == ExportFormat.CSV:
+            yield CSV_HEADER
+        for rows in result.partitions():
+            yield format_export_chunk(rows, export_format)
     
 
     def get_transaction_by_id(self, db: Session, tx_id: UUID, authenticated_user: User):
-        tx = db.query(Transaction).filter(Transaction.id == tx_id).first()
-        if not tx:
+        row = db.execute(transaction_lookup(tx_id, authenticated_user)).first()
+        if not row:
             raise HTTPException(status_code=404, detail="Transaction not found")
 
-        if authenticated_user.role == UserRole.CLIENT:
-            account = db.query(BankAccount).filter(BankAccount.id == tx.account_id).first()
-            if account.owner_id != authenticated_user.id:
-                raise HTTPException(status_code=403, detail="Access denied to this transaction")
+        tx, visible = row
+        if not visible:
+            raise HTTPException(status_code=403, detail="Access denied to this transaction")
 
         return tx
 
 
     def perform_transaction(self, db: Session, sender_account_id: UUID, data: TransactionCreate, authenticated_user: User):
-        sender_account = db.query(BankAccount).filter(BankAccount.id == sender_account_id).first()
-        if not sender_account:
+        if not is_valid_iban(data.recipient_iban):
+            raise HTTPException(status_code=400, detail="Invalid recipient IBAN")
+
+        row = db.execute(account_with_card_lookup(sender_account_id, authenticated_user)).first()
+        if not row:
             raise HTTPException(status_code=404, detail="Sender account not found")
 
 
-        if authenticated_user.role == UserRole.CLIENT and sender_account.owner_id != authenticated_user.id:
+        sender_account, card_id, visible = row
+        if not visible:
             raise HTTPException(status_code=403, detail="You don't have permission to perform this transaction")
 
         
-        if not sender_account.card:
+        if not card_id:
             raise HTTPException(status_code=400, detail="No linked debit card on sender account")
 
         
+        # cheap early rejection; the conditional debit below is what actually guarantees funds
         if sender_account.balance < data.amount:
             raise HTTPException(status_code=400, detail="Insufficient funds")
 
         
-        recipient_account = db.query(BankAccount).filter(BankAccount.iban == data.recipient_iban).first()
+        recipient_account = resolve_recipients(db, [data.recipient_iban]).get(data.recipient_iban)
         if not recipient_account:
             raise HTTPException(status_code=404, detail="Recipient account not found")
 
         
-        debit_tx = Transaction(
-            account_id=sender_account.id,
-            amount=data.amount,
-            currency=sender_account.currency,
-            type=TransactionType.DEBIT
-        )
-        sender_account.balance -= data.amount
-
-        
-        credit_tx = Transaction(
-            account_id=recipient_account.id,
-            amount=data.amount,
-            currency=recipient_account.currency,
-            type=TransactionType.CREDIT
-        )
-        recipient_account.balance += data.amount
+        def transfer():
+            try:
+                apply_balance_updates(db, transfer_balance_updates(sender_account.id, recipient_account.id, data.amount))
+            except BalanceConflict:
+                db.rollback()
+                raise HTTPException(status_code=400, detail="Insufficient funds")
+            except StaleRecipient:
+                db.rollback()
+                invalidate_recipients(data.recipient_iban)
+                raise HTTPException(status_code=404, detail="Recipient account not found")
 
-        db.add(debit_tx)
-        db.add(credit_tx)
-        db.commit()
-        db.refresh(debit_tx)
+            debit_tx = Transaction(
+                id=uuid4(),
+                account_id=sender_account.id,
+                amount=data.amount,
+                currency=sender_account.currency,
+                type=TransactionType.DEBIT
+            )
+            credit_tx = Transaction(
+                account_id=recipient_account.id,
+                amount=data.amount,
+                currency=recipient_account.currency,
+                type=TransactionType.CREDIT
+            )
+            db.add(debit_tx)
+            db.add(credit_tx)
+            db.flush()
+            # committed with the transfer, delivered by the outbox dispatcher after the response
+            db.execute(insert(OutboxEvent), [
+                transfer_event(debit_tx.id, sender_account.id, recipient_account.id, data.amount, sender_account.currency)
+            ])
+            # detached with the values just written, so the response needs no SELECT after commit
+            db.expunge(debit_tx)
+            db.commit()
+            outbox_dispatcher.notify()
+            return debit_tx
 
-        return debit_tx
+        return run_with_retries(db, transfer)
     
 
+    def perform_batch_transactions(self, db: Session, data: BatchTransferCreate, authenticated_user: User) -> BatchTransferOut:
+        sender_ids = resolve_batch_senders(data, authenticated_user)
+        known_senders = {sender_id for sender_id in sender_ids if sender_id}
+        ibans = {item.recipient_iban for item in data.transfers if is_valid_iban(item.recipient_iban)}
+
+        def batch():
+            senders = {row.id: row for row in db.execute(accounts_with_card_lookup(known_senders, authenticated_user))}
+            recipients = resolve_recipients(db, ibans)
+
+            results, tx_rows, balance_updates = plan_batch_transfers(data, sender_ids, senders, recipients)
+            if tx_rows:
+                apply_balance_updates(db, balance_updates)
+                db.execute(insert(Transaction), tx_rows)
+                db.execute(insert(OutboxEvent), batch_transfer_events(tx_rows))
+                db.commit()
+                outbox_dispatcher.notify()
+            return summarize_batch(results)
+
+        # a debit losing its race means the plan was built on stale balances: re-read and re-plan
+        def replan_on_stale_recipient():
+            try:
+                return batch()
+            except StaleRecipient:
+                # one of the cached recipients is gone: resolve them all from the table on the retry
+                invalidate_recipients(*ibans)
+                raise BalanceConflict(None)
+
+        try:
+            return run_with_retries(db, replan_on_stale_recipient, retry_on=(BalanceConflict,))
+        except BalanceConflict:
+            raise HTTPException(status_code=409, detail="Balances changed while the batch was running, please retry")
+
+
     def delete_transaction(self, db: Session, tx_id: UUID, authenticated_user: User):
         tx = db.query(Transaction).filter(Transaction.id == tx_id).first()
         if not tx:
@@ -91,6 +389,8 @@ class TransactionService:
             raise HTTPException(status_code=403, detail="Clients cannot delete transactions")
 
 
+        account_id = tx.account_id
         db.delete(tx)
         db.commit()
+        invalidate_statements(account_id)
         return {"detail": "Transaction deleted successfully"}
@@ -0,0 +1,174 @@
+import csv
+import io
+import json
+import os
+from itertools import islice
+from uuid import uuid4
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import or_, select
+from src.models.user import User, UserRole
+from src.schemas.account import AccountBulkItem
+from src.schemas.user import UserImportRow
+from src.services.password_services import PasswordHasher, is_supported_hash
+
+IMPORT_FORMATS = ("csv", "ndjson")
+USER_IMPORT_CHUNK_SIZE = int(os.getenv("USER_IMPORT_CHUNK_SIZE", "1000"))
+# rows failing beyond this many are still counted, just not listed in the report
+USER_IMPORT_MAX_ERRORS = int(os.getenv("USER_IMPORT_MAX_ERRORS", "1000"))
+
+# A pool of its own so an import does not queue logins behind thousands of hashes
+import_hasher = PasswordHasher(workers=int(os.getenv("USER_IMPORT_HASH_WORKERS", str(os.cpu_count() or 1))))
+
+
+class ImportReport:
+    def __init__(self, max_errors: int = USER_IMPORT_MAX_ERRORS):
+        self.max_errors = max_errors
+        self.imported = 0
+        self.accounts = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, line: int, error: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "error": error})
+
+    def as_dict(self) -> dict:
+        return {"imported": self.imported, "accounts": self.accounts, "failed": self.failed, "errors": self.errors}
+
+
+def importable_roles(authenticated_user: User) -> set:
+    # the same rules as creating users one by one
+    if authenticated_user.role == UserRole.ADMIN:
+        return {UserRole.BANKER}
+    if authenticated_user.role == UserRole.BANKER:
+        return {UserRole.CLIENT}
+    raise HTTPException(status_code=403, detail="Access denied")
+
+
+def detect_format(filename: str, requested: str = None) -> str:
+    fmt = requested or ("csv" if (filename or "").lower().endswith(".csv") else "ndjson")
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported import format, use one of: {', '.join(IMPORT_FORMATS)}")
+    return fmt
+
+
+def _csv_record(record: dict) -> dict:
+    # CSV rows carry at most one account, in the account_type/account_currency columns
+    record = {key: value for key, value in record.items() if key and value not in (None, "")}
+    account_type = record.pop("account_type", None)
+    currency = record.pop("account_currency", None)
+    if account_type:
+        record["accounts"] = [{"type": account_type, **({"currency": currency} if currency else {})}]
+    return record
+
+
+def read_records(stream, fmt: str):
+    """Yield (line number, record) from a binary CSV or NDJSON stream without reading it whole.
+
+    A record that cannot be parsed is yielded as its error message instead of a dict.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, _csv_record(record)
+        return
+
+    for line, raw in enumerate(text, start=1):
+        if not raw.strip():
+            continue
+        try:
+            record = json.loads(raw)
+        except ValueError as exc:
+            yield line, f"Invalid JSON: {exc}"
+            continue
+        yield line, record if isinstance(record, dict) else "Expected a JSON object"
+
+
+def validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error["loc"] else error["msg"]
+        for error in exc.errors()
+    )
+
+
+def validated_rows(records, allowed_roles: set, report: ImportReport):
+    """Validate records and drop repeats of a username or email seen earlier in the same file."""
+    usernames, emails = set(), set()
+    for line, record in records:
+        if isinstance(record, str):
+            report.fail(line, record)
+            continue
+        try:
+            row = UserImportRow.model_validate(record)
+        except ValidationError as exc:
+            report.fail(line, validation_message(exc))
+            continue
+
+        if row.role not in allowed_roles:
+            report.fail(line, f"Not allowed to create {row.role.value} users")
+        elif row.hashed_password is not None and not is_supported_hash(row.hashed_password):
+            report.fail(line, "hashed_password is not a supported password hash")
+        elif row.username in usernames:
+            report.fail(line, "Duplicate username in file")
+        elif row.email in emails:
+            report.fail(line, "Duplicate email in file")
+        else:
+            usernames.add(row.username)
+            emails.add(row.email)
+            yield line, row
+
+
+def chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def existing_users_query(chunk: list):
+    usernames = [row.username for _, row in chunk]
+    emails = [row.email for _, row in chunk]
+    return select(User.username, User.email).where(or_(User.username.in_(usernames), User.email.in_(emails)))
+
+
+def drop_existing(chunk: list, existing, report: ImportReport) -> list:
+    taken_usernames, taken_emails = set(), set()
+    for username, email in existing:
+        taken_usernames.add(username)
+        taken_emails.add(email)
+
+    kept = []
+    for line, row in chunk:
+        if row.username in taken_usernames:
+            report.fail(line, "Username already exists")
+        elif row.email in taken_emails:
+            report.fail(line, "Email already registered")
+        else:
+            kept.append((line, row))
+    return kept
+
+
+def passwords_to_hash(chunk: list) -> list:
+    return [row.password for _, row in chunk if row.hashed_password is None]
+
+
+def with_hashes(chunk: list, fresh_hashes: list) -> dict:
+    fresh = iter(fresh_hashes)
+    return {line: row.hashed_password or next(fresh) for line, row in chunk}
+
+
+def new_user_rows(chunk: list, hashes: dict) -> tuple[list[dict], list[AccountBulkItem]]:
+    users, accounts = [], []
+    for line, row in chunk:
+        user_id = uuid4()
+        users.append({
+            "id": user_id,
+            "username": row.username,
+            "email": row.email,
+            "hashed_password": hashes[line],
+            "role": row.role,
+        })
+        accounts += [AccountBulkItem(owner_id=user_id, **account.model_dump()) for account in row.accounts]
+    return users, accounts
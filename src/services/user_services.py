@@ -1,12 +1,31 @@
 from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from src.models import BankAccount
+from src.models.account import AccountStatus
 from src.models.user import User
 from src.schemas.user import UserCreate, UserUpdate
 from uuid import UUID
-from passlib.context import CryptContext
 from src.models.user import UserRole
+from src.services.auth_services import invalidate_cached_user
+from src.services.scoped_queries import scope_users, user_lookup
+from src.services.projections import USER_LIST_COLUMNS, as_dicts
+from src.services.account_services import IBAN_INSERT_ATTEMPTS, new_account_rows
+from src.services.iban_allocator import iban_allocator
+from src.services.user_import import (
+    USER_IMPORT_CHUNK_SIZE, ImportReport, chunked, drop_existing, existing_users_query, import_hasher,
+    new_user_rows, passwords_to_hash, validated_rows, with_hashes,
+)
+
+def require_create_permission(user: UserCreate, authenticated_user: User):
+    if authenticated_user.role == UserRole.ADMIN and user.role == UserRole.CLIENT:
+        raise HTTPException(status_code=403, detail="Admin can only create BANKER users")
+    elif authenticated_user.role == UserRole.BANKER and user.role != UserRole.CLIENT:
+        raise HTTPException(status_code=403, detail="Banker can only create CLIENT users")
+    elif authenticated_user.role == UserRole.CLIENT:
+        raise HTTPException(status_code=403, detail="Access denied")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 class UserServices:
     def __init__(self):
@@ -17,24 +36,18 @@ class UserServices:
         if authenticated_user.role == UserRole.CLIENT:
             raise HTTPException(status_code=403, detail="Access denied")
         
-        query = db.query(User)
-        if authenticated_user.role == UserRole.BANKER:
-            query = query.filter(User.role != UserRole.ADMIN)
-        
-        return query.all()
+        return as_dicts(db.execute(scope_users(select(*USER_LIST_COLUMNS), authenticated_user)))
 
 
     def get_user(self, db: Session, user_id: UUID, authenticated_user: User):
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
+        row = db.execute(user_lookup(user_id, authenticated_user)).first()
+        if not row:
             raise HTTPException(status_code=404, detail="User not found")
-        
-        if authenticated_user.role == UserRole.CLIENT and authenticated_user.id != user_id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
-        if authenticated_user.role == UserRole.BANKER and user.role == UserRole.ADMIN:
+
+        user, visible = row
+        if not visible:
             raise HTTPException(status_code=403, detail="Access denied")
-        
+
         return user
 
 
@@ -42,15 +55,9 @@ class UserServices:
         return db.query(User).filter(User.email == email).first()
 
 
-    def create_user(self, db: Session, user: UserCreate, authenticated_user: User):
-        if authenticated_user.role == UserRole.ADMIN and user.role == UserRole.CLIENT:
-            raise HTTPException(status_code=403, detail="Admin can only create BANKER users")
-        elif authenticated_user.role == UserRole.BANKER and user.role != UserRole.CLIENT:
-            raise HTTPException(status_code=403, detail="Banker can only create CLIENT users")
-        elif authenticated_user.role == UserRole.CLIENT:
-            raise HTTPException(status_code=403, detail="Access denied")
-
-        hashed_password = pwd_context.hash(user.password)
+    def create_user(self, db: Session, user: UserCreate, authenticated_user: User, hashed_password: str):
+        # the endpoint hashes the password on the event loop, so no threadpool thread waits on bcrypt
+        require_create_permission(user, authenticated_user)
         db_user = User(
             username=user.username,
             email=user.email,
@@ -63,7 +70,7 @@ class UserServices:
         return db_user
 
 
-    def update_user_service(self, user_id: UUID, user_update: UserUpdate, db: Session, authenticated_user: User):
+    def get_user_for_update(self, db: Session, user_id: UUID, authenticated_user: User) -> User:
         user = db.query(User).filter(User.id == user_id).first()
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
@@ -76,18 +83,23 @@ class UserServices:
 
         if authenticated_user.role == UserRole.BANKER and user.role != UserRole.CLIENT:
             raise HTTPException(status_code=403, detail="Banker can only update CLIENT users")
+        return user
+
 
+    def update_user_service(self, user: User, user_update: UserUpdate, db: Session, authenticated_user: User, hashed_password: str = None):
+        previous_username = user.username
         if user_update.username:
             user.username = user_update.username
         if user_update.email:
             user.email = user_update.email
-        if user_update.password:
-            user.hashed_password = pwd_context.hash(user_update.password)
+        if hashed_password:
+            user.hashed_password = hashed_password
         if user_update.role and authenticated_user.role == UserRole.ADMIN:
             user.role = user_update.role
 
         db.commit()
         db.refresh(user)
+        invalidate_cached_user(previous_username, user.username)
         return user
 
     def delete_user_service(self, user_id: UUID, db: Session, authenticated_user: User):
@@ -102,6 +114,44 @@ class UserServices:
         if authenticated_user.role == UserRole.CLIENT:
             raise HTTPException(status_code=403, detail="Clients cannot delete users")
 
+        username = user.username
         db.delete(user)
         db.commit()
-        return {"detail": f"User {user_id} deleted"}
\ No newline at end of file
+        invalidate_cached_user(username)
+        return {"detail": f"User {user_id} deleted"}
+
+
+    def import_users(self, db: Session, records, allowed_roles: set, chunk_size: int = USER_IMPORT_CHUNK_SIZE) -> dict:
+        """Create users, and their accounts, from (line, record) pairs one committed chunk at a time."""
+        report = ImportReport()
+        for chunk in chunked(validated_rows(records, allowed_roles, report), chunk_size):
+            chunk = drop_existing(chunk, db.execute(existing_users_query(chunk)).all(), report)
+            if not chunk:
+                continue
+            hashes = with_hashes(chunk, import_hasher.hash_many(passwords_to_hash(chunk)))
+            users, accounts = self._insert_import_chunk(db, chunk, hashes, report)
+            report.imported += users
+            report.accounts += accounts
+        return report.as_dict()
+
+
+    def _insert_import_chunk(self, db: Session, chunk: list, hashes: dict, report: ImportReport) -> tuple[int, int]:
+        for _ in range(IBAN_INSERT_ATTEMPTS):
+            users, account_items = new_user_rows(chunk, hashes)
+            try:
+                db.execute(insert(User), users)
+                if account_items:
+                    ibans = iban_allocator.allocate(db, len(account_items))
+                    db.execute(insert(BankAccount), new_account_rows(account_items, ibans, AccountStatus.ACTIVE.value))
+                db.commit()
+                return len(users), len(account_items)
+            except IntegrityError:
+                db.rollback()
+            # another writer took a username, email or IBAN since the check: drop those rows and retry
+            chunk = drop_existing(chunk, db.execute(existing_users_query(chunk)).all(), report)
+            if not chunk:
+                return 0, 0
+
+        for line, _ in chunk:
+            report.fail(line, "Conflicted with concurrent inserts, import the row again")
+        return 0, 0
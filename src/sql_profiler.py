@@ -0,0 +1,138 @@
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.metrics import route_template
+
+logger = logging.getLogger("src.sql")
+
+SQL_PROFILING = os.getenv("SQL_PROFILING", "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+# the same statement this many times in one request is reported as a likely N+1
+REPEATED_QUERY_THRESHOLD = int(os.getenv("SQL_REPEATED_QUERY_THRESHOLD", "5"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryProfile:
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.statements = 0
+        self.seconds = 0.0
+        self.executed = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.statements += 1
+        self.seconds += seconds
+        self.executed[statement] += 1
+
+    def repeated(self, threshold: int = REPEATED_QUERY_THRESHOLD) -> dict:
+        return {statement: count for statement, count in self.executed.items() if count >= threshold}
+
+    def summary(self) -> str:
+        return "\n".join(f"  {count}x {statement}" for statement, count in self.executed.most_common())
+
+
+_current_profile: ContextVar = ContextVar("sql_profile", default=None)
+# profiles opened by count_queries(); they see every statement in the process, so tests can
+# measure requests that TestClient runs in another thread
+_captures = []
+
+
+def normalize(statement: str) -> str:
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def parameter_shape(parameters, executemany: bool) -> str:
+    # types only, never values: statements can carry password hashes and balances
+    if executemany:
+        first = parameters[0] if parameters else {}
+        return f"{len(parameters)} x {parameter_shape(first, False)}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    profile = _current_profile.get()
+    if profile is None and not _captures:
+        return
+
+    text = normalize(statement)
+    if profile is not None:
+        profile.record(text, elapsed)
+        if profile.executed[text] == REPEATED_QUERY_THRESHOLD:
+            logger.warning("Possible N+1 in %s: statement ran %d times: %s", profile.label, REPEATED_QUERY_THRESHOLD, text)
+    for capture in _captures:
+        capture.record(text, elapsed)
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s params=%s",
+            elapsed * 1000, profile.label if profile else "-", text, parameter_shape(parameters, executemany),
+        )
+
+
+@contextmanager
+def profile_request(label: str):
+    profile = QueryProfile(label)
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+@contextmanager
+def count_queries(max_statements: int = None):
+    """Collect every statement run inside the block; fail if there are more than `max_statements`."""
+    profile = QueryProfile("count_queries")
+    _captures.append(profile)
+    try:
+        yield profile
+    finally:
+        _captures.remove(profile)
+    if max_statements is not None and profile.statements > max_statements:
+        raise AssertionError(
+            f"expected at most {max_statements} statements, got {profile.statements}:\n{profile.summary()}"
+        )
+
+
+class SQLProfilerMiddleware:
+    def __init__(self, app, registry=None):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with profile_request(f"{scope['method']} {scope['path']}") as profile:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    # queries made while streaming the body are logged and counted, not in the header
+                    timing = f'db;dur={profile.seconds * 1000:.1f};desc="{profile.statements} queries"'
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing.encode())]}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if self.registry is not None:
+                    self.registry.observe_db(scope["method"], route_template(scope), profile.statements, profile.seconds)
+                logger.debug("%s: %d statements, %.1f ms", profile.label, profile.statements, profile.seconds * 1000)
@@ -2,11 +2,18 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from uuid import uuid4
+from uuid import UUID, uuid4
+from datetime import datetime, timezone
+from decimal import Decimal
 from src.database import Base, get_db
 from src.main import app
 from src.models.user import User
+from src.models.transaction import Transaction
 from src.services.auth_services import create_access_token, get_password_hash
+from src.services import iban_allocator as allocator_module
+from src.services.iban_allocator import IbanAllocator, is_valid_iban
+from src.models.account import BankAccount
+from src.models.outbox import OutboxEvent
 import os
 
 
@@ -27,6 +34,7 @@ def override_get_db():
 app.dependency_overrides[get_db] = override_get_db
 Base.metadata.create_all(bind=engine)
 client = TestClient(app)
+ops_headers = {"Authorization": f"Bearer {create_access_token({'sub': 'ops', 'role': 'ADMIN'})}"}
 
 @pytest.fixture(scope="module")
 def test_client_token():
@@ -94,6 +102,7 @@ def test_create_account(test_client_token):
     assert data["currency"] == "EUR"
     assert data["type"] == "CURRENT"
     assert data["status"] == "PENDING"
+    assert is_valid_iban(data["iban"])
 
 
 def test_get_account(test_client_token, created_account_id_fixture):
@@ -135,6 +144,129 @@ def test_update_account(test_banker_token, created_account_id_fixture):
     assert response.json()["status"] == "ACTIVE"
 
 
+def test_account_statement(test_client_token, test_banker_token, created_account_id_fixture):
+    token, _ = test_client_token
+    account_id = UUID(created_account_id_fixture)
+    db = next(override_get_db())
+    for day, month, kind, amount in [(5, 9, "CREDIT", "200.00"), (10, 9, "DEBIT", "50.00"), (2, 10, "CREDIT", "100.00")]:
+        db.add(Transaction(
+            account_id=account_id, amount=Decimal(amount), currency="EUR", type=kind,
+            created_at=datetime(2025, month, day, 12, tzinfo=timezone.utc),
+        ))
+    db.commit()
+
+    response = client.get(
+        f"/account/{created_account_id_fixture}/statement?from=2025-09-01&to=2025-09-30",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    statement = response.json()
+    # the ledger, not the balance of 1000 set by test_update_account, decides the figures
+    assert statement["opening_balance"] == 0
+    assert statement["closing_balance"] == 150
+    assert statement["total_credits"] == 200
+    assert statement["total_debits"] == 50
+    assert [line["running_balance"] for line in statement["lines"]] == [200, 150]
+
+    hits = client.get("/cache-stats", headers=ops_headers).json()["statements"]["hits"]
+    response = client.get(
+        f"/account/{created_account_id_fixture}/statement?from=2025-09-01&to=2025-09-30",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.json() == statement
+    assert client.get("/cache-stats", headers=ops_headers).json()["statements"]["hits"] == hits + 1
+
+    client.patch(
+        f"/account/{created_account_id_fixture}",
+        headers={"Authorization": f"Bearer {test_banker_token}"},
+        json={"balance": 1100}
+    )
+    response = client.get(
+        f"/account/{created_account_id_fixture}/statement?from=2025-09-01&to=2025-09-30",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    # overwriting the balance does not reopen a closed period
+    assert response.json() == statement
+
+
+def test_account_statement_rejects_inverted_period(test_client_token, created_account_id_fixture):
+    token, _ = test_client_token
+    response = client.get(
+        f"/account/{created_account_id_fixture}/statement?from=2025-09-30&to=2025-09-01",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 400
+
+
+def test_admin_bulk_creates_accounts(test_client_token):
+    _, user_id = test_client_token
+    db = next(override_get_db())
+    admin = User(username="bulkadmin", email="bulkadmin@example.com", hashed_password="x", role="ADMIN")
+    db.add(admin)
+    db.commit()
+    token = create_access_token({"sub": admin.username})
+
+    payload = {"accounts": [{"owner_id": user_id, "type": "SAVINGS", "currency": "USD"}] * 25}
+    response = client.post("/account/admin-create/bulk", headers={"Authorization": f"Bearer {token}"}, json=payload)
+    assert response.status_code == 200
+    ibans = [account["iban"] for account in response.json()]
+    assert len(set(ibans)) == 25
+    assert all(is_valid_iban(iban) for iban in ibans)
+    assert db.query(BankAccount).filter(BankAccount.iban.in_(ibans)).count() == 25
+
+
+def test_banker_bulk_reviews_pending_accounts(test_client_token, test_banker_token):
+    token, user_id = test_client_token
+    pending = [
+        client.post(f"/account/?owner_id={user_id}", headers={"Authorization": f"Bearer {token}"},
+                    json={"currency": "GBP", "type": "SAVINGS"}).json()["id"]
+        for _ in range(3)
+    ]
+    banker = {"Authorization": f"Bearer {test_banker_token}"}
+    assert client.patch("/account/bulk-status", headers={"Authorization": f"Bearer {token}"},
+                        json={"status": "ACTIVE", "account_ids": pending}).status_code == 403
+
+    missing = str(uuid4())
+    response = client.patch("/account/bulk-status", headers=banker,
+                            json={"status": "ACTIVE", "account_ids": [pending[0], pending[1], missing, pending[0]]})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 1)
+    assert [result["status_code"] for result in body["results"]] == [200, 200, 404]
+
+    # the rest of the backlog by filter; already reviewed accounts are left alone
+    response = client.patch("/account/bulk-status", headers=banker,
+                            json={"status": "DECLINED", "filter": {"owner_id": user_id, "currency": "GBP"}})
+    assert [result["account_id"] for result in response.json()["results"]] == [pending[2]]
+
+    response = client.patch("/account/bulk-status", headers=banker, json={"status": "ACTIVE", "account_ids": [pending[2]]})
+    assert response.json()["results"][0]["status_code"] == 400
+
+    db = next(override_get_db())
+    statuses = dict(db.query(BankAccount.id, BankAccount.status).filter(BankAccount.id.in_([UUID(i) for i in pending])))
+    assert [statuses[UUID(i)] for i in pending] == ["ACTIVE", "ACTIVE", "DECLINED"]
+    assert db.query(OutboxEvent).filter(OutboxEvent.aggregate_id.in_(pending)).count() == 3
+    db.close()
+
+
+def test_iban_allocator_skips_ibans_already_in_use(monkeypatch):
+    db = next(override_get_db())
+    taken = db.query(BankAccount.iban).first()[0]
+    candidates = iter([taken, "NL91ABNA0417164300"])
+    monkeypatch.setattr(allocator_module, "generate_iban", lambda: next(candidates))
+
+    allocator = IbanAllocator(engine, pool_size=0)
+    assert allocator.allocate(db) == ["NL91ABNA0417164300"]
+    assert allocator.stats()["collisions"] == 1
+
+
+def test_iban_validation():
+    assert is_valid_iban("DE89370400440532013000")
+    assert not is_valid_iban("DE89370400440532013001")
+    assert not is_valid_iban("DE8937040044053201300")
+    assert not is_valid_iban("not an iban")
+
+
 def test_delete_account(test_banker_token, created_account_id_fixture):
     token = test_banker_token
     response = client.delete(
@@ -0,0 +1,250 @@
+import json
+import pytest
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from decimal import Decimal
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from src.async_database import get_async_db, to_async_url
+from src.database import Base
+from src.models.user import User
+from src.models.account import BankAccount, AccountStatus, AccountType
+from src.models.card import DebitCard
+from src.models.transaction import Transaction
+from src.router import build_api_router
+from src.services import async_transaction_services
+from src.services.iban_allocator import generate_iban
+from src.services.auth_services import create_access_token, get_password_hash
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+Base.metadata.create_all(bind=engine)
+
+async_engine = create_async_engine(to_async_url(SQLALCHEMY_DATABASE_URL), poolclass=NullPool)
+AsyncTestingSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+async def override_get_async_db():
+    async with AsyncTestingSessionLocal() as db:
+        yield db
+
+app = FastAPI()
+app.include_router(build_api_router(use_async=True))
+app.dependency_overrides[get_async_db] = override_get_async_db
+client = TestClient(app)
+
+
+def create_user(username, role):
+    db = TestingSessionLocal()
+    user = User(
+        username=username,
+        email=f"{username}@example.com",
+        hashed_password=get_password_hash("asyncpass"),
+        role=role
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+    return create_access_token({"sub": user.username}), str(user.id)
+
+
+@pytest.fixture(scope="module")
+def async_client_user():
+    return create_user("async_client", "CLIENT")
+
+
+@pytest.fixture(scope="module")
+def async_banker_user():
+    token, _ = create_user("async_banker", "BANKER")
+    return token
+
+
+def test_to_async_url():
+    assert to_async_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    assert to_async_url("postgresql+psycopg2://u:p@localhost/bank") == "postgresql+asyncpg://u:p@localhost/bank"
+
+
+def test_async_login(async_client_user):
+    response = client.post("/login/", data={"username": "async_client", "password": "asyncpass"})
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+
+
+def test_async_account_lifecycle(async_client_user, async_banker_user):
+    token, user_id = async_client_user
+    response = client.post(
+        f"/account/?owner_id={user_id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"currency": "EUR", "type": "CURRENT"}
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "PENDING"
+    account_id = response.json()["id"]
+
+    response = client.patch(
+        f"/account/{account_id}/activate",
+        headers={"Authorization": f"Bearer {async_banker_user}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "ACTIVE"
+
+    response = client.get(
+        f"/account/{account_id}",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["id"] == account_id
+
+    response = client.get(
+        f"/account/{account_id}/statement?from=2025-01-01&to=2025-01-31",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["opening_balance"] == 0
+    assert response.json()["lines"] == []
+
+    response = client.delete(
+        f"/account/{account_id}",
+        headers={"Authorization": f"Bearer {async_banker_user}"}
+    )
+    assert response.status_code == 200
+
+
+def test_async_client_cannot_list_users(async_client_user):
+    token, _ = async_client_user
+    response = client.get("/users/", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
+
+
+def test_async_transfer(async_client_user):
+    token, user_id = async_client_user
+    db = TestingSessionLocal()
+    sender = BankAccount(iban="DE89370400440532013000", balance=300.0, status=AccountStatus.ACTIVE,
+                         type=AccountType.CURRENT, owner_id=UUID(user_id))
+    recipient = BankAccount(iban="GB82WEST12345698765432", balance=0.0, status=AccountStatus.ACTIVE,
+                            type=AccountType.CURRENT, owner_id=sender.owner_id)
+    db.add_all([sender, recipient])
+    db.commit()
+    db.add(DebitCard(monthly_salary=1000, account_id=sender.id, status="APPROVED"))
+    db.commit()
+    sender_id = str(sender.id)
+    db.close()
+
+    response = client.post(
+        f"/transaction/{sender_id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"recipient_iban": "GB82WEST12345698765432", "amount": 120.0}
+    )
+    assert response.status_code == 200
+    assert response.json()["type"] == "DEBIT"
+
+    response = client.get("/transaction/", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert any(tx["account_id"] == sender_id for tx in response.json())
+
+
+
+def test_async_transfer_retries_after_a_retryable_error(async_client_user, monkeypatch):
+    token, user_id = async_client_user
+    db = TestingSessionLocal()
+    sender = BankAccount(iban=generate_iban(), balance=300.0, status=AccountStatus.ACTIVE,
+                         type=AccountType.CURRENT, owner_id=UUID(user_id))
+    recipient = BankAccount(iban=generate_iban(), balance=0.0, status=AccountStatus.ACTIVE,
+                            type=AccountType.CURRENT, owner_id=sender.owner_id)
+    db.add_all([sender, recipient])
+    db.commit()
+    db.add(DebitCard(monthly_salary=1000, account_id=sender.id, status="APPROVED"))
+    db.commit()
+    sender_id, recipient_id, recipient_iban = sender.id, recipient.id, recipient.iban
+    db.close()
+
+    apply_balance_updates = async_transaction_services.apply_balance_updates_async
+    failures = []
+
+    async def locked_once(session, balance_updates):
+        if not failures:
+            failures.append(1)
+            raise OperationalError("UPDATE accounts", {}, Exception("database is locked"))
+        await apply_balance_updates(session, balance_updates)
+
+    monkeypatch.setattr(async_transaction_services, "apply_balance_updates_async", locked_once)
+    response = client.post(
+        f"/transaction/{sender_id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"recipient_iban": recipient_iban, "amount": 50.0}
+    )
+    assert response.status_code == 200
+    assert failures == [1]
+
+    db = TestingSessionLocal()
+    assert db.get(BankAccount, sender_id).balance == Decimal("250.00")
+    assert db.get(BankAccount, recipient_id).balance == Decimal("50.00")
+    assert db.query(Transaction).filter(Transaction.account_id == sender_id).count() == 1
+    db.close()
+
+def test_async_export(async_client_user):
+    token, _ = async_client_user
+    response = client.get("/transaction/export", headers={"Authorization": f"Bearer {token}"}, params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.text.splitlines()[0].startswith("id,account_id,amount")
+    assert len(response.text.splitlines()) >= 2
+
+
+def test_async_import_users(async_banker_user):
+    rows = [
+        {"username": "async_imported", "email": "async_imported@example.com", "password": "pass", "accounts": [{"type": "SAVINGS"}]},
+        {"username": "async_client", "email": "taken@example.com", "password": "pass"},
+    ]
+    response = client.post(
+        "/users/import",
+        headers={"Authorization": f"Bearer {async_banker_user}"},
+        files={"file": ("customers.ndjson", "\n".join(json.dumps(row) for row in rows).encode())},
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "imported": 1, "accounts": 1, "failed": 1,
+        "errors": [{"line": 2, "error": "Username already exists"}],
+    }
+
+
+def test_async_card_request_is_idempotent(async_client_user):
+    token, user_id = async_client_user
+    db = TestingSessionLocal()
+    account = BankAccount(iban="BE68539007547034", balance=0.0, status=AccountStatus.ACTIVE,
+                          type=AccountType.CURRENT, owner_id=UUID(user_id))
+    db.add(account)
+    db.commit()
+    account_id = str(account.id)
+    db.close()
+
+    headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": "async-card-1"}
+    payload = {"account_id": account_id, "monthly_salary": 1500}
+    first = client.post("/card/", headers=headers, json=payload)
+    retry = client.post("/card/", headers=headers, json=payload)
+    assert first.status_code == retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json()["id"] == first.json()["id"]
+
+
+def test_async_card_claim_and_batch_review(async_banker_user):
+    db = TestingSessionLocal()
+    card = DebitCard(account_id=uuid4(), monthly_salary=900, status="PENDING",
+                     created_at=datetime(1999, 1, 1, tzinfo=timezone.utc))
+    db.add(card)
+    db.commit()
+    card_id = str(card.id)
+    db.close()
+
+    headers = {"Authorization": f"Bearer {async_banker_user}"}
+    claimed = client.post("/card/claim?limit=1", headers=headers)
+    assert [row["id"] for row in claimed.json()] == [card_id]
+
+    response = client.post("/card/review", headers=headers, json={"reviews": [{"card_id": card_id, "status": "APPROVED"}]})
+    assert response.json()["succeeded"] == 1
+    assert client.get(f"/card/{card_id}", headers=headers).json()["status"] == "APPROVED"
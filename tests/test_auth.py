@@ -0,0 +1,63 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from passlib.hash import bcrypt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src.database import Base, get_db
+from src.main import app
+from src.models.user import User
+from src.services.password_services import BCRYPT_ROUNDS, PasswordHasher
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def low_cost_user():
+    db = next(override_get_db())
+    user = User(
+        username="lowcostuser",
+        email="lowcost@example.com",
+        hashed_password=bcrypt.using(rounds=4).hash("lowcostpass"),
+        role="CLIENT"
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def test_login_wrong_password(low_cost_user):
+    response = client.post("/login/", data={"username": "lowcostuser", "password": "wrong"})
+    assert response.status_code == 401
+
+
+def test_login_rehashes_with_configured_cost(low_cost_user):
+    response = client.post("/login/", data={"username": "lowcostuser", "password": "lowcostpass"})
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+
+    db = next(override_get_db())
+    user = db.query(User).filter(User.username == "lowcostuser").first()
+    assert bcrypt.from_string(user.hashed_password).rounds == BCRYPT_ROUNDS
+
+
+def test_password_hasher_sheds_load_when_queue_is_full():
+    hasher = PasswordHasher(workers=1, max_queue=0)
+    with pytest.raises(HTTPException) as exc:
+        hasher.hash("secret")
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "1"
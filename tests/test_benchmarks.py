@@ -0,0 +1,33 @@
+from collections import Counter
+from benchmarks.api_load import compare, percentile, summarize
+
+
+def run_with(p50, p99, rps, errors=0):
+    return {"results": {"sqlite": {"transfer": {"p50_ms": p50, "p99_ms": p99, "requests_per_s": rps, "errors": errors}}}}
+
+
+def test_summarize_percentiles():
+    stats = summarize([i / 1000 for i in range(1, 101)], Counter({"200": 99, "500": 1}), 2.0)
+    assert stats["p50_ms"] == 50
+    assert stats["p99_ms"] == 99
+    assert stats["requests_per_s"] == 50
+    assert stats["errors"] == 1
+    assert percentile([], 99) == 0.0
+
+
+def test_compare_flags_only_changes_beyond_threshold():
+    baseline = run_with(10, 100, 200)
+    assert compare(baseline, run_with(11, 110, 190), 0.2) == []
+
+    regressions = compare(baseline, run_with(10, 150, 120, errors=3), 0.2)
+    assert any("p99_ms" in line for line in regressions)
+    assert any("requests_per_s" in line for line in regressions)
+    assert any("errors" in line for line in regressions)
+    assert not any("p50_ms" in line for line in regressions)
+
+
+def test_projected_list_path_matches_the_orm_path(tmp_path):
+    from benchmarks.list_serialization import run
+    # run() asserts both paths produce the same response body
+    report = run(f"sqlite:///{tmp_path / 'lists.db'}", rows=20, repeat=1, workloads=["accounts", "cards", "users"])
+    assert all(result["orm"]["body_bytes"] == result["projected"]["body_bytes"] for result in report["results"].values())
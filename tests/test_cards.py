@@ -1,14 +1,17 @@
+import json
 import pytest
+from datetime import datetime, timedelta, timezone
 from fastapi.testclient import TestClient
 from src.main import app
 from src.database import get_db, Base
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from src.models.card import DebitCard
+from src.models.outbox import OutboxEvent
 from src.models.user import User
 from src.models.account import BankAccount, AccountStatus, AccountType
 from src.services.auth_services import create_access_token, get_password_hash
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
@@ -160,6 +163,12 @@ def test_review_card_approve(banker_user, created_card_id):
     assert response.status_code == 200
     assert response.json()["status"] == "APPROVED"
 
+    db = next(override_get_db())
+    event = db.query(OutboxEvent).filter(OutboxEvent.aggregate_id == str(created_card_id)).one()
+    assert event.event_type == "card.status_changed"
+    assert json.loads(event.payload)["status"] == "APPROVED"
+    db.close()
+
 def test_get_all_cards(banker_user):
     token = banker_user
     response = client.get(
@@ -186,3 +195,111 @@ def test_delete_card(banker_user):
     )
     assert response.status_code == 200
     assert "deleted" in response.json()["message"]
+
+def test_client_cannot_request_card_for_foreign_account(client2_user, client_account):
+    token, _ = client2_user
+    payload = {
+        "account_id": str(client_account.id),
+        "monthly_salary": 1000
+    }
+    response = client.post(
+        "/card/",
+        headers={"Authorization": f"Bearer {token}"},
+        json=payload
+    )
+    assert response.status_code == 403
+
+@pytest.fixture(scope="module")
+def second_banker():
+    db = next(override_get_db())
+    user = User(
+        username="bankeruser3",
+        email="banker3@example.com",
+        hashed_password=get_password_hash("test"),
+        role="BANKER"
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return create_access_token({"sub": user.username})
+
+@pytest.fixture(scope="module")
+def queued_card_ids():
+    # older than anything else in the shared database, so they head the queue
+    db = next(override_get_db())
+    cards = [
+        DebitCard(
+            id=uuid4(),
+            account_id=uuid4(),
+            monthly_salary=1000,
+            status="PENDING",
+            created_at=datetime(2000, 1, day, tzinfo=timezone.utc),
+        )
+        for day in (1, 2, 3)
+    ]
+    db.add_all(cards)
+    db.commit()
+    ids = [str(card.id) for card in cards]
+    db.close()
+    return ids
+
+def test_bankers_claim_disjoint_cards_and_review_them_in_a_batch(banker_user, second_banker, queued_card_ids):
+    first, second = {"Authorization": f"Bearer {banker_user}"}, {"Authorization": f"Bearer {second_banker}"}
+
+    claimed = client.post("/card/claim?limit=3", headers=first)
+    assert claimed.status_code == 200
+    assert [card["id"] for card in claimed.json()] == queued_card_ids
+    second_claim = {card["id"] for card in client.post("/card/claim?limit=1", headers=second).json()}
+    assert not set(queued_card_ids) & second_claim
+    assert client.patch(f"/card/{queued_card_ids[0]}/approve", headers=second).status_code == 409
+
+    response = client.post("/card/review", headers=first, json={"reviews": [
+        {"card_id": queued_card_ids[0], "status": "APPROVED"},
+        {"card_id": queued_card_ids[1], "status": "DECLINED", "decline_reason": "Income not verified"},
+        {"card_id": queued_card_ids[2], "status": "DECLINED"},
+        {"card_id": str(uuid4()), "status": "APPROVED"},
+        {"card_id": queued_card_ids[0], "status": "DECLINED", "decline_reason": "Changed my mind"},
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 3)
+    assert [result["status_code"] for result in body["results"]] == [200, 200, 400, 404, 400]
+
+    db = next(override_get_db())
+    cards = {str(card.id): card for card in db.query(DebitCard).filter(DebitCard.id.in_([UUID(card_id) for card_id in queued_card_ids]))}
+    assert cards[queued_card_ids[0]].status == "APPROVED"
+    assert (cards[queued_card_ids[1]].status, cards[queued_card_ids[1]].decline_reason) == ("DECLINED", "Income not verified")
+    assert cards[queued_card_ids[0]].claimed_by is None
+    events = db.query(OutboxEvent).filter(OutboxEvent.aggregate_id.in_(queued_card_ids)).count()
+    assert events == 2
+
+    # an expired lease puts the unreviewed card back in the queue for anyone
+    cards[queued_card_ids[2]].claim_expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.commit()
+    db.close()
+    # next to the second banker's own claim, which it renews
+    reclaimed = client.post(f"/card/claim?limit={len(second_claim) + 1}", headers=second)
+    assert {card["id"] for card in reclaimed.json()} == second_claim | {queued_card_ids[2]}
+
+def test_claiming_again_renews_own_claims_before_older_cards(second_banker):
+    db = next(override_get_db())
+    banker_id = db.query(User.id).filter(User.username == "bankeruser3").scalar()
+    mine = DebitCard(id=uuid4(), account_id=uuid4(), monthly_salary=1000, status="PENDING",
+                     created_at=datetime(1990, 1, 2, tzinfo=timezone.utc), claimed_by=banker_id,
+                     claim_expires_at=datetime.now(timezone.utc) + timedelta(seconds=60))
+    older = DebitCard(id=uuid4(), account_id=uuid4(), monthly_salary=1000, status="PENDING",
+                      created_at=datetime(1990, 1, 1, tzinfo=timezone.utc))
+    db.add_all([mine, older])
+    db.commit()
+
+    claimed = client.post("/card/claim?limit=1", headers={"Authorization": f"Bearer {second_banker}"})
+    assert [card["id"] for card in claimed.json()] == [str(mine.id)]
+
+    db.query(DebitCard).filter(DebitCard.id.in_([mine.id, older.id])).delete()
+    db.commit()
+    db.close()
+
+def test_client_cannot_claim_cards(client_user):
+    token, _ = client_user
+    response = client.post("/card/claim", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+import pytest
+from src import fast_json
+from src.models.account import AccountStatus
+
+
+def test_fallback_encoder_matches_orjson(monkeypatch):
+    pytest.importorskip("orjson")
+    content = [{
+        "id": uuid4(),
+        "balance": Decimal("1234.50"),
+        "status": AccountStatus.ACTIVE,
+        "created_at": datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+        "currency": "€",
+        "decline_reason": None,
+    }]
+    fast = fast_json.dumps(content)
+    monkeypatch.setattr(fast_json, "orjson", None)
+    assert fast_json.dumps(content) == fast
+    assert b'"balance":1234.5' in fast and b'"status":"ACTIVE"' in fast
+
+
+def test_unknown_types_are_rejected():
+    with pytest.raises(TypeError):
+        fast_json.dumps({"value": object()})
@@ -1,7 +1,12 @@
 from fastapi.testclient import TestClient
+from sqlalchemy import text
 from src.main import app
+from src.database import engine
+from src.services import auth_services
+from src.services.auth_services import create_access_token
 
 client = TestClient(app)
+ops_headers = {"Authorization": f"Bearer {create_access_token({'sub': 'ops', 'role': 'ADMIN'})}"}
 
 
 def test_get_main():
@@ -14,3 +19,40 @@ def test_db_connection():
     assert response.status_code == 200
     json_data = response.json()
     assert json_data["success"] is True
+
+def test_pool_stats():
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    response = client.get("/pool-stats", headers=ops_headers)
+    assert response.status_code == 200
+    stats = response.json()["primary"]
+    assert stats["pool_class"] == "InstrumentedQueuePool"
+    assert stats["checkouts"] >= 1
+    assert {"size", "checked_out", "idle", "overflow", "avg_wait_ms", "max_wait_ms"} <= stats.keys()
+
+def test_metrics_use_route_templates():
+    client.get("/test-db")
+    client.get("/account/00000000-0000-0000-0000-000000000000")
+    client.get("/no-such-page")
+    response = client.get("/metrics", headers=ops_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/test-db",status="200"}' in body
+    assert 'http_requests_total{method="GET",route="/account/{account_id}",status="401"}' in body
+    assert 'route="<unmatched>",status="404"' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/test-db",le="+Inf"}' in body
+    # the /metrics request itself is still being handled while it renders
+    assert 'http_requests_in_flight{method="GET",route="/metrics"} 1' in body
+
+
+def test_ops_endpoints_need_an_admin_or_the_ops_token(monkeypatch):
+    assert client.get("/cache-stats").status_code == 401
+    client_token = create_access_token({"sub": "ops_client", "role": "CLIENT"})
+    assert client.get("/cache-stats", headers={"Authorization": f"Bearer {client_token}"}).status_code == 403
+    assert client.get("/cache-stats", headers=ops_headers).status_code == 200
+
+    monkeypatch.setattr(auth_services, "OPS_TOKEN", "scraper-secret")
+    assert client.get("/metrics", headers={"Authorization": "Bearer scraper-secret"}).status_code == 200
+    monkeypatch.setattr(auth_services, "OPS_ACCESS", "public")
+    assert client.get("/outbox-stats").status_code == 200
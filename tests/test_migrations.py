@@ -0,0 +1,47 @@
+from sqlalchemy import create_engine, inspect, text
+from src.migrations import load_migrations, status, upgrade
+
+
+def make_engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+
+
+def test_fresh_database_reaches_head(tmp_path):
+    engine = make_engine(tmp_path)
+    applied = upgrade(engine)
+    assert [m.VERSION for m in applied] == [m.VERSION for m in load_migrations()]
+
+    inspector = inspect(engine)
+    assert {"users", "accounts", "debit_cards", "transactions", "idempotency_keys", "outbox_events", "schema_migrations"} <= set(inspector.get_table_names())
+    for table in ("accounts", "debit_cards", "transactions"):
+        assert "created_at" in {col["name"] for col in inspector.get_columns(table)}
+    assert {"claimed_by", "claim_expires_at"} <= {col["name"] for col in inspector.get_columns("debit_cards")}
+    assert "ix_transactions_account_id_created_at" in {ix["name"] for ix in inspector.get_indexes("transactions")}
+    assert {"ix_accounts_owner_id", "ix_accounts_status"} <= {ix["name"] for ix in inspector.get_indexes("accounts")}
+    assert all(applied for _, _, applied in status(engine))
+
+
+def test_upgrade_is_idempotent(tmp_path):
+    engine = make_engine(tmp_path)
+    upgrade(engine)
+    assert upgrade(engine) == []
+
+
+def test_legacy_rows_get_backfilled_timestamps(tmp_path):
+    engine = make_engine(tmp_path)
+    upgrade(engine, target=1)
+    assert "created_at" not in {col["name"] for col in inspect(engine).get_columns("accounts")}
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (id, username, email, hashed_password, role) "
+            "VALUES ('u1', 'legacy', 'legacy@example.com', 'x', 'CLIENT')"
+        ))
+        conn.execute(text(
+            "INSERT INTO accounts (id, iban, balance, currency, status, type, owner_id) "
+            "VALUES ('a1', 'AL00LEGACY', 10.5, 'EUR', 'ACTIVE', 'CURRENT', 'u1')"
+        ))
+
+    applied = upgrade(engine)
+    assert [m.VERSION for m in applied] == [m.VERSION for m in load_migrations()][1:]
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT created_at FROM accounts WHERE id = 'a1'")).scalar() is not None
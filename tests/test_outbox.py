@@ -0,0 +1,107 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from uuid import uuid4
+from sqlalchemy import create_engine, insert, select
+from src.migrations import upgrade
+from src.models import OutboxEvent
+from src.services.outbox import HttpSink, OutboxDispatcher, backlog_query, parse_sinks, status_event, transfer_event
+
+
+class FailingSink:
+    def send(self, events):
+        raise ConnectionError("sink is down")
+
+
+def make_engine(tmp_path, events):
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.db'}")
+    upgrade(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(OutboxEvent), events)
+    return engine
+
+
+def test_file_sink_receives_events_in_order_once(tmp_path):
+    tx_id = uuid4()
+    engine = make_engine(tmp_path, [
+        transfer_event(tx_id, uuid4(), uuid4(), Decimal("12.5"), "EUR"),
+        status_event("card", uuid4(), "APPROVED"),
+    ])
+    path = tmp_path / "events.ndjson"
+    dispatcher = OutboxDispatcher(engine, parse_sinks(f"file:{path}"))
+
+    assert dispatcher.dispatch_once() == 2
+    assert dispatcher.dispatch_once() == 0
+
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [event["type"] for event in events] == ["transfer.completed", "card.status_changed"]
+    assert events[0]["id"] < events[1]["id"]
+    assert events[0]["aggregate_id"] == str(tx_id)
+    assert events[0]["payload"]["amount"] == "12.50"
+    with engine.connect() as conn:
+        assert conn.execute(backlog_query()).one() == (0, 0)
+
+
+def test_failed_batch_is_retried_later_and_counted_dead_after_max_attempts(tmp_path):
+    engine = make_engine(tmp_path, [status_event("account", uuid4(), "BLOCKED")])
+    dispatcher = OutboxDispatcher(engine, [FailingSink()], max_attempts=1)
+
+    assert dispatcher.dispatch_once() == 0
+    assert "sink is down" in dispatcher.stats()["last_error"]
+    with engine.connect() as conn:
+        attempts, next_attempt_at, dispatched_at = conn.execute(
+            select(OutboxEvent.attempts, OutboxEvent.next_attempt_at, OutboxEvent.dispatched_at)
+        ).one()
+        assert (attempts, dispatched_at) == (1, None)
+        assert next_attempt_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc)
+        assert conn.execute(backlog_query(max_attempts=1)).one() == (0, 1)
+
+
+def test_sinks_are_called_without_a_connection_checked_out(tmp_path):
+    engine = make_engine(tmp_path, [status_event("card", uuid4(), "APPROVED")])
+    checked_out = []
+
+    class RecordingSink:
+        def send(self, events):
+            checked_out.append(engine.pool.checkedout())
+
+    assert OutboxDispatcher(engine, [RecordingSink()]).dispatch_once() == 1
+    assert checked_out == [0]
+
+
+def test_without_sinks_old_events_are_purged_undelivered(tmp_path):
+    old = {**status_event("card", uuid4(), "APPROVED"), "created_at": datetime.now(timezone.utc) - timedelta(days=30)}
+    engine = make_engine(tmp_path, [old, status_event("card", uuid4(), "BLOCKED")])
+    dispatcher = OutboxDispatcher(engine, [])
+
+    assert dispatcher.purge(datetime.now(timezone.utc) - timedelta(days=7)) == 1
+    with engine.connect() as conn:
+        assert conn.execute(backlog_query()).one() == (1, 0)
+
+
+def test_http_sink_posts_each_batch_as_a_json_array(tmp_path):
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        engine = make_engine(tmp_path, [status_event("card", uuid4(), status) for status in ("APPROVED", "BLOCKED")])
+        dispatcher = OutboxDispatcher(engine, [HttpSink(f"http://127.0.0.1:{server.server_port}/events")])
+        assert dispatcher.dispatch_once() == 2
+    finally:
+        server.shutdown()
+
+    assert len(received) == 1
+    assert [event["payload"]["status"] for event in received[0]] == ["APPROVED", "BLOCKED"]
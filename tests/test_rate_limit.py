@@ -0,0 +1,84 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.models.user import UserRole
+from src.rate_limit import AdmissionControl, RateLimiter, RateLimitMiddleware, parse_limits, principal, route_class
+from src.services.auth_services import AuthenticatedUser, create_access_token, user_cache
+
+
+def make_client(limits: dict, max_concurrent: int = 0):
+    control = AdmissionControl(RateLimiter(limits), max_concurrent=max_concurrent)
+    app = FastAPI()
+
+    @app.post("/login/")
+    def login():
+        return {"ok": True}
+
+    @app.get("/metrics")
+    def get_metrics():
+        return {"ok": True}
+
+    app.add_middleware(RateLimitMiddleware, control=control)
+    return TestClient(app), control
+
+
+def test_token_bucket_refills_over_the_window():
+    limiter = RateLimiter({"read": {"client": (2, 60)}})
+    assert limiter.acquire("read", "client", "user:a", now=0) == 0
+    assert limiter.acquire("read", "client", "user:a", now=0) == 0
+    assert limiter.acquire("read", "client", "user:a", now=0) == pytest.approx(30)
+    assert limiter.acquire("read", "client", "user:b", now=0) == 0
+    assert limiter.acquire("read", "client", "user:a", now=30) == 0
+    # kinds without a configured limit are not throttled
+    assert limiter.acquire("read", "staff", "user:c", now=0) == 0
+    assert limiter.limited[("read", "client")] == 1
+
+
+def test_route_classes_and_limit_parsing():
+    assert route_class("POST", "/login/") == "login"
+    assert route_class("GET", "/transaction/") == "read"
+    assert route_class("POST", "/transaction/batch") == "transfer"
+    assert route_class("PATCH", "/card/1/approve") == "write"
+    assert parse_limits("client=30/60, staff=300/1") == {"client": (30, 60.0), "staff": (300, 1.0)}
+
+
+def test_principal_uses_token_subject_and_cached_role():
+    token = create_access_token({"sub": "ratelimit_banker"})
+    scope = {"headers": [(b"authorization", f"Bearer {token}".encode())], "client": ("10.0.0.1", 1234)}
+    assert principal(scope) == ("client", "user:ratelimit_banker")
+
+    user_cache.set("ratelimit_banker", AuthenticatedUser(id=None, username="ratelimit_banker", role=UserRole.BANKER))
+    assert principal(scope) == ("staff", "user:ratelimit_banker")
+    user_cache.pop("ratelimit_banker")
+
+    # the role claim classifies the token on a worker that has not cached the user
+    staff_token = create_access_token({"sub": "ratelimit_admin", "role": UserRole.ADMIN})
+    staff_scope = {"headers": [(b"authorization", f"Bearer {staff_token}".encode())], "client": ("10.0.0.1", 1234)}
+    assert user_cache.peek("ratelimit_admin") is None
+    assert principal(staff_scope) == ("staff", "user:ratelimit_admin")
+
+    forged = {"headers": [(b"authorization", b"Bearer not-a-token")], "client": ("10.0.0.1", 1234)}
+    assert principal(forged) == ("anonymous", "ip:10.0.0.1")
+
+
+def test_limited_requests_get_429_with_retry_after():
+    client, control = make_client({"login": {"anonymous": (1, 60)}, "read": {"anonymous": (0, 60)}})
+    assert client.post("/login/").status_code == 200
+    response = client.post("/login/")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "60"
+    # observability endpoints are never limited, even for a route class that is closed entirely
+    assert client.get("/metrics").status_code == 200
+    assert control.stats()["rate_limited"] == {"login:anonymous": 1}
+
+
+def test_requests_over_the_concurrency_cap_are_shed():
+    client, control = make_client({}, max_concurrent=1)
+    assert client.post("/login/").status_code == 200
+    assert control.stats()["in_flight"] == 0
+
+    control.in_flight = 1  # another request is being handled
+    response = client.post("/login/")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert control.stats()["shed"] == 1
@@ -0,0 +1,69 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from src import replicas as replicas_module
+from src.database import get_db
+from src.replicas import ReadYourWritesMiddleware, Replica, ReplicaSet, get_read_db
+
+
+@pytest.fixture
+def replica_set(tmp_path):
+    return ReplicaSet([Replica(f"sqlite:///{tmp_path / name}") for name in ("replica1.db", "replica2.db")], sticky_seconds=60)
+
+
+def test_reads_rotate_over_healthy_replicas(replica_set):
+    first, second = replica_set.replicas
+    assert [replica_set.pick("ip:a") for _ in range(4)] == [first, second, first, second]
+
+    second.mark_down(RuntimeError("connection refused"))
+    assert [replica_set.pick("ip:a") for _ in range(2)] == [first, first]
+    first.mark_down(RuntimeError("connection refused"))
+    assert replica_set.pick("ip:a") is None
+
+    replica_set.check()
+    assert first.healthy and second.healthy and first.lag == 0
+
+
+def test_health_check_drops_unreachable_and_lagging_replicas(tmp_path):
+    unreachable = Replica(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    lagging = Replica(f"sqlite:///{tmp_path / 'replica.db'}")
+    ReplicaSet([unreachable]).check()
+    ReplicaSet([lagging], max_lag=-1).check()
+    assert not unreachable.healthy and "unable to open" in unreachable.last_error
+    assert not lagging.healthy and "lag" in lagging.last_error
+
+
+def test_writer_reads_from_primary_until_the_window_passes(replica_set, tmp_path, monkeypatch):
+    monkeypatch.setattr(replicas_module, "replica_set", replica_set)
+    primary = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'primary.db'}"))
+
+    def override_get_db():
+        db = primary()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    @app.get("/where")
+    def where(db: Session = Depends(get_read_db)):
+        return {"database": db.get_bind().url.database.rsplit("/", 1)[-1]}
+
+    @app.post("/write")
+    def write():
+        return {"ok": True}
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.add_middleware(ReadYourWritesMiddleware, replicas=replica_set)
+    client = TestClient(app)
+
+    assert {client.get("/where").json()["database"] for _ in range(2)} == {"replica1.db", "replica2.db"}
+    client.post("/write")
+    assert client.get("/where").json()["database"] == "primary.db"
+
+    replica_set.recent_writers.clear()
+    assert client.get("/where").json()["database"] != "primary.db"
+    assert replica_set.stats()["primary_reads"] == 1
@@ -0,0 +1,43 @@
+import logging
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from src.database import engine
+from src.main import app
+from src.services.auth_services import create_access_token
+from src.sql_profiler import REPEATED_QUERY_THRESHOLD, count_queries, parameter_shape, profile_request
+
+client = TestClient(app)
+ops_headers = {"Authorization": f"Bearer {create_access_token({'sub': 'ops', 'role': 'ADMIN'})}"}
+
+
+def test_repeated_statements_are_flagged(caplog):
+    with caplog.at_level(logging.WARNING, logger="src.sql"):
+        with profile_request("GET /example") as profile, engine.connect() as conn:
+            for _ in range(REPEATED_QUERY_THRESHOLD + 2):
+                conn.execute(text("SELECT 1"))
+    assert profile.repeated() == {"SELECT 1": REPEATED_QUERY_THRESHOLD + 2}
+    warnings = [record for record in caplog.records if "Possible N+1" in record.getMessage()]
+    assert len(warnings) == 1
+
+
+def test_parameter_shape_hides_values():
+    assert parameter_shape({"username": "alice", "limit": 5}, False) == "{username: str, limit: int}"
+    assert parameter_shape([{"b_delta": 1.5}, {"b_delta": 2.5}], True) == "2 x {b_delta: float}"
+
+
+def test_count_queries_enforces_budget():
+    try:
+        with count_queries(max_statements=1), engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+    except AssertionError as exc:
+        assert "got 2" in str(exc)
+    else:
+        raise AssertionError("budget was not enforced")
+
+
+def test_server_timing_header_and_db_metrics():
+    response = client.get("/test-db")
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert '"1 queries"' in response.headers["server-timing"]
+    assert 'http_request_db_statements_total{method="GET",route="/test-db"}' in client.get("/metrics", headers=ops_headers).text
@@ -1,3 +1,4 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import UUID, create_engine
@@ -8,7 +9,15 @@ from src.main import app
 from src.database import get_db, Base
 from src.models.user import User
 from src.models.account import BankAccount, AccountType, AccountStatus
+from src.models.transaction import Transaction
 from src.services.auth_services import get_password_hash, create_access_token
+from src.sql_profiler import count_queries
+from src.models.idempotency import IdempotencyKey
+from src.models.outbox import OutboxEvent
+from src.services import idempotency_services
+from src.services.idempotency_services import IdempotencyServices, IdempotentRequest, replay
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
@@ -118,6 +127,16 @@ def test_create_transaction(client_user, sender_account, recipient_account):
     global created_transaction_id
     created_transaction_id = tx["id"]
 
+def test_transaction_amount_must_be_positive_with_two_decimals(client_user, sender_account, recipient_account):
+    token, _ = client_user
+    for amount in (-5, 0, 10.005):
+        response = client.post(
+            f"/transaction/{sender_account.id}",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"recipient_iban": recipient_account.iban, "amount": amount}
+        )
+        assert response.status_code == 422
+
 def test_get_all_transactions(banker_user, sender_account):
     token = banker_user
     response = client.get(
@@ -129,6 +148,72 @@ def test_get_all_transactions(banker_user, sender_account):
     assert isinstance(txs, list)
     assert any(tx["account_id"] == str(sender_account.id) for tx in txs)
 
+def test_paginate_transactions(client_user, sender_account, recipient_account):
+    token, _ = client_user
+    for amount in (10.0, 20.0):
+        response = client.post(
+            f"/transaction/{sender_account.id}",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"recipient_iban": recipient_account.iban, "amount": amount}
+        )
+        assert response.status_code == 200
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"account_id": str(sender_account.id), "type": "DEBIT", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/transaction/", headers={"Authorization": f"Bearer {token}"}, params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        seen.extend(tx["id"] for tx in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen)) == 3
+
+    response = client.get(
+        "/transaction/",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"account_id": str(sender_account.id), "min_amount": 15, "max_amount": 25}
+    )
+    assert [tx["amount"] for tx in response.json()] == [20.0]
+
+def test_export_transactions(client_user, sender_account):
+    token, _ = client_user
+    response = client.get(
+        "/transaction/export",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"account_id": str(sender_account.id)}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 3
+    assert [row["amount"] for row in rows] == [200.0, 10.0, 20.0]
+
+    response = client.get(
+        "/transaction/export",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"account_id": str(sender_account.id), "format": "csv"}
+    )
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0] == "id,account_id,amount,currency,type,description,created_at"
+    assert len(lines) == 4
+
+def test_invalid_cursor(client_user):
+    token, _ = client_user
+    response = client.get(
+        "/transaction/",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
+
 def test_get_transaction_by_id(client_user):
     token, _ = client_user
     response = client.get(
@@ -156,3 +241,329 @@ def test_banker_can_delete_transaction(banker_user):
     )
     assert response.status_code == 200
     assert "deleted successfully" in response.json()["detail"]
+
+def test_other_client_cannot_read_transaction(sender_account):
+    db = next(override_get_db())
+    user = User(
+        username="transaction_outsider",
+        email="toutsider@example.com",
+        hashed_password=get_password_hash("password"),
+        role="CLIENT"
+    )
+    db.add(user)
+    db.commit()
+    token = create_access_token({"sub": user.username})
+
+    debit_id = db.query(Transaction.id).filter(Transaction.account_id == sender_account.id).first().id
+    response = client.get(
+        f"/transaction/{debit_id}",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 403
+
+    response = client.get("/transaction/", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json() == []
+
+def test_batch_transfer(client_user, recipient_account):
+    from src.models.card import DebitCard
+    db = next(override_get_db())
+    token, user = client_user
+    payroll = BankAccount(
+        id=uuid4(),
+        iban="AL35202111090000000001234568",
+        balance=100.0,
+        currency="EUR",
+        status=AccountStatus.ACTIVE,
+        type=AccountType.CURRENT,
+        owner_id=user.id
+    )
+    db.add(payroll)
+    db.commit()
+    db.add(DebitCard(monthly_salary=2000, account_id=payroll.id, status="APPROVED"))
+    db.commit()
+    recipient_balance = db.get(BankAccount, recipient_account.id).balance
+
+    payload = {
+        "sender_account_id": str(payroll.id),
+        "transfers": [
+            {"recipient_iban": recipient_account.iban, "amount": 30.0},
+            {"recipient_iban": recipient_account.iban, "amount": 100.0},
+            {"recipient_iban": "fr14 2004 1010 0505 0001 3m02 606", "amount": 10.0},
+            {"recipient_iban": recipient_account.iban, "amount": 50.0},
+        ]
+    }
+    response = client.post("/transaction/batch", headers={"Authorization": f"Bearer {token}"}, json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 2)
+    assert [r["status_code"] for r in body["results"]] == [200, 400, 404, 200]
+    assert body["results"][1]["detail"] == "Insufficient funds"
+
+    db.expire_all()
+    assert db.get(BankAccount, payroll.id).balance == 20.0
+    assert db.get(BankAccount, recipient_account.id).balance == recipient_balance + 80
+    assert db.query(Transaction).filter(Transaction.account_id == payroll.id).count() == 2
+
+def test_concurrent_transfers_never_overdraw(client_user, recipient_account):
+    from concurrent.futures import ThreadPoolExecutor
+    from fastapi import HTTPException
+    from src.models.card import DebitCard
+    from src.schemas.transaction import TransactionCreate
+    from src.services.auth_services import AuthenticatedUser
+    from src.services.transaction_services import TransactionService
+
+    db = next(override_get_db())
+    _, user = client_user
+    hot = BankAccount(
+        id=uuid4(),
+        iban="AL35202111090000000001234569",
+        balance=50.0,
+        currency="EUR",
+        status=AccountStatus.ACTIVE,
+        type=AccountType.CURRENT,
+        owner_id=user.id
+    )
+    db.add(hot)
+    db.commit()
+    db.add(DebitCard(monthly_salary=2000, account_id=hot.id, status="APPROVED"))
+    db.commit()
+    owner = AuthenticatedUser(id=user.id, username=user.username, role=user.role)
+
+    def transfer(_):
+        session = TestingSessionLocal()
+        try:
+            TransactionService().perform_transaction(session, hot.id, TransactionCreate(recipient_iban=recipient_account.iban, amount=10.0), owner)
+            return True
+        except HTTPException as exc:
+            assert exc.detail == "Insufficient funds"
+            return False
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        outcomes = list(pool.map(transfer, range(8)))
+
+    db.expire_all()
+    assert outcomes.count(True) == 5
+    assert db.get(BankAccount, hot.id).balance == 0.0
+
+
+
+def test_transfer_query_budget(client_user, sender_account, recipient_account):
+    token, _ = client_user
+    client.get("/transaction/", headers={"Authorization": f"Bearer {token}"})  # warms the user cache
+    # sender lookup, recipient lookup, two balance updates, one multi-row insert, the outbox event
+    with count_queries(max_statements=6):
+        response = client.post(
+            f"/transaction/{sender_account.id}",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"recipient_iban": recipient_account.iban, "amount": 1.0}
+        )
+    assert response.status_code == 200
+    assert response.json()["created_at"]
+
+
+def test_batch_transfer_queries_do_not_grow_with_batch_size(client_user, recipient_account):
+    token, user = client_user
+    db = next(override_get_db())
+    account = BankAccount(
+        id=uuid4(), iban="AL35202111090000000001234599", balance=1000.0, currency="EUR",
+        status=AccountStatus.ACTIVE, type=AccountType.CURRENT, owner_id=user.id
+    )
+    db.add(account)
+    db.commit()
+    from src.models.card import DebitCard
+    db.add(DebitCard(monthly_salary=2000, account_id=account.id, status="APPROVED"))
+    db.commit()
+
+    counts = []
+    for size in (2, 20):
+        payload = {
+            "sender_account_id": str(account.id),
+            "transfers": [{"recipient_iban": recipient_account.iban, "amount": 1.0}] * size,
+        }
+        with count_queries() as profile:
+            response = client.post("/transaction/batch", headers={"Authorization": f"Bearer {token}"}, json=payload)
+        assert response.json()["succeeded"] == size
+        counts.append(profile.statements)
+    assert counts[0] == counts[1]
+
+
+def test_invalid_recipient_iban_is_rejected_without_queries(client_user, sender_account):
+    token, _ = client_user
+    client.get("/transaction/", headers={"Authorization": f"Bearer {token}"})  # warms the user cache
+    with count_queries(max_statements=0):
+        response = client.post(
+            f"/transaction/{sender_account.id}",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"recipient_iban": "AL00000000000000000000000000", "amount": 1.0}
+        )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid recipient IBAN"
+
+
+def test_recipient_resolution_is_cached_until_account_is_deleted(client_user, banker_user, sender_account):
+    token, user = client_user
+    db = next(override_get_db())
+    merchant = BankAccount(
+        id=uuid4(), iban="GB33BUKB20201555555555", balance=0.0, currency="EUR",
+        status=AccountStatus.ACTIVE, type=AccountType.CURRENT, owner_id=user.id
+    )
+    db.add(merchant)
+    db.commit()
+    transfer = {"recipient_iban": "GB33 BUKB 2020 1555 5555 55", "amount": 1.0}
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.post(f"/transaction/{sender_account.id}", headers=headers, json=transfer).status_code == 200
+    with count_queries() as profile:
+        assert client.post(f"/transaction/{sender_account.id}", headers=headers, json=transfer).status_code == 200
+    assert not any("accounts.iban IN" in statement for statement in profile.executed)
+
+    response = client.delete(f"/account/{merchant.id}", headers={"Authorization": f"Bearer {banker_user}"})
+    assert response.status_code == 200
+    response = client.post(f"/transaction/{sender_account.id}", headers=headers, json=transfer)
+    assert response.status_code == 404
+
+
+def test_stale_cached_recipient_does_not_swallow_money(client_user, sender_account):
+    token, user = client_user
+    db = next(override_get_db())
+    merchant = BankAccount(
+        id=uuid4(), iban="NL91ABNA0417164300", balance=0.0, currency="EUR",
+        status=AccountStatus.ACTIVE, type=AccountType.CURRENT, owner_id=user.id
+    )
+    db.add(merchant)
+    db.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+    transfer = {"recipient_iban": "NL91ABNA0417164300", "amount": 1.0}
+    assert client.post(f"/transaction/{sender_account.id}", headers=headers, json=transfer).status_code == 200
+
+    # deleted by another worker: this process still has the recipient cached
+    db.query(Transaction).filter(Transaction.account_id == merchant.id).delete()
+    db.query(BankAccount).filter(BankAccount.id == merchant.id).delete()
+    db.commit()
+    balance = db.get(BankAccount, sender_account.id).balance
+
+    response = client.post(f"/transaction/{sender_account.id}", headers=headers, json=transfer)
+    assert response.status_code == 404
+    db.expire_all()
+    assert db.get(BankAccount, sender_account.id).balance == balance
+
+
+def test_retried_transfer_with_idempotency_key_runs_once(client_user, sender_account, recipient_account):
+    token, _ = client_user
+    db = next(override_get_db())
+    balance = db.get(BankAccount, sender_account.id).balance
+    headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": "transfer-retry-1"}
+    transfer = {"recipient_iban": recipient_account.iban, "amount": 5.0}
+
+    first = client.post(f"/transaction/{sender_account.id}", headers=headers, json=transfer)
+    assert first.status_code == 200
+    with count_queries(max_statements=2):
+        retry = client.post(f"/transaction/{sender_account.id}", headers=headers, json=transfer)
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    db.expire_all()
+    assert db.get(BankAccount, sender_account.id).balance == balance - 5
+
+    response = client.post(f"/transaction/{sender_account.id}", headers=headers, json={**transfer, "amount": 6.0})
+    assert response.status_code == 422
+
+
+def test_failed_transfer_outcome_is_replayed(client_user, sender_account, recipient_account):
+    token, _ = client_user
+    headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": "transfer-too-large"}
+    transfer = {"recipient_iban": recipient_account.iban, "amount": 1000000.0}
+    for replayed in (False, True):
+        response = client.post(f"/transaction/{sender_account.id}", headers=headers, json=transfer)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Insufficient funds"
+        assert ("Idempotent-Replayed" in response.headers) == replayed
+
+
+def test_expired_idempotency_key_can_be_reused(client_user, sender_account, recipient_account):
+    token, user = client_user
+    db = next(override_get_db())
+    past = datetime.now(timezone.utc) - timedelta(days=2)
+    db.add(IdempotencyKey(owner_id=user.id, key="transfer-old", request_hash="0" * 64, status_code=200,
+                          response_body="{}", created_at=past, expires_at=past + timedelta(days=1)))
+    db.commit()
+
+    response = client.post(
+        f"/transaction/{sender_account.id}",
+        headers={"Authorization": f"Bearer {token}", "Idempotency-Key": "transfer-old"},
+        json={"recipient_iban": recipient_account.iban, "amount": 1.0},
+    )
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
+
+
+def test_idempotency_key_still_in_progress_conflicts():
+    request = IdempotentRequest("in-flight", "a" * 64)
+    with pytest.raises(HTTPException) as exc:
+        replay(("a" * 64, None, None, None), request)
+    assert exc.value.status_code == 409
+    assert exc.value.headers["Retry-After"] == "1"
+
+
+def test_replayed_error_keeps_its_headers():
+    request = IdempotentRequest("rate-limited", "a" * 64)
+    response = replay(("a" * 64, 403, '{"detail": "Slow down"}', '{"Retry-After": "30"}'), request)
+    assert response.status_code == 403
+    assert response.headers["Retry-After"] == "30"
+    assert response.headers["Idempotent-Replayed"] == "true"
+
+
+def test_expired_keys_are_purged_even_when_the_claim_loses(client_user, monkeypatch):
+    _, user = client_user
+    db = next(override_get_db())
+    now = datetime.now(timezone.utc)
+    request = IdempotentRequest("purge-live", "b" * 64)
+    db.add_all([
+        IdempotencyKey(owner_id=user.id, key="purge-expired", request_hash="c" * 64, status_code=200,
+                       response_body="{}", created_at=now - timedelta(days=2), expires_at=now - timedelta(days=1)),
+        IdempotencyKey(owner_id=user.id, key=request.key, request_hash=request.fingerprint, status_code=200,
+                       response_body="{}", created_at=now, expires_at=now + timedelta(days=1)),
+    ])
+    db.commit()
+    monkeypatch.setattr(idempotency_services, "_last_purge", 0.0)
+
+    # the insert hits the live key and rolls back; the purge before it must survive that
+    assert IdempotencyServices().claim(db, user.id, request) is not None
+    db.expire_all()
+    assert db.query(IdempotencyKey).filter(IdempotencyKey.key == "purge-expired").first() is None
+    db.close()
+
+
+def test_transfers_write_outbox_events_in_the_same_commit(client_user, sender_account, recipient_account):
+    token, _ = client_user
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.post(
+        f"/transaction/{sender_account.id}", headers=headers,
+        json={"recipient_iban": recipient_account.iban, "amount": 2.5},
+    )
+    assert response.status_code == 200
+
+    db = next(override_get_db())
+    event = db.query(OutboxEvent).filter(OutboxEvent.aggregate_id == response.json()["id"]).one()
+    assert event.event_type == "transfer.completed"
+    assert json.loads(event.payload) == {
+        "transaction_id": response.json()["id"],
+        "sender_account_id": str(sender_account.id),
+        "recipient_account_id": str(recipient_account.id),
+        "amount": "2.50",
+        "currency": "EUR",
+    }
+    assert event.dispatched_at is None
+
+    # a rejected transfer commits nothing, so it leaves no event behind
+    before = db.query(OutboxEvent).count()
+    response = client.post(
+        f"/transaction/{sender_account.id}", headers=headers,
+        json={"recipient_iban": recipient_account.iban, "amount": 1000000.0},
+    )
+    assert response.status_code == 400
+    assert db.query(OutboxEvent).count() == before
+    db.close()
@@ -4,8 +4,12 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from src.database import Base, get_db
 from src.main import app 
+from src.models.account import BankAccount
 from src.models.user import User
 from src.services.auth_services import create_access_token, get_password_hash
+from src.services.iban_allocator import is_valid_iban
+from passlib.hash import bcrypt
+import json
 import os
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -28,6 +32,7 @@ app.dependency_overrides[get_db] = override_get_db
 Base.metadata.create_all(bind=engine)
 
 client = TestClient(app)
+ops_headers = {"Authorization": f"Bearer {create_access_token({'sub': 'ops', 'role': 'ADMIN'})}"}
 
 @pytest.fixture(scope="module")
 def test_token():
@@ -128,3 +133,114 @@ def test_delete_user(test_token):
         headers={"Authorization": f"Bearer {test_token}"}
     )
     assert get_response.status_code == 404
+
+
+def test_current_user_is_cached_and_invalidated_on_delete(test_token):
+    create_payload = {
+        "username": "cacheduser",
+        "email": "cacheduser@example.com",
+        "password": "cachedpass",
+        "role": "BANKER"
+    }
+    create_response = client.post(
+        "/users/",
+        headers={"Authorization": f"Bearer {test_token}"},
+        json=create_payload
+    )
+    assert create_response.status_code == 200
+    user_id = create_response.json()["id"]
+    cached_token = create_access_token({"sub": "cacheduser"})
+
+    hits_before = client.get("/cache-stats", headers=ops_headers).json()["users"]["hits"]
+    for _ in range(2):
+        response = client.get("/users/", headers={"Authorization": f"Bearer {cached_token}"})
+        assert response.status_code == 200
+    assert client.get("/cache-stats", headers=ops_headers).json()["users"]["hits"] >= hits_before + 1
+
+    delete_response = client.delete(
+        f"/users/{user_id}",
+        headers={"Authorization": f"Bearer {test_token}"},
+    )
+    assert delete_response.status_code == 200
+
+    response = client.get("/users/", headers={"Authorization": f"Bearer {cached_token}"})
+    assert response.status_code == 401
+
+
+
+def test_banker_imports_clients_from_csv_with_per_row_errors(test_token):
+    db = next(override_get_db())
+    db.add(User(username="importbanker", email="importbanker@example.com", hashed_password=get_password_hash("pass"), role="BANKER"))
+    db.commit()
+    banker_token = create_access_token({"sub": "importbanker"})
+
+    csv_file = "\n".join([
+        "username,email,password,role,account_type,account_currency",
+        "imported1,imported1@example.com,pass1,,CURRENT,USD",
+        "imported1,other@example.com,pass2,,,",
+        "testuser,fresh@example.com,pass3,,,",
+        "imported2,not-an-email,pass4,,,",
+        "imported3,imported3@example.com,pass5,BANKER,,",
+    ])
+    response = client.post(
+        "/users/import",
+        headers={"Authorization": f"Bearer {banker_token}"},
+        files={"file": ("customers.csv", csv_file.encode(), "text/csv")},
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["imported"], report["accounts"], report["failed"]) == (1, 1, 4)
+    errors = {error["line"]: error["error"] for error in report["errors"]}
+    assert errors[3] == "Duplicate username in file"
+    assert errors[4] == "Username already exists"
+    assert errors[5].startswith("email")
+    assert errors[6] == "Not allowed to create BANKER users"
+
+    db.expire_all()
+    user = db.query(User).filter(User.username == "imported1").one()
+    assert user.role == "CLIENT"
+    assert bcrypt.verify("pass1", user.hashed_password)
+    account = db.query(BankAccount).filter(BankAccount.owner_id == user.id).one()
+    assert (account.type, account.currency, account.status) == ("CURRENT", "USD", "ACTIVE")
+    assert is_valid_iban(account.iban)
+    db.close()
+
+
+def test_import_ndjson_keeps_existing_password_hashes(test_token):
+    carried_over = bcrypt.using(rounds=4).hash("legacy-pass")
+    lines = [
+        json.dumps({"username": "importedbanker", "email": "importedbanker@example.com", "hashed_password": carried_over, "role": "BANKER"}),
+        "",
+        "{not json",
+        json.dumps({"username": "importedplain", "email": "importedplain@example.com", "hashed_password": "plaintext", "role": "BANKER"}),
+        json.dumps({"username": "importedclient", "email": "importedclient@example.com", "password": "pass"}),
+    ]
+    response = client.post(
+        "/users/import",
+        headers={"Authorization": f"Bearer {test_token}"},
+        files={"file": ("staff.ndjson", "\n".join(lines).encode(), "application/x-ndjson")},
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["imported"], report["failed"]) == (1, 3)
+    errors = {error["line"]: error["error"] for error in report["errors"]}
+    assert errors[3].startswith("Invalid JSON")
+    assert errors[4] == "hashed_password is not a supported password hash"
+    assert errors[5] == "Not allowed to create CLIENT users"
+
+    db = next(override_get_db())
+    assert db.query(User).filter(User.username == "importedbanker").one().hashed_password == carried_over
+    db.close()
+
+
+def test_client_cannot_import_users(test_token):
+    db = next(override_get_db())
+    db.add(User(username="importclient", email="importclient@example.com", hashed_password="x", role="CLIENT"))
+    db.commit()
+    db.close()
+    response = client.post(
+        "/users/import",
+        headers={"Authorization": f"Bearer {create_access_token({'sub': 'importclient'})}"},
+        files={"file": ("customers.csv", b"username,email,password\n", "text/csv")},
+    )
+    assert response.status_code == 403